@@ -43,12 +43,13 @@ def add_arguments(parser: ArgumentParser) -> ArgumentParser:
         help='Path to the cache to generate or read from'
     )
     # parser.add_argument('--outdir', nargs='?', type=str)
-    # parser.add_argument(
-    #     '--out_format',
-    #     type=str,
-    #     default='JSON',
-    #     choices=['RPSBML', 'JSON', 'rpsbml', 'json']
-    # )
+    parser.add_argument(
+        '--out_format',
+        type=str,
+        default='rpsbml',
+        choices=['rpsbml', 'binary'],
+        help='Format of output pathways, binary files are faster to read and write by rptools (default: rpsbml)'
+    )
     parser.add_argument('--upper_flux_bound', type=int, default=default_upper_flux_bound)
     parser.add_argument('--lower_flux_bound', type=int, default=default_lower_flux_bound)
     parser.add_argument(
@@ -12,6 +12,7 @@ from rr_cache import rrCache
 from rptools import build_args_parser
 from rptools.rpcompletion import rp_completion
 from rptools.rpcompletion.Args import add_arguments
+from rptools.rplibs.rpBinary import BINARY_EXT
 
 
 def _cli():
@@ -71,12 +72,13 @@ def _cli():
     if not os_path.exists(args.outdir):
         os_mkdir(args.outdir)
     # Write out selected pathways
+    ext = BINARY_EXT if args.out_format == 'binary' else '.xml'
     for pathway in pathways:
-        pathway.to_rpSBML().write_to_file(
+        pathway.write_to_file(
             os_path.join(
                 args.outdir,
                 pathway.get_id()
-            ) + '.xml'
+            ) + ext
         )
 
     StreamHandler.terminator = ""
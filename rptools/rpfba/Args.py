@@ -1,4 +1,5 @@
 from argparse import ArgumentParser
+from os import path as os_path
 from typing import (
     List,
 )
@@ -16,6 +17,11 @@ DEFAULT_ARGS = {
     "fraction_coeff": 0.75,
     "merge": "",
     "with_orphan_species": False,
+    "merge_validation": "structural",
+    "reduce_model": False,
+    "reduce_cache_dir": os_path.join(
+        os_path.expanduser("~"), ".cache", "rptools", "rpfba"
+    ),
 }
 
 def add_arguments(parser: ArgumentParser):
@@ -66,5 +72,27 @@ def add_arguments(parser: ArgumentParser):
         default=DEFAULT_ARGS["with_orphan_species"],
         help="Take metabolites that are only consumed (default: False)",
     )
+    parser.add_argument(
+        "--merge_validation",
+        type=str,
+        choices=["none", "structural", "full"],
+        default=DEFAULT_ARGS["merge_validation"],
+        help="validation level of the merged model (default: structural). "
+        "'structural' only checks IDs uniqueness and references of elements copied from the pathway, "
+        "'full' runs the libSBML validator over the whole merged model",
+    )
+    parser.add_argument(
+        "--reduce_model",
+        action="store_true",
+        default=DEFAULT_ARGS["reduce_model"],
+        help="remove blocked reactions and dead-end metabolites from the model before merging (default: False). "
+        "Exchange, biomass, objective reactions and reactions connected to pathway species are kept",
+    )
+    parser.add_argument(
+        "--reduce_cache_dir",
+        type=str,
+        default=DEFAULT_ARGS["reduce_cache_dir"],
+        help=f"folder where the blocked reactions of each model are cached (default: {DEFAULT_ARGS['reduce_cache_dir']})",
+    )
 
     return parser
@@ -1,12 +1,22 @@
 import pandas as pd
+from libsbml import writeSBMLToString
+from hashlib import sha256
 from logging import Logger, getLogger
-from os import remove
+from os import (
+    remove,
+    makedirs,
+    path as os_path
+)
 from argparse import Namespace as arg_nspace
 from pandas.core.series import Series as np_series
 from typing import List, Dict, Tuple
 from tempfile import NamedTemporaryFile
-from json import dumps as json_dumps
-from cobra.flux_analysis import pfba
+from json import (
+    dumps as json_dumps,
+    dump as json_dump,
+    load as json_load
+)
+from cobra.flux_analysis import pfba, find_blocked_reactions
 from cobra import io as cobra_io
 from cobra.io.sbml import validate_sbml_model, CobraSBMLError
 from cobra.core.model import Model as cobra_model
@@ -30,6 +40,9 @@ def preprocess(
     logger: Logger = getLogger(__name__),
 ):
     pathway = rpPathway(args.pathway_file, logger=logger)
+    # Pathways read from binary files have no SBML document yet
+    if pathway.get_rpsbml().getModel() is None:
+        pathway.to_rpSBML()
     pathway.setup_pathway_fba()
     model = rpSBML(inFile=args.model_file, logger=logger)
 
@@ -46,6 +59,17 @@ def preprocess(
         logger.error(e)
         return 1
 
+    # REDUCE
+    if getattr(args, "reduce_model", DEFAULT_RPFBA_ARGS["reduce_model"]):
+        reduce_model(
+            model=model,
+            pathway=pathway,
+            biomass_rxn_id=ids['biomass_rxn_id'],
+            compartment_id=ids['comp_id'],
+            cache_dir=getattr(args, "reduce_cache_dir", DEFAULT_RPFBA_ARGS["reduce_cache_dir"]),
+            logger=logger,
+        )
+
     # MERGE
     (
         merged_model,
@@ -56,6 +80,10 @@ def preprocess(
         pathway=pathway.get_rpsbml(),
         model=model,
         compartment_id=ids['comp_id'],
+        validation=getattr(args, "merge_validation", DEFAULT_RPFBA_ARGS["merge_validation"]),
+        # The model is not used afterwards, no need to work
+        # on a copy nor to record modifications (checkpoint)
+        inplace=True,
         logger=logger
     )
     logger.debug(f"model: {model}")
@@ -127,6 +155,127 @@ def check_ids(
     }
 
 
+def get_blocked_reactions(
+    model: rpSBML,
+    cache_dir: str = DEFAULT_RPFBA_ARGS["reduce_cache_dir"],
+    logger: Logger = getLogger(__name__)
+) -> List[str]:
+    '''Return the IDs of the model reactions that cannot carry any flux,
+    exchange reactions excepted. Since the search is expensive on GEMs,
+    results are cached on disk, keyed by the hash of the model.
+
+    :param model: The model rpSBML object
+    :param cache_dir: Folder where results are cached (caching is disabled if empty)
+    :param logger: The logger object
+
+    :type model: rpSBML
+    :type cache_dir: str
+    :type logger: Logger
+
+    :return: The IDs of the blocked reactions
+    :rtype: List[str]
+    '''
+    sbml_str = writeSBMLToString(model.getDocument())
+    cache_file = ""
+    if cache_dir:
+        model_hash = sha256(sbml_str.encode()).hexdigest()
+        cache_file = os_path.join(cache_dir, f"{model_hash}.blocked.json")
+        if os_path.exists(cache_file):
+            logger.debug(f"Blocked reactions read from cache: {cache_file}")
+            with open(cache_file, "r") as fp:
+                return json_load(fp)
+
+    logger.info("Searching for blocked reactions in the model...")
+    # Keep SBML IDs as they are (no 'R_' prefix removal)
+    cobraModel = cobra_io.read_sbml_model(sbml_str, f_replace={})
+    exchange_rxn_ids = set(rxn.id for rxn in cobraModel.boundary)
+    blocked_rxn_ids = sorted(
+        rxn_id
+        for rxn_id in find_blocked_reactions(cobraModel, open_exchanges=True)
+        if rxn_id not in exchange_rxn_ids
+    )
+    logger.debug(f"{len(blocked_rxn_ids)} blocked reaction(s) found")
+
+    if cache_file:
+        makedirs(cache_dir, exist_ok=True)
+        with open(cache_file, "w") as fp:
+            json_dump(blocked_rxn_ids, fp)
+        logger.debug(f"Blocked reactions written to cache: {cache_file}")
+
+    return blocked_rxn_ids
+
+
+def reduce_model(
+    model: rpSBML,
+    pathway: rpPathway,
+    biomass_rxn_id: str,
+    compartment_id: str,
+    cache_dir: str = DEFAULT_RPFBA_ARGS["reduce_cache_dir"],
+    logger: Logger = getLogger(__name__)
+) -> List[str]:
+    '''Remove blocked reactions and dead-end metabolites from the model
+    (in place) to shrink the size of the LP. Are kept:
+        - exchange reactions,
+        - biomass reaction and reactions involved in objectives,
+        - reactions connected to species of the pathway, since they can be
+          unblocked once the pathway is merged into the model.
+
+    :param model: The model rpSBML object
+    :param pathway: The pathway to merge afterwards
+    :param biomass_rxn_id: The biomass reaction ID
+    :param compartment_id: The model compartment ID
+    :param cache_dir: Folder where blocked reactions are cached
+    :param logger: The logger object
+
+    :type model: rpSBML
+    :type pathway: rpPathway
+    :type biomass_rxn_id: str
+    :type compartment_id: str
+    :type cache_dir: str
+    :type logger: Logger
+
+    :return: The IDs of the removed reactions
+    :rtype: List[str]
+    '''
+    blocked_rxn_ids = get_blocked_reactions(
+        model=model,
+        cache_dir=cache_dir,
+        logger=logger
+    )
+
+    protected_rxn_ids = set([biomass_rxn_id])
+    for objective in model.getListOfObjectives():
+        for flux_obj in objective.getListOfFluxObjectives():
+            protected_rxn_ids.add(flux_obj.getReaction())
+
+    # Connector reactions
+    corr_species, _ = model.speciesMatchWith(
+        species_ids=pathway.get_species_ids(),
+        compartment_id=compartment_id
+    )
+    connector_species = set(corr_species.values())
+    for rxn_id in blocked_rxn_ids:
+        rxn = model.getModel().getReaction(rxn_id)
+        if rxn is None:
+            continue
+        if any(
+            spe_ref.getSpecies() in connector_species
+            for spe_ref in list(rxn.getListOfReactants()) + list(rxn.getListOfProducts())
+        ):
+            protected_rxn_ids.add(rxn_id)
+
+    rxn_ids = [
+        rxn_id for rxn_id in blocked_rxn_ids
+        if rxn_id not in protected_rxn_ids
+    ]
+    removed_species = model.remove_reactions(rxn_ids)
+    logger.info(
+        f"Model reduced by {len(rxn_ids)} reaction(s) and {len(removed_species)} species"
+    )
+
+    return rxn_ids
+
+
 def runFBA_fromFile(
     model_file: str,
     compartment_id: str,
@@ -7,6 +7,13 @@ Created on Sep 09 2020
 from rptools.rplibs.rpPathway import rpPathway
 from rptools.rplibs.rpSBML import rpSBML
 from rptools.rplibs.rpGraph import rpGraph
+from rptools.rplibs.rpSparseGraph import rpSparseGraph
 from rptools.rplibs.rpReaction import rpReaction
 from rptools.rplibs.rpCompound import rpCompound
+from rptools.rplibs.rpSBMLReader import (
+    read_pathway_record,
+    get_pathway_reactions,
+    get_ec_numbers,
+    get_global_score
+)
 # __all__ = ['rpSBML', 'rpGraph', 'inchikeyMIRIAM']
@@ -0,0 +1,144 @@
+"""Compact binary serialization of pathways.
+
+Pathways are stored as plain Python structures (dict, list, str,
+numbers...) pickled with protocol 5, together with a format name and
+a schema version. Loading never imports nor calls any code stored into
+the file: only builtin containers and scalars are accepted.
+"""
+from pickle import (
+    Unpickler,
+    UnpicklingError,
+    dump as pickle_dump
+)
+from logging import (
+    Logger,
+    getLogger
+)
+from typing import (
+    Dict,
+    TypeVar
+)
+from numpy import (
+    generic as np_generic,
+    ndarray as np_ndarray
+)
+
+
+# Name and version of the schema of the stored pathway.
+# Increment the version when the layout of the record changes.
+BINARY_FORMAT = 'rpPathway'
+BINARY_VERSION = 1
+BINARY_EXT = '.rpbin'
+# First bytes of a pickle protocol 5 stream
+_PICKLE5_MAGIC = b'\x80\x05'
+
+
+class BinaryFormatError(Exception):
+    pass
+
+
+class _RecordUnpickler(Unpickler):
+    """Unpickler refusing any global (class, function...)."""
+
+    def find_class(self, module: str, name: str):
+        raise UnpicklingError(
+            f'Forbidden global {module}.{name} in pathway file'
+        )
+
+
+def to_builtin(value: TypeVar) -> TypeVar:
+    """Return a copy of value where numpy scalars and arrays
+    (e.g. FBA fluxes read from pandas objects) are replaced
+    by builtin types, so that the loader accepts them.
+
+    :param value: Plain structure, possibly holding numpy objects
+
+    :type value: TypeVar
+
+    :rtype: TypeVar
+    :return: The same structure made of builtin types only
+    """
+    if isinstance(value, dict):
+        return {k: to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return type(value)(to_builtin(v) for v in value)
+    if isinstance(value, np_generic):
+        return value.item()
+    if isinstance(value, np_ndarray):
+        return value.tolist()
+    return value
+
+
+def is_binary_file(filename: str) -> bool:
+    """Return True if the file is a binary pathway.
+
+    :param filename: Path to the file
+
+    :type filename: str
+
+    :rtype: bool
+    :return: True if the file starts as a pickle protocol 5 stream
+    """
+    try:
+        with open(filename, 'rb') as fp:
+            return fp.read(2) == _PICKLE5_MAGIC
+    except (OSError, TypeError):
+        return False
+
+
+def write_binary(
+    record: Dict,
+    filename: str,
+    logger: Logger = getLogger(__name__)
+) -> None:
+    """Write a pathway record into a binary file.
+
+    :param record: The pathway record (see rpPathway.to_record())
+    :param filename: Path to the output file
+
+    :type record: dict
+    :type filename: str
+    """
+    logger.debug(f'Writing binary pathway into {filename}...')
+    with open(filename, 'wb') as fp:
+        pickle_dump(
+            {
+                'format': BINARY_FORMAT,
+                'version': BINARY_VERSION,
+                'pathway': record
+            },
+            fp,
+            protocol=5
+        )
+
+
+def read_binary(
+    filename: str,
+    logger: Logger = getLogger(__name__)
+) -> Dict:
+    """Read a pathway record from a binary file.
+
+    :param filename: Path to the input file
+
+    :type filename: str
+
+    :rtype: dict
+    :return: The pathway record
+    """
+    logger.debug(f'Reading binary pathway from {filename}...')
+    with open(filename, 'rb') as fp:
+        try:
+            data = _RecordUnpickler(fp).load()
+        except (UnpicklingError, EOFError) as e:
+            raise BinaryFormatError(f'{filename}: {e}')
+    if (
+        not isinstance(data, dict)
+        or data.get('format') != BINARY_FORMAT
+    ):
+        raise BinaryFormatError(f'{filename}: not a binary pathway file')
+    if data.get('version') != BINARY_VERSION:
+        raise BinaryFormatError(
+            f'{filename}: unsupported version {data.get("version")} '
+            f'(expected {BINARY_VERSION})'
+        )
+    return data['pathway']
@@ -5,7 +5,9 @@ import os
 import itertools
 import numpy as np
 import random
+from collections import deque
 from typing import(
+    Dict,
     List,
     Callable
 )
@@ -258,196 +260,125 @@ class rpGraph:
         )
 
 
-    ## Recursive function that finds the order of the reactions in the graph
-    #
-    # NOTE: only works for linear pathways... need to find a better way ie. Tree's
-    #
-    def _recursiveReacSuccessors(self, node_name, reac_list, all_res, num_reactions):
-        current_reac_list = [i for i in reac_list]
-        self.logger.debug('-------- '+str(node_name)+' --> '+str(reac_list)+' ----------')
-        succ_node_list = [i for i in self.G.successors(node_name)]
-        flat_reac_list = [i for sublist in reac_list for i in sublist]
-        self.logger.debug('flat_reac_list: '+str(flat_reac_list))
-        self.logger.debug('current_reac_list: '+str(current_reac_list))
-        if len(flat_reac_list)==num_reactions:
-            self.logger.debug('Returning')
-            #return current_reac_list
-            all_res.append(current_reac_list)
-            return all_res
-        self.logger.debug('succ_node_list: '+str(succ_node_list))
-        if not succ_node_list==[]:
-            #can be multiple reactions at a given step
-            multi_reac = []
-            for n_n in succ_node_list:
-                n = self.G.nodes.get(n_n)
-                if n['type']=='reaction':
-                    if not n_n in flat_reac_list:
-                        multi_reac.append(n_n)
-            #remove the ones that already exist
-            self.logger.debug('multi_reac: '+str(multi_reac))
-            multi_reac = [x for x in multi_reac if x not in flat_reac_list]
-            self.logger.debug('multi_reac: '+str(multi_reac))
-            if multi_reac:
-                current_reac_list.append(multi_reac)
-            self.logger.debug('current_reac_list: '+str(current_reac_list))
-            #loop through all the possibilities
-            for n_n in succ_node_list:
-                n = self.G.nodes.get(n_n)
-                if n['type']=='reaction':
-                    if n_n in multi_reac:
-                        self._recursiveReacSuccessors(n_n, current_reac_list, all_res, num_reactions)
-                elif n['type']=='species':
-                    if n['rp_trunk_species']==True:
-                        self._recursiveReacSuccessors(n_n, current_reac_list, all_res, num_reactions)
-        return all_res
-
-
-    ##
-    #
-    # NOTE: only works for linear pathways... need to find a better way
-    #
-    def _recursiveReacPredecessors(self, node_name, reac_list, all_res, num_reactions):
-        current_reac_list = [i for i in reac_list]
-        self.logger.debug('-------- '+str(node_name)+' --> '+str(reac_list)+' ----------')
-        pred_node_list = [i for i in self.G.predecessors(node_name)]
-        flat_reac_list = [i for sublist in reac_list for i in sublist]
-        self.logger.debug('flat_reac_list: '+str(flat_reac_list))
-        self.logger.debug('current_reac_list: '+str(current_reac_list))
-        if len(flat_reac_list)==num_reactions:
-            self.logger.debug('Returning')
-            #return current_reac_list
-            all_res.append(current_reac_list)
-            return all_res
-
-            #can be multiple reactions at a given step
-            multi_reac = []
-            for n_n in pred_node_list:
-                n = self.G.nodes.get(n_n)
-                if n['type']=='reaction':
-                    if not n_n in flat_reac_list:
-                        multi_reac.append(n_n)
-            #remove the ones that already exist
-            self.logger.debug('multi_reac: '+str(multi_reac))
-            multi_reac = [x for x in multi_reac if x not in flat_reac_list]
-            self.logger.debug('multi_reac: '+str(multi_reac))
-            if multi_reac:
-                current_reac_list.append(multi_reac)
-            self.logger.debug('current_reac_list: '+str(current_reac_list))
-            #loop through all the possibilities
-            for n_n in pred_node_list:
-                n = self.G.nodes.get(n_n)
-                if n['type']=='reaction':
-                    if n_n in multi_reac:
-                        self._recursiveReacPredecessors(n_n, current_reac_list, all_res, num_reactions)
-                elif n['type']=='species':
-                    if n['rp_trunk_species']==True:
-                        self._recursiveReacPredecessors(n_n, current_reac_list, all_res, num_reactions)
-        return all_res
-
-
-    '''
-    def _recursiveHierarchy(self, node_name, num_nodes, ranked_nodes):
-        self.G.successors(node_name)
-    '''
-
     ######################################################################################################
     ########################################## Public Function ###########################################
     ######################################################################################################
 
 
-    def _recursiveReacPredecessors(self, node_name, reac_list):
-        """Return the next linear predecessors
+    @staticmethod
+    def reaction_steps(
+        reactions: Dict[str, Dict],
+        species: List[str] = None,
+        logger: logging.Logger = logging.getLogger(__name__)
+    ) -> Dict[str, int]:
+        """Return the step of each reaction of a pathway, in topological order
 
-        Better than before, however bases itself on the fact that central species do not have multiple predesessors
-        if that is the case then the algorithm will return badly ordered reactions
+        A reaction comes after the reactions producing its reactants. Reactions
+        with no predecessor are at step 1, the others one step after their last
+        predecessor, so that parallel branches of a pathway share the same steps.
+        Reactions are sorted iteratively (Kahn's algorithm) in O(V+E). If the
+        pathway has cycles, the reaction with the fewest unsorted predecessors
+        is released first.
 
-        :param node_name: The id of the starting node
-        :param reac_list: The list of reactions that already have been run
+        :param reactions: Reactants ('left') and products ('right') per reaction ID (e.g. the reactions of rplibs.read_pathway_record())
+        :param species: The species linking the reactions, e.g. the central species (Default: all, cofactors included)
 
-        :type node_name: str
-        :type reac_list: list
+        :type reactions: Dict[str, Dict]
+        :type species: List[str]
 
-        :return: List of node ids
-        :rtype: list
+        :return: Step per reaction ID
+        :rtype: dict
+        """
+        if species is not None:
+            species = set(species)
+        producers = {}
+        for rxn_id, rxn in reactions.items():
+            for spe_id in rxn['right']:
+                if species is None or spe_id in species:
+                    producers.setdefault(spe_id, []).append(rxn_id)
+        successors = {rxn_id: [] for rxn_id in reactions}
+        nb_predecessors = {}
+        for rxn_id, rxn in reactions.items():
+            predecessors = set(
+                pred_id
+                for spe_id in rxn['left']
+                for pred_id in producers.get(spe_id, [])
+                if pred_id != rxn_id
+            )
+            nb_predecessors[rxn_id] = len(predecessors)
+            for pred_id in predecessors:
+                successors[pred_id].append(rxn_id)
+
+        steps = {rxn_id: 1 for rxn_id in reactions}
+        ordered = {}
+        queue = deque(
+            rxn_id for rxn_id in reactions
+            if nb_predecessors[rxn_id] == 0
+        )
+        while len(ordered) < len(reactions):
+            if not queue:
+                rxn_id = min(
+                    (rxn_id for rxn_id in reactions if rxn_id not in ordered),
+                    key=lambda rxn_id: nb_predecessors[rxn_id]
+                )
+                logger.warning(f'Cycle in the pathway, releasing reaction {rxn_id}')
+                queue.append(rxn_id)
+            rxn_id = queue.popleft()
+            if rxn_id in ordered:
+                continue
+            ordered[rxn_id] = steps[rxn_id]
+            for succ_id in successors[rxn_id]:
+                if succ_id in ordered:
+                    continue
+                steps[succ_id] = max(steps[succ_id], steps[rxn_id]+1)
+                nb_predecessors[succ_id] -= 1
+                if nb_predecessors[succ_id] == 0:
+                    queue.append(succ_id)
+
+        return dict(sorted(ordered.items(), key=lambda item: item[1]))
+
+
+    def orderedReactionSteps(self) -> Dict[str, int]:
+        """Public function to return the step of each reaction of the pathway (see reaction_steps())
+
+        :return: Step per reaction ID, in topological order
+        :rtype: dict
         """
-        self.logger.debug('-------- '+str(node_name)+' --> '+str(reac_list)+' ----------')
-        pred_node_list = [i for i in self.G.predecessors(node_name)]
-        self.logger.debug(pred_node_list)
-        if pred_node_list==[]:
-            return reac_list
-        for n_n in pred_node_list:
-            n = self.G.nodes.get(n_n)
-            if n['type']=='reaction':
-                if n_n in reac_list:
-                    return reac_list
-                else:
-                    reac_list.append(n_n)
-                    self._recursiveReacPredecessors(n_n, reac_list)
-            elif n['type']=='species':
-                if n['rp_trunk_species']==True:
-                    self._recursiveReacPredecessors(n_n, reac_list)
-                else:
-                    return reac_list
-        return reac_list
-
-
-    def orderedRetroReactions(self):
-        """Public function to return the linear list of reactions
+        reactions = {
+            node_id: {
+                'left': list(self.G.predecessors(node_id)),
+                'right': list(self.G.successors(node_id))
+            }
+            for node_id, node in self.G.nodes(data=True)
+            if node.get('type') == 'reaction' and node.get('rp_pathway')
+        }
+        # Link reactions through the central species only,
+        # cofactors would create false cycles
+        central_species = self.rpsbml.getGroup(self.central_species_group_id)
+        species = None
+        if central_species is not None:
+            species = [
+                member.getIdRef()
+                for member in central_species.getListOfMembers()
+            ] or None
+        return rpGraph.reaction_steps(
+            reactions,
+            species=species,
+            logger=self.logger
+        )
+
+
+    def orderedRetroReactions(self) -> List[str]:
+        """Public function to return the ordered list of reactions
 
         :return: List of node ids
         :rtype: list
         """
-        #Note: may be better to loop tho
-        for prod_spe in self._onlyProducedSpecies():
-            self.logger.debug('Testing '+str(prod_spe))
-            ordered = self._recursiveReacPredecessors(prod_spe, [])
-            self.logger.debug(ordered)
-            if len(ordered)==self.num_reactions:
-                return [i for i in reversed(ordered)]
-        self.logger.error('Could not find the full ordered reactions')
-        return []
+        return list(self.orderedReactionSteps())
+
 
     ############################# graph analysis ################################
 
 
     def exportJSON(self):
         return json_graph.node_link_data(self.G)
-
-
-    ## Warning that this search algorithm only works for mono-component that are not networks (i.e where reactions follow each other)
-    # DEPRECATED: this is linear
-    # NOTE: only works for linear pathways... need to find a better way
-    #
-    def orderedRetroReactions(self):
-        #Note: may be better to loop tho
-        succ_res = []
-        for cons_cent_spe in self._onlyConsumedSpecies():
-            res = self._recursiveReacSuccessors(cons_cent_spe, [], [], self.num_reactions)
-            if res:
-                self.logger.debug(res)
-                if len(res)==1:
-                    succ_res = res[0]
-                else:
-                    self.logger.error('Multiple successors results: '+str(res))
-            else:
-                self.logger.warning('Successors no results')
-        prod_res = []
-        for prod_cent_spe in self._onlyProducedSpecies():
-            res = self._recursiveReacPredecessors(prod_cent_spe, [], [], self.num_reactions)
-            if res:
-                self.logger.debug(res)
-                if len(res)==1:
-                    prod_res = [i for i in reversed(res[0])]
-                else:
-                    self.logger.error('Mutliple predecessors results: '+str(res))
-            else:
-                self.logger.warning('Predecessors no results')
-        if succ_res and prod_res:
-            if not succ_res==prod_res:
-                self.logger.warning('Both produce results and are not the same')
-                self.logger.warning('succ_res: '+str(succ_res))
-                self.logger.warning('prod_res: '+str(prod_res))
-            else:
-                self.logger.debug('Found solution: '+str(succ_res))
-                return succ_res
-        return []
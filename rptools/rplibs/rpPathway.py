@@ -49,6 +49,13 @@ from .rpReaction import (
 )
 from .rpCompound import rpCompound
 from .rpObject import rpObject
+from .rpBinary import (
+    BINARY_EXT,
+    is_binary_file,
+    read_binary,
+    to_builtin,
+    write_binary
+)
 
 
 class rpPathway(Pathway, rpObject):
@@ -82,13 +89,20 @@ class rpPathway(Pathway, rpObject):
         id: str
             ID of the reaction
         infile: str
-            Path to the input file (SBML)
+            Path to the input file (SBML or binary, see to_binary())
         cache: Cache, optional
             Cache to store compounds once over reactions
         logger : Logger, optional
         """
-        self.__rpsbml = rpSBML(inFile=infile, logger=logger)
-        id = id if id else self.get_rpsbml().getName()
+        record = None
+        if infile and is_binary_file(infile):
+            record = read_binary(infile, logger)
+            # The SBML document is only built on demand (see to_rpSBML())
+            self.__rpsbml = rpSBML(logger=logger)
+            id = id if id else record['id']
+        else:
+            self.__rpsbml = rpSBML(inFile=infile, logger=logger)
+            id = id if id else self.get_rpsbml().getName()
         Pathway.__init__(
             self,
             id=id,
@@ -122,7 +136,9 @@ class rpPathway(Pathway, rpObject):
         # Additional names for methods
         self.get_sink = self.get_sink_species
         self.set_sink = self.set_sink_species
-        if infile:
+        if record is not None:
+            self.__import_record(record, logger)
+        elif infile:
             self.__import_rpSBML(self.__rpsbml)
 
     def _to_dict(
@@ -675,7 +691,8 @@ class rpPathway(Pathway, rpObject):
             )
 
         ## SPECIES
-        for spe_id, spe in rpsbml.read_species().items():
+        # MIRIAM annotations of species are not imported, do not decode them
+        for spe_id, spe in rpsbml.read_species(lazy=True).items():
             infos = {}
             for key in ['smiles', 'inchi', 'inchikey']:
                 try:
@@ -726,6 +743,140 @@ class rpPathway(Pathway, rpObject):
                     self
                 )
 
+    def to_record(self) -> Dict:
+        """Convert the current rpPathway object into a record made
+        of plain Python structures only, with the same content
+        than the one written by to_rpSBML().
+
+        Returns
+        -------
+        record: Dict
+            'id', 'compartments', 'unit_defs', 'parameters',
+            'pathway' (pathway infos), 'groups' (members of each group),
+            'species' and 'reactions' (as read from rpSBML)
+        """
+        species = {}
+        for specie in self.get_species():
+            if not isinstance(specie, rpCompound):
+                specie = rpCompound.from_compound(specie)
+            species[specie.get_id()] = {
+                'name': specie.get_name(),
+                'compartment': specie.get_compartment(),
+                'brsynth': {
+                    'smiles': specie.get_smiles() or '',
+                    'inchi': specie.get_inchi() or '',
+                    'inchikey': specie.get_inchikey() or '',
+                    **self.get_specie(specie.get_id())._to_dict(full=False)
+                },
+                'miriam': []
+            }
+
+        reactions = {}
+        for rxn in self.get_list_of_reactions():
+            reactions[rxn.get_id()] = {
+                'brsynth': {
+                    'smiles': rxn.get_smiles(),
+                    **rxn._to_dict(full=False)
+                },
+                'left': dict(rxn.get_reactants()),
+                'right': dict(rxn.get_products()),
+                'miriam': [
+                    f'http://identifiers.org/ec-code/{ec}'
+                    for ec in rxn.get_ec_numbers() if ec != ''
+                ],
+                'fbc_lower_value': rxn.get_fbc_lower(),
+                'fbc_upper_value': rxn.get_fbc_upper(),
+                'fbc_units': rxn.get_fbc_units(),
+                'reversible': rxn.reversible()
+            }
+
+        # Copy without numpy objects, refused when reading binary files
+        return to_builtin({
+            'id': self.get_id(),
+            'compartments': self.get_compartments(),
+            'unit_defs': self.get_unit_defs(),
+            'parameters': self.get_parameters(),
+            'pathway': {
+                **rpObject._to_dict(self),
+                'global_score': self.get_global_score()
+            },
+            'groups': {
+                'rp_pathway': self.get_reactions_ids(),
+                **{
+                    f'rp_{group_id}_species': list(group_members)
+                    for group_id, group_members in self.get_species_groups().items()
+                }
+            },
+            'species': species,
+            'reactions': reactions
+        })
+
+    def __import_record(
+        self,
+        record: Dict,
+        logger: Logger = getLogger(__name__)
+    ) -> None:
+        """Fill the rpPathway object from a record
+        (see to_record()).
+
+        Parameters
+        ----------
+        record: Dict
+            Record to import
+        logger : Logger, optional
+        """
+        ## COMPARTMENTS
+        for comp_id, comp in record['compartments'].items():
+            self.add_compartment(
+                id=comp_id,
+                name=comp['name'],
+                annot=comp['annot']
+            )
+
+        ## UNIT DEFINITIONS, PARAMETERS
+        self.set_unit_defs(record['unit_defs'])
+        self.set_parameters(record['parameters'])
+
+        ## SPECIES
+        for spe_id, spe in record['species'].items():
+            compound = rpCompound(
+                id=spe_id,
+                smiles=spe['brsynth'].get('smiles', ''),
+                inchi=spe['brsynth'].get('inchi', ''),
+                inchikey=spe['brsynth'].get('inchikey', ''),
+                compartment_id=spe['compartment']
+            )
+            write_to(spe['brsynth'], compound)
+
+        ## REACTIONS
+        for rxn_id, rxn_infos in record['reactions'].items():
+            reaction, target_id = rpReaction.build(
+                rxn_id,
+                deepcopy(rxn_infos),
+                logger
+            )
+            self.add_reaction(
+                rxn=reaction,
+                target_id=target_id
+            )
+
+        ## GROUPS
+        write_to(record['pathway'], self)
+        for group_id, members in record['groups'].items():
+            if group_id != 'rp_pathway':
+                write_to({group_id: members}, self)
+
+    def to_binary(self, outfile: str) -> None:
+        """Write the pathway into a compact binary file
+        which can be read back by rpPathway(infile=...).
+
+        Parameters
+        ----------
+        outfile: str
+            Path to the output file
+        """
+        write_binary(self.to_record(), outfile, self.get_logger())
+
     def get_rpsbml(self) -> rpSBML:
         """Get the rpSBML object."""
         return self.__rpsbml
@@ -959,5 +1110,9 @@ class rpPathway(Pathway, rpObject):
         )
 
     def write_to_file(self, outfile: str) -> None:
-        """Write the pathway into a SBML file."""
-        self.to_rpSBML().write_to_file(outfile)
\ No newline at end of file
+        """Write the pathway into a SBML file, or into a binary
+        file if the extension of outfile is BINARY_EXT."""
+        if outfile.endswith(BINARY_EXT):
+            self.to_binary(outfile)
+        else:
+            self.to_rpSBML().write_to_file(outfile)
\ No newline at end of file
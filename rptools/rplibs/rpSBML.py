@@ -4,6 +4,7 @@ import numpy as np
 
 from copy import deepcopy
 from filetype import guess
+from gzip import open as gzip_open
 from hashlib import sha256
 #from math import isnan
 from pandas import (
@@ -33,13 +34,19 @@ from typing import (
     Dict,
     Tuple,
     TypeVar,
+    Callable,
 #    Union
 )
 from tempfile import (
     NamedTemporaryFile,
-    TemporaryDirectory,
 #    gettempdir,
 )
+from time import perf_counter
+from ast import literal_eval
+from collections.abc import Mapping
+from functools import lru_cache
+from math import isfinite
+from scipy.optimize import linear_sum_assignment
 import cobra
 from cobra import (
     io as cobra_io
@@ -54,10 +61,6 @@ from cobra.medium.annotations import (
     sbo_terms
 )
 
-from brs_utils import(
-    extract_gz,
-)
-from .rpGraph import rpGraph
 
 ## @package RetroPath SBML writer
 # Documentation for SBML representation of the different model
@@ -79,6 +82,163 @@ def err_code(code: int) -> str:
     return codes.get(code, f'Unknown code {code}')
 
 
+# Keywords that eval() used to resolve within annotation values
+_LITERAL_KEYWORDS = {
+    'True': True,
+    'False': False,
+    'None': None,
+}
+# First characters of values that may be Python containers or quoted strings
+_LITERAL_STARTS = frozenset('[{(\'"')
+# First characters of values that may be numbers
+_NUMBER_STARTS = frozenset('0123456789+-.')
+
+
+def parse_annotation_value(value: str) -> TypeVar:
+    """Return the typed value of a BRSynth annotation attribute.
+
+    Numbers, booleans and None are converted, Python literals
+    (lists, dicts, tuples, quoted strings) are parsed without evaluating
+    any code and every other value (SMILES, InChI, IDs, 'NaN'...) is returned
+    as a string.
+
+    :param value: The raw value of the annotation attribute
+
+    :type value: str
+
+    :rtype: TypeVar
+    :return: The typed value
+    """
+    if not value:
+        return str(value)
+    if value[0] in _LITERAL_STARTS:
+        # Containers are mutable, do not share them through the cache
+        try:
+            return literal_eval(value)
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+            return str(value)
+    return _parse_scalar(value)
+
+
+@lru_cache(maxsize=4096)
+def _parse_scalar(value: str) -> TypeVar:
+    if value in _LITERAL_KEYWORDS:
+        return _LITERAL_KEYWORDS[value]
+    if value[0] not in _NUMBER_STARTS:
+        return value
+    digits = value.lstrip('+-')
+    if len(digits) > 1 and digits[0] == '0' and digits.isdigit():
+        # Leading zeros are not valid Python integers (e.g. '007')
+        return value if digits.strip('0') else 0
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        # float() also accepts 'nan', 'inf'... which eval() did not
+        f = float(value)
+        return f if isfinite(f) else value
+    except ValueError:
+        return value
+
+
+class LazyRecord(Mapping):
+    """Read-only mapping whose fields can be decoded on first access.
+
+    Eager fields are stored as is, lazy ones are given as callables
+    which are called once, when the field is first read, and whose result
+    is cached.
+
+    :param fields: Fields already decoded
+    :param loaders: Callables returning the value of the lazy fields
+
+    :type fields: dict
+    :type loaders: dict
+    """
+    __slots__ = ('_fields', '_loaders')
+
+    def __init__(
+        self,
+        fields: Dict = None,
+        loaders: Dict[str, Callable] = None
+    ) -> 'LazyRecord':
+        self._fields = dict(fields) if fields else {}
+        self._loaders = dict(loaders) if loaders else {}
+
+    def __getitem__(self, key: str) -> TypeVar:
+        try:
+            return self._fields[key]
+        except KeyError:
+            loader = self._loaders.pop(key)
+            self._fields[key] = loader()
+            return self._fields[key]
+
+    def __iter__(self):
+        yield from self._fields
+        # Copy since iterating may decode fields
+        yield from list(self._loaders)
+
+    def __len__(self) -> int:
+        return len(self._fields) + len(self._loaders)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._fields or key in self._loaders
+
+    def is_decoded(self, key: str) -> bool:
+        """Return True if the field has already been decoded."""
+        return key in self._fields
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({dict(self)})'
+
+
+def _build_compartment_synonyms() -> Tuple[Dict[str, str], Dict[str, Tuple[str]]]:
+    """Return the canonical compartment of each lower-cased synonym
+    of cobra's compartment_shortlist, and the synonyms of each canonical
+    compartment (long names first, then the short one).
+    """
+    canonicals = {}
+    synonyms = {}
+    for c_short, c_long in compartment_shortlist.items():
+        synonyms[c_short] = tuple(dict.fromkeys(
+            [x.lower() for x in c_long] + [c_short.lower()]
+        ))
+        for synonym in synonyms[c_short]:
+            # The first compartment listed wins
+            canonicals.setdefault(synonym, c_short)
+    return canonicals, synonyms
+
+
+# Lower-cased synonym -> canonical compartment,
+# canonical compartment -> lower-cased synonyms
+COMPARTMENT_CANONICALS, COMPARTMENT_SYNONYMS = _build_compartment_synonyms()
+
+
+# Ways to compare the query of search_specie() and search_reaction()
+# with IDs and names of model elements:
+#   - exact: equality
+#   - ignorecase: case-insensitive equality
+#   - regex: re.search() of the query, case-insensitive
+SEARCH_MODES = ['exact', 'ignorecase', 'regex']
+# Number of regex queries remembered per list of elements
+SEARCH_CACHE_SIZE = 1024
+# Ways to match the rows and columns of a similarity matrix
+# in _findUniqueRowColumn():
+#   - greedy: unique top scores first, then per column
+#   - hungarian: maximum-weight assignment (linear_sum_assignment())
+ASSIGNMENT_METHODS = ['greedy', 'hungarian']
+
+
+# Levels of validation of merged documents:
+#   - none: no validation
+#   - structural: IDs uniqueness and references of copied elements
+#   - full: libSBML validator on the whole document
+VALIDATION_LEVELS = ['none', 'structural', 'full']
+# Number of skeleton documents (model, unit definitions
+# and compartments) kept by genericModel()
+SKELETON_CACHE_SIZE = 16
+
+
 ##################################################################
 ############################### rpSBML ###########################
 ##################################################################
@@ -88,11 +248,16 @@ class rpSBML:
 
     """This class uses the libSBML object and handles it by adding BRSynth annotation
     """
+
+    # Skeleton documents built by genericModel(), per definitions
+    _skeletons = {}
+
     def __init__(
         self,
         inFile: str = None,
         rpsbml: 'rpSBML' = None,
         name: str = None,
+        check: bool = True,
         logger: Logger = getLogger(__name__)
     ) -> 'rpSBML':
         """Constructor for the rpSBML class
@@ -102,10 +267,12 @@ class rpSBML:
         :param modelName: The Name of the model
         :param document: The libSBML document class (Default: None)
         :param inFile: The path of a SBML file (Default: '')
+        :param check: Validate the document cloned from rpsbml (Default: True)
 
         :type modelName: str
         :type path: str
         :type document: libsbml.SBMLDocument
+        :type check: bool
         """
 
         # logger
@@ -130,14 +297,14 @@ class rpSBML:
                 self.logger.error(f'{e}')
                 self.logger.error('Exiting...')
                 exit()
-            with TemporaryDirectory() as temp_d:
-                if kind:
-                    self.logger.debug(f'inFile is detected as {kind}')
-                    if kind.mime == 'application/gzip':
-                        infile = extract_gz(inFile, temp_d)
-                self.logger.debug(f'Reading {infile} file...')
-                self.readSBML(infile)
-                self.logger.debug('File READ')
+            if kind:
+                self.logger.debug(f'inFile is detected as {kind}')
+            self.logger.debug(f'Reading {infile} file...')
+            self.readSBML(
+                infile,
+                compressed=bool(kind) and kind.mime == 'application/gzip'
+            )
+            self.logger.debug('File READ')
         else:
             if rpsbml is None:
                 self.document = None
@@ -146,11 +313,22 @@ class rpSBML:
                 self.document = rpsbml.getDocument().clone()
                 self.logger.debug(f'SBMLDocument CLONED')
 
-        if rpsbml is not None and not self.checkSBML():
+        if rpsbml is not None and check and not self.checkSBML():
             self.logger.error('SBML document not valid')
             self.logger.error('Exiting...')
             exit()
 
+        # undo log (see checkpoint())
+        self._journal = None
+        # species lookup index (see get_species_index())
+        self._species_index = None
+        # number of reactions per species (see get_species_degrees())
+        self._species_degrees = None
+        # reactions per signature (see get_reaction_index())
+        self._reaction_index = None
+        # species and reactions per ID and name (see _get_search_index())
+        self._search_index = {}
+
         # model name
         self.logger.debug('Setting name...')
         self.setName(name if name else self.getName())
@@ -233,10 +411,232 @@ class rpSBML:
 
     def checkSBML(self) -> bool:
         self.logger.debug('Checking SBML format...')
+        start = perf_counter()
         try:
             return libsbml.SBMLValidator().validate(self.getDocument()) == 0
         except (ValueError, TypeError):
             return False
+        finally:
+            self.logger.debug(f'SBML format checked in {perf_counter()-start:.3f}s')
+
+
+    def _get_lists_of_elements(self) -> Dict[str, libsbml.ListOf]:
+        """Return the lists of SBML elements that are handled by merge()
+        """
+        model = self.getModel()
+        lists = {
+            'unit_definitions': model.getListOfUnitDefinitions(),
+            'compartments': model.getListOfCompartments(),
+            'parameters': model.getListOfParameters(),
+            'species': model.getListOfSpecies(),
+            'reactions': model.getListOfReactions(),
+        }
+        groups_plugin = model.getPlugin('groups')
+        if groups_plugin is not None:
+            lists['groups'] = groups_plugin.getListOfGroups()
+        fbc_plugin = model.getPlugin('fbc')
+        if fbc_plugin is not None:
+            lists['objectives'] = fbc_plugin.getListOfObjectives()
+            lists['gene_products'] = fbc_plugin.getListOfGeneProducts()
+        return lists
+
+
+    def count_elements(self) -> Dict[str, int]:
+        """Return the number of elements of each list handled by merge(),
+        to be given later to check_structure()
+
+        :return: Number of elements per list
+        :rtype: Dict[str, int]
+        """
+        return {
+            name: lst.size()
+            for name, lst in self._get_lists_of_elements().items()
+        }
+
+
+    def checkpoint(self) -> None:
+        """Start recording the modifications of the document
+        so that they can be undone later with rollback().
+
+        Elements appended to the lists of the model (species, reactions,
+        groups, objectives...), members appended to the existing groups,
+        BRSynth annotations written on existing elements, model ID and name
+        and active objective are restored.
+        """
+        fbc_plugin = self.getModel().getPlugin('fbc')
+        self._journal = {
+            'counts': self.count_elements(),
+            'members': {
+                group.getId(): group.getNumMembers()
+                for group in self.getListOfGroups()
+            } if self.getModel().getPlugin('groups') is not None else {},
+            'annotations': {},
+            'model_id': self.getModel().getId(),
+            'model_name': self.getModel().getName(),
+            'active_objective': fbc_plugin.getActiveObjectiveId() if fbc_plugin is not None else '',
+            # Lookup tables are valid again after rollback
+            'caches': {
+                '_species_index': self._species_index,
+                '_species_degrees': self._species_degrees,
+                '_reaction_index': {
+                    'nb_reactions': self._reaction_index['nb_reactions'],
+                    'index': dict(self._reaction_index['index'])
+                } if self._reaction_index is not None else None,
+                '_search_index': dict(self._search_index),
+            },
+        }
+        self.logger.debug(f'Checkpoint: {self._journal["counts"]}')
+
+
+    def _journal_annotation(self, sbase_obj: libsbml.SBase) -> None:
+        """Save the annotation of an element before it is modified,
+        if a checkpoint is set.
+        """
+        if self._journal is None or not sbase_obj.isSetId():
+            return
+        annotations = self._journal['annotations']
+        if sbase_obj.getId() not in annotations:
+            annot = sbase_obj.getAnnotation()
+            annotations[sbase_obj.getId()] = annot.clone() if annot is not None else None
+
+
+    def rollback(self) -> None:
+        """Undo the modifications made on the document since the last call to checkpoint().
+        """
+        if self._journal is None:
+            self.logger.warning('No checkpoint set, nothing to rollback')
+            return
+        start = perf_counter()
+        model = self.getModel()
+
+        # Remove appended elements
+        counts = self._journal['counts']
+        for name, lst in self._get_lists_of_elements().items():
+            count = counts.get(name, 0)
+            for i in reversed(range(count, lst.size())):
+                lst.remove(i)
+        # Remove appended group members
+        for group_id, count in self._journal['members'].items():
+            group = self.getGroup(group_id)
+            if group is None:
+                continue
+            for i in reversed(range(count, group.getNumMembers())):
+                group.removeMember(i)
+        # Restore annotations of former elements
+        for sbase_id, annot in self._journal['annotations'].items():
+            sbase_obj = model.getElementBySId(sbase_id)
+            if sbase_obj is None:
+                continue
+            current_annot = sbase_obj.getAnnotation()
+            if annot is None:
+                sbase_obj.unsetAnnotation()
+            elif current_annot is None:
+                sbase_obj.setAnnotation(annot)
+            else:
+                # Restore the content in place, setAnnotation() would
+                # rewrite the RDF part (and its namespaces) from the CV terms
+                current_annot.removeChildren()
+                for i_child in range(annot.getNumChildren()):
+                    current_annot.addChild(annot.getChild(i_child))
+        model.setId(self._journal['model_id'])
+        model.setName(self._journal['model_name'])
+        fbc_plugin = model.getPlugin('fbc')
+        if fbc_plugin is not None and self._journal['active_objective']:
+            fbc_plugin.setActiveObjectiveId(self._journal['active_objective'])
+
+        for attr, cache in self._journal['caches'].items():
+            setattr(self, attr, cache)
+
+        self._journal = None
+        self.logger.debug(f'Rollback done in {perf_counter()-start:.3f}s')
+
+
+    def check_structure(self, counts: Dict[str, int]) -> bool:
+        """Cheap structural validation of the elements appended to the model
+        since counts have been taken (see count_elements()), i.e.:
+            - IDs of new elements are unique,
+            - species and compartments referenced by new elements exist.
+
+        :param counts: Number of elements per list before the modifications
+
+        :type counts: Dict[str, int]
+
+        :return: True if the new elements are structurally valid
+        :rtype: bool
+        """
+        self.logger.debug('Checking SBML structure...')
+        start = perf_counter()
+
+        lists = self._get_lists_of_elements()
+
+        # Split elements between the ones that were there before
+        # and the new ones
+        old_ids = {}
+        new_elts = {}
+        for name, lst in lists.items():
+            count = counts.get(name, 0)
+            old_ids[name] = set(lst.get(i).getId() for i in range(count))
+            new_elts[name] = [lst.get(i) for i in range(count, lst.size())]
+
+        valid = True
+
+        # IDs uniqueness (unit definitions have their own namespace)
+        sids = set().union(*[
+            ids for name, ids in old_ids.items()
+            if name != 'unit_definitions'
+        ])
+        unit_ids = old_ids['unit_definitions']
+        for name, elts in new_elts.items():
+            ids = unit_ids if name == 'unit_definitions' else sids
+            for elt in elts:
+                if elt.getId() in ids:
+                    self.logger.error(f'Duplicated ID: {elt.getId()}')
+                    valid = False
+                ids.add(elt.getId())
+
+        new_ids = {
+            name: set(elt.getId() for elt in elts)
+            for name, elts in new_elts.items()
+        }
+
+        def _exists(id: str, name: str) -> bool:
+            if id in old_ids.get(name, []) or id in new_ids.get(name, []):
+                return True
+            self.logger.error(f'{id} referenced but not defined in {name}')
+            return False
+
+        # References
+        for spe in new_elts['species']:
+            valid &= _exists(spe.getCompartment(), 'compartments')
+        for rxn in new_elts['reactions']:
+            if rxn.isSetCompartment():
+                valid &= _exists(rxn.getCompartment(), 'compartments')
+            for spe_ref in (
+                list(rxn.getListOfReactants())
+                + list(rxn.getListOfProducts())
+                + list(rxn.getListOfModifiers())
+            ):
+                valid &= _exists(spe_ref.getSpecies(), 'species')
+            rxn_fbc = rxn.getPlugin('fbc')
+            if rxn_fbc is not None:
+                for bound in [
+                    rxn_fbc.getLowerFluxBound(),
+                    rxn_fbc.getUpperFluxBound()
+                ]:
+                    if bound:
+                        valid &= _exists(bound, 'parameters')
+        for obj in new_elts.get('objectives', []):
+            for flux_obj in obj.getListOfFluxObjectives():
+                valid &= _exists(flux_obj.getReaction(), 'reactions')
+        for group in new_elts.get('groups', []):
+            for member in group.getListOfMembers():
+                if member.getIdRef() not in sids:
+                    self.logger.error(f'{member.getIdRef()} referenced but not defined')
+                    valid = False
+
+        self.logger.debug(f'SBML structure checked in {perf_counter()-start:.3f}s')
+
+        return bool(valid)
 
 
     def getModel(self):
@@ -324,69 +724,140 @@ class rpSBML:
         # Search in model.
         if self.getModel() is None:
             return None
-        # Build data.
-        comp_models = self.getModel().getListOfCompartments()
         # Find synonyms
-        comp_synonyms = []
-        for c_short, c_long in compartment_shortlist.items():
-            c_long.append(c_short)
-            c_long = [x.lower() for x in c_long]
-            if compartment.lower() in c_long:
-                comp_synonyms = c_long
-                break
-        if len(comp_synonyms) == 0:
-            comp_synonyms.append(compartment.lower())
+        canonical = COMPARTMENT_CANONICALS.get(compartment.lower())
+        if canonical is None:
+            comp_synonyms = (compartment.lower(),)
+        else:
+            comp_synonyms = COMPARTMENT_SYNONYMS[canonical]
         # Not strict
+        comp_models = self._get_search_index('compartments')['ignorecase']
         for comp_synonym in comp_synonyms:
-            for comp_model in comp_models:
-                if comp_synonym == comp_model.getId().lower() \
-                    or comp_synonym == comp_model.getName().lower():
-                    return comp_model
+            if comp_synonym in comp_models:
+                return self.getModel().getCompartment(comp_models[comp_synonym])
         return None
 
     def search_specie(
         self,
-        specie: str
+        specie: str,
+        mode: str = 'regex'
     ) -> libsbml.Species:
         """Search in model if a specie exists.
 
         :param specie: A specie id to search in the model
+        :param mode: How specie is compared to IDs and names, one of SEARCH_MODES (Default: regex)
 
         :type specie: str
+        :type mode: str
 
-        :return: Return a specie if the specie is in the model, None otherwise
+        :return: Return the first specie of the model that matches, None otherwise
         :rtype: libsbml.Specie
         """
         # Search in model.
         if self.getModel() is None:
             return None
-        for spe in self.getModel().getListOfSpecies():
-            if re.search(specie, spe.getId(), re.IGNORECASE) \
-                or re.search(specie, spe.getName(), re.IGNORECASE):
-                return spe
-        return None
+        pos = self._search(self._get_search_index('species'), specie, mode)
+        return None if pos is None else self.getModel().getSpecies(pos)
 
     def search_reaction(
         self,
-        reaction: str
+        reaction: str,
+        mode: str = 'regex'
     ) -> libsbml.Reaction:
         """Search in model if a reaction exists.
 
         :param reaction: A reaction id to search in the model
+        :param mode: How reaction is compared to IDs and names, one of SEARCH_MODES (Default: regex)
 
         :type reaction: str
+        :type mode: str
 
-        :return: Return a reaction if the reaction is in the model, None otherwise
+        :return: Return the first reaction of the model that matches, None otherwise
         :rtype: libsbml.Reaction
         """
         # Search in model.
         if self.getModel() is None:
             return None
-        for rxn in self.getModel().getListOfReactions():
-            if re.search(reaction, rxn.getId(), re.IGNORECASE) \
-                or re.search(reaction, rxn.getName(), re.IGNORECASE):
-                return rxn
-        return None
+        pos = self._search(self._get_search_index('reactions'), reaction, mode)
+        return None if pos is None else self.getModel().getReaction(pos)
+
+    def _get_search_index(self, name: str) -> Dict:
+        """Return the lookup tables of the elements of a list
+        (species, reactions or compartments) by ID and name. Tables are
+        built once and kept until elements are added or removed.
+
+        :param name: Name of the list (see _get_lists_of_elements())
+
+        :type name: str
+
+        :return: Positions of elements per ID/name ('exact'), per lower-cased
+            ID/name ('ignorecase'), IDs and names of all elements ('entries')
+            and results of former regex searches ('regex')
+        :rtype: Dict
+        """
+        lst = self._get_lists_of_elements()[name]
+        index = self._search_index.get(name)
+        if index is None or index['size'] != lst.size():
+            start = perf_counter()
+            entries = [(elt.getId(), elt.getName()) for elt in lst]
+            exact = {}
+            ignorecase = {}
+            # Keep the first element of the model for each key
+            for pos, (elt_id, elt_name) in enumerate(entries):
+                for key in (elt_id, elt_name):
+                    if key:
+                        exact.setdefault(key, pos)
+                        ignorecase.setdefault(key.lower(), pos)
+            index = {
+                'size': lst.size(),
+                'entries': entries,
+                'exact': exact,
+                'ignorecase': ignorecase,
+                'regex': {}
+            }
+            self._search_index[name] = index
+            self.logger.debug(f'Search index of {name} built in {perf_counter()-start:.3f}s')
+        return index
+
+    @staticmethod
+    def _search(
+        index: Dict,
+        query: str,
+        mode: str
+    ) -> int:
+        """Return the position of the first element matching the query.
+
+        :param index: The search index (see _get_search_index())
+        :param query: The ID, name or pattern to search
+        :param mode: One of SEARCH_MODES
+
+        :type index: Dict
+        :type query: str
+        :type mode: str
+
+        :return: Position of the element in its list, None if not found
+        :rtype: int
+        """
+        if mode == 'exact':
+            return index['exact'].get(query)
+        if mode == 'ignorecase':
+            return index['ignorecase'].get(query.lower())
+        if mode != 'regex':
+            raise ValueError(f'Unknown search mode {mode}, expected one of {SEARCH_MODES}')
+        results = index['regex']
+        if query not in results:
+            pattern = re.compile(query, re.IGNORECASE)
+            results[query] = next(
+                (
+                    pos for pos, (elt_id, elt_name) in enumerate(index['entries'])
+                    if pattern.search(elt_id) or pattern.search(elt_name)
+                ),
+                None
+            )
+            if len(results) > SEARCH_CACHE_SIZE:
+                # Forget the oldest query
+                del results[next(iter(results))]
+        return results[query]
 
     def has_compartment(
         self,
@@ -534,6 +1005,9 @@ class rpSBML:
         pathway: 'rpSBML',
         model: 'rpSBML',
         compartment_id: str,
+        validation: str = 'full',
+        inplace: bool = False,
+        checkpoint: bool = False,
         logger: Logger = getLogger(__name__)
     ) -> Tuple['rpSBML', Dict, List, str]:
         # # Copy target rpSBML object into a new one so that
@@ -572,6 +1046,15 @@ class rpSBML:
             The source rpSBML object
         target_rpsbml: rpSBML
             The target rpSBML object
+        validation: str
+            Validation level of the merged document, among VALIDATION_LEVELS (default: 'full')
+        inplace: bool
+            Merge into the model itself instead of a copy of it (default: False).
+        checkpoint: bool
+            With inplace, set a checkpoint on the model before merging so that
+            the pathway can be removed afterwards with model.rollback(),
+            e.g. to merge another pathway into the same model (default: False).
+            Modifications are recorded until rollback() is called.
         logger : Logger
             The logger object.
 
@@ -594,12 +1077,24 @@ class rpSBML:
             f"Merging : {model.getName()} model and {pathway.getName()} pathway..."
         )
 
+        if validation not in VALIDATION_LEVELS:
+            logger.warning(
+                f'Unknown validation level \'{validation}\', use \'full\' instead (available: {", ".join(VALIDATION_LEVELS)})'
+            )
+            validation = 'full'
+
         # Copy target rpSBML object into a new one so that
         # it can be modified and returned
-        merged_rpsbml = rpSBML(
-            rpsbml = model,
-            logger = logger
-        )
+        if inplace:
+            merged_rpsbml = model
+            if checkpoint:
+                merged_rpsbml.checkpoint()
+        else:
+            merged_rpsbml = rpSBML(
+                rpsbml = model,
+                check = validation == 'full',
+                logger = logger
+            )
 
         ## MODEL FBC ###################################
         # Find the ID's of the similar target_rpsbml.model species
@@ -608,6 +1103,11 @@ class rpSBML:
         pathway.enable_package(pkg, url)
         merged_rpsbml.enable_package(pkg, url)
 
+        # Keep track of the model size
+        # to only check the copied elements afterwards
+        if validation == 'structural':
+            counts = merged_rpsbml.count_elements()
+
         # pkg = 'groups'
         # url = 'http://www.sbml.org/sbml/level3/version1/groups/version1'
         # source_fbc = source_rpsbml.enable_package(pkg, url)
@@ -671,7 +1171,14 @@ class rpSBML:
 
         # merged_rpsbml.write_to_file('joan.xml')
 
-        if merged_rpsbml.checkSBML():
+        if validation == 'full':
+            valid = merged_rpsbml.checkSBML()
+        elif validation == 'structural':
+            valid = merged_rpsbml.check_structure(counts)
+        else:
+            valid = True
+
+        if valid:
             return (
                 merged_rpsbml,
                 reactions_in_both,
@@ -1209,6 +1716,7 @@ class rpSBML:
                     source_member,
                     f'Retrieving the source species: {source_spe_id}'
                 )
+                self._journal_annotation(target_member)
                 rpSBML.checklibSBML(
                     target_member.getAnnotation(
                         ).getChild(
@@ -1248,6 +1756,7 @@ class rpSBML:
                         target_spe,
                         'creating species'
                     )
+                    self._invalidate_species_index()
                     rpSBML.checklibSBML(
                         target_spe.setMetaId(
                             source_spe.getMetaId()
@@ -1324,20 +1833,17 @@ class rpSBML:
 
         reactions_in_both = {}
 
+        # Reactions of rpsbml_2 indexed by their signature
+        reaction_index = rpsbml_2.get_reaction_index()
+
         for rxn_1 in rpsbml_1.getModel().getListOfReactions():
 
             logger.debug('rxn_1: ' + str(rxn_1))
 
-            for rxn_2 in rpsbml_2.getModel().getListOfReactions():
-                match = rpSBML.reactionsAreEqual(
-                    species,
-                    rxn_1,
-                    rxn_2,
-                    logger = logger
-                )
-                if match:
-                    reactions_in_both[rxn_1.getId()] = rxn_2.getId()
-        
+            rxn_2_ids = reaction_index.get(rpSBML.reaction_signature(rxn_1))
+            if rxn_2_ids:
+                reactions_in_both[rxn_1.getId()] = rxn_2_ids[0]
+
         return reactions_in_both
 
 
@@ -1585,44 +2091,26 @@ class rpSBML:
                 # else:
                 #     source_reactions[reaction.getId()]['products'].append(spe.species)
 
+        # Reactions of the model indexed by their signature
+        reaction_index = self.get_reaction_index()
+
         for source_reaction in source_sbml.getModel().getListOfReactions():
 
             self.logger.debug(f'source_reaction: {source_reaction.getId()}')
 
-            is_found = False
-
-            for target_reaction in self.getModel().getListOfReactions():
-                # _target_reaction = {
-                #     'reactants': [spe.species for spe in target_reaction.getListOfReactants()],
-                #     'products': [spe.species for spe in target_reaction.getListOfProducts()]
-                # }
-                # match = (
-                #     len(source_reaction_infos['reactants']) == len(_target_reaction['reactants'])
-                #     and len(source_reaction_infos['products']) == len(_target_reaction['products'])
-                #     and sorted(source_reaction_infos['reactants']) == sorted(_target_reaction['reactants'])
-                #     and sorted(source_reaction_infos['products']) == sorted(_target_reaction['products'])
-                # )
-                if rpSBML.reactionsAreEqual(
-                    source_reaction,
-                    target_reaction
-                ):
-                # match = rpSBML.reactionsAreEqual(
-                #     species,
-                #     source_reaction,
-                #     ,
-                #     logger = self.logger
-                # )
-                # if match:
-                    # self.logger.debug('Source reaction '+str(source_reaction)+' matches with target reaction '+str(target_reaction))
-                    # source_reaction[source_reaction.getId()] = target_reaction.getId()
-                    reactions_in_both[source_reaction.getId()] = target_reaction.getId()
-                    is_found = True
-                    break
+            signature = rpSBML.reaction_signature(source_reaction)
 
-            if not is_found:
+            # The first reaction of the model with the same
+            # reactants and products is taken
+            if signature in reaction_index:
+                reactions_in_both[source_reaction.getId()] = reaction_index[signature][0]
+
+            else:
                 self.getModel().addReaction(
                     source_sbml.getModel().getReaction(source_reaction.getId())
                 )
+                self._invalidate_species_degrees()
+                self._add_to_reaction_index(source_reaction.getId(), signature)
 
                 # source_reaction = source_sbml.getModel().getReaction(source_reaction_id)
                 # target_reaction = self.getModel().createReaction()
@@ -1893,22 +2381,24 @@ class rpSBML:
         #     self.logger.error(str(json_dumps(errors, indent=4)))
         #     exit()
 
-        rpgraph = rpGraph(
-            self,
-            True,
-            pathway_id,
-            central_species_group_id,
-            sink_species_group_id,
-            logger = self.logger
-        )
+        # Only consumed or only produced species of the pathway,
+        # from the producing/consuming reactions over the whole model
+        # (same as rpGraph.onlyConsumedSpecies() and onlyProducedSpecies()
+        # on the graph of the model, without building it)
+        rp_species = set(self.readUniqueRPspecies())
+        in_out_degrees = self.get_species_in_out_degrees()
+        if not species:
+            species = [spe.getId() for spe in self.getModel().getListOfSpecies()]
+        isolated_species = []
+        for spe_id in species:
+            if spe_id not in rp_species:
+                continue
+            nb_in, nb_out = in_out_degrees.get(spe_id, (0, 0))
+            if (nb_in > 0) != (nb_out > 0):
+                isolated_species.append(spe_id)
 
         self.set_isolated_species(
-            list(
-                set(
-                    rpgraph.onlyConsumedSpecies(species) +
-                    rpgraph.onlyProducedSpecies(species)
-                )
-            )
+            list(dict.fromkeys(isolated_species))
         )
 
 
@@ -1975,129 +2465,105 @@ class rpSBML:
 
 
     @staticmethod
-    def _findUniqueRowColumn(pd_matrix, logger=getLogger(__name__)):
+    def _findUniqueRowColumn(
+        pd_matrix,
+        method: str = 'greedy',
+        logger: Logger = getLogger(__name__)
+    ):
         """Private function that takes the matrix of similarity scores between the reactions or species of two models and finds the unqiue matches
 
         pd_matrix is organised such that the rows are the simulated species and the columns are the measured ones
 
         :param pd_matrix: Matrix of reactions or species of two models
+        :param method: Way to resolve the matches (see ASSIGNMENT_METHODS)
 
-        :type pd_matrix: np.array
+        :type pd_matrix: pd.DataFrame
+        :type method: str
 
         :return: Dictionary of matches
         :rtype: dict
         """
-        
-        # self.logger.debug(pd_matrix)
+        if method not in ASSIGNMENT_METHODS:
+            raise ValueError(
+                f'Unknown assignment method \'{method}\' '
+                f'(expected one of {ASSIGNMENT_METHODS})'
+            )
+        rows = pd_matrix.index
+        cols = pd_matrix.columns
+        # resolve the rouding issues to find the max
+        # (work on a copy, the input matrix is left untouched)
+        x = np.around(pd_matrix.to_numpy(dtype=float), decimals=5)
         to_ret = {}
+        if x.size == 0 or not x.any():
+            return to_ret
+
+        if method == 'hungarian':
+            # exact maximum-weight matching, pairs without similarity are dropped
+            for row, col in zip(*linear_sum_assignment(x, maximize=True)):
+                if x[row, col] != 0.0:
+                    to_ret[cols[col]] = [rows[row]]
+            return to_ret
+
         ######################## filter by the global top values ################
-        # self.logger.debug('################ Filter best #############')
-        # transform to np.array
-        x = pd_matrix.values
-        # resolve the rouding issues to find the max
-        x = np.around(x, decimals=5)
         # first round involves finding the highest values and if found set to 0.0 the rows and columns (if unique)
-        top = np.where(x == np.max(x))
-        # as long as its unique keep looping
-        if np.count_nonzero(x)==0:
-            return to_ret
-        while len(top[0])==1 and len(top[1])==1:
-            if np.count_nonzero(x)==0:
-                return to_ret
-            pd_entry = pd_matrix.iloc[[top[0][0]],[top[1][0]]]
-            row_name = str(pd_entry.index[0])
-            col_name = str(pd_entry.columns[0])
-            # if col_name in to_ret:
-                # self.logger.debug('Overwriting (1): '+str(col_name))
-                # self.logger.debug(x)
-            to_ret[col_name] = [row_name]
+        while True:
+            top = np.flatnonzero(x == x.max())
+            # as long as its unique keep looping
+            if len(top) != 1:
+                break
+            row, col = divmod(top[0], x.shape[1])
+            to_ret[str(cols[col])] = [str(rows[row])]
             # delete the rows and the columns
-            # self.logger.debug('==================')
-            # self.logger.debug('Column: '+str(col_name))
-            # self.logger.debug('Row: '+str(row_name))
-            pd_matrix.loc[:, col_name] = 0.0
-            pd_matrix.loc[row_name, :] = 0.0
-            x = pd_matrix.values
-            x = np.around(x, decimals=5)
-            top = np.where(x == np.max(x))
-            # self.logger.debug(pd_matrix)
-            # self.logger.debug(top)
-            # self.logger.debug('==================')
+            x[:, col] = 0.0
+            x[row, :] = 0.0
+            if not x.any():
+                return to_ret
+
         #################### filter by columns (measured) top values ##############
-        # self.logger.debug('################ Filter by column best ############')
-        x = pd_matrix.values
-        x = np.around(x, decimals=5)
-        if np.count_nonzero(x)==0:
-            return to_ret
         reloop = True
         while reloop:
-            if np.count_nonzero(x)==0:
+            if not x.any():
                 return to_ret
             reloop = False
-            for col in range(len(x[0])):
-                if np.count_nonzero(x[:,col])==0:
+            for col in range(x.shape[1]):
+                column = x[:, col]
+                if not column.any():
                     continue
-                top_row = np.where(x[:,col]==np.max(x[:,col]))[0]
-                if len(top_row)==1:
-                    top_row = top_row[0]
-                    # if top_row == 0.0:
-                    #    continue
-                    # check to see if any other measured pathways have the same or larger score (accross)
-                    row = list(x[top_row, :])
-                    # remove current score consideration
-                    row.pop(col)
-                    if max(row)>=x[top_row, col]:
-                        logger.warning('For col '+str(col)+' there are either better or equal values: '+str(row))
-                        logger.warning(x)
-                        continue
-                    # if you perform any changes on the rows and columns, then you can perform the loop again
-                    reloop = True
-                    pd_entry = pd_matrix.iloc[[top_row],[col]]
-                    # self.logger.debug('==================')
-                    row_name = pd_entry.index[0]
-                    col_name = pd_entry.columns[0]
-                    # self.logger.debug('Column: '+str(col_name))
-                    # self.logger.debug('Row: '+str(row_name))
-                    # if col_name in to_ret:
-                        # self.logger.debug('Overwriting (2): '+str(col_name))
-                        # self.logger.debug(pd_matrix.values)
-                    to_ret[col_name] = [row_name]
-                    # delete the rows and the columns
-                    pd_matrix.loc[:, col_name] = 0.0
-                    pd_matrix.loc[row_name, :] = 0.0
-                    x = pd_matrix.values
-                    x = np.around(x, decimals=5)
-                    # self.logger.debug(pd_matrix)
-                    # self.logger.debug('==================')
+                top_rows = np.flatnonzero(column == column.max())
+                if len(top_rows) != 1:
+                    continue
+                row = top_rows[0]
+                # check to see if any other measured pathways have the same or larger score (accross)
+                others = np.delete(x[row, :], col)
+                if others.size and others.max() >= x[row, col]:
+                    logger.warning('For col '+str(col)+' there are either better or equal values: '+str(list(others)))
+                    logger.warning(x)
+                    continue
+                # if you perform any changes on the rows and columns, then you can perform the loop again
+                reloop = True
+                to_ret[cols[col]] = [rows[row]]
+                # delete the rows and the columns
+                x[:, col] = 0.0
+                x[row, :] = 0.0
+
         ################## laslty if there are multiple values that are not 0.0 then account for that ######
-        # self.logger.debug('################# get the rest ##########')
-        x = pd_matrix.values
-        x = np.around(x, decimals=5)
-        if np.count_nonzero(x)==0:
+        if not x.any():
             return to_ret
-        for col in range(len(x[0])):
-            if not np.count_nonzero(x[:,col])==0:
-                top_rows = np.where(x[:,col]==np.max(x[:,col]))[0]
-                if len(top_rows)==1:
-                    top_row = top_rows[0]
-                    pd_entry = pd_matrix.iloc[[top_row],[col]]
-                    row_name = pd_entry.index[0]
-                    col_name = pd_entry.columns[0]
-                    if col_name not in to_ret:
-                        to_ret[col_name] = [row_name]
-                    else:
-                        logger.warning('At this point should never have only one: '+str(x[:,col]))
-                        logger.warning(x)
+        for col in range(x.shape[1]):
+            column = x[:, col]
+            if not column.any():
+                continue
+            top_rows = np.flatnonzero(column == column.max())
+            if len(top_rows) == 1:
+                if cols[col] not in to_ret:
+                    to_ret[cols[col]] = [rows[top_rows[0]]]
                 else:
-                    for top_row in top_rows:
-                        pd_entry = pd_matrix.iloc[[top_row],[col]]
-                        row_name = pd_entry.index[0]
-                        col_name = pd_entry.columns[0]
-                        if col_name not in to_ret:
-                            to_ret[col_name] = []
-                        to_ret[col_name].append(row_name)
-        # self.logger.debug(pd_matrix)
-        # self.logger.debug('###################')
+                    logger.warning('At this point should never have only one: '+str(column))
+                    logger.warning(x)
+            else:
+                to_ret.setdefault(cols[col], []).extend(
+                    rows[row] for row in top_rows
+                )
         return to_ret
 
 
@@ -2106,6 +2572,69 @@ class rpSBML:
     ##########################################################################################
 
 
+    @staticmethod
+    def reaction_signature(
+        reaction: libsbml.Reaction
+    ) -> Tuple[Tuple[str], Tuple[str]]:
+        """Return the signature of a reaction, i.e. the sorted IDs
+        of its reactants and of its products. Two reactions with
+        the same signature are considered as equal.
+
+        :param reaction: The reaction
+
+        :type reaction: libsbml.Reaction
+
+        :return: The sorted reactants IDs and the sorted products IDs
+        :rtype: Tuple[Tuple[str], Tuple[str]]
+        """
+        return (
+            tuple(sorted(spe.getSpecies() for spe in reaction.getListOfReactants())),
+            tuple(sorted(spe.getSpecies() for spe in reaction.getListOfProducts()))
+        )
+
+
+    def get_reaction_index(self) -> Dict[Tuple[Tuple[str], Tuple[str]], List[str]]:
+        """Return the reactions of the model indexed by their signature
+        (see reaction_signature()), in the model order. The index is built
+        once and kept until reactions are created or removed, reactions
+        added by merge() being appended to it.
+
+        :return: The IDs of the reactions per signature
+        :rtype: Dict[Tuple[Tuple[str], Tuple[str]], List[str]]
+        """
+        nb_reactions = self.getModel().getNumReactions()
+        if self._reaction_index is None or self._reaction_index['nb_reactions'] != nb_reactions:
+            start = perf_counter()
+            index = {}
+            for rxn in self.getModel().getListOfReactions():
+                index.setdefault(rpSBML.reaction_signature(rxn), []).append(rxn.getId())
+            self._reaction_index = {
+                'nb_reactions': nb_reactions,
+                'index': index
+            }
+            self.logger.debug(f'Reaction index built in {perf_counter()-start:.3f}s')
+        return self._reaction_index['index']
+
+
+    def _add_to_reaction_index(
+        self,
+        rxn_id: str,
+        signature: Tuple[Tuple[str], Tuple[str]]
+    ) -> None:
+        if self._reaction_index is None:
+            return
+        index = self._reaction_index['index']
+        # Lists are not modified in place
+        # so that copies of the index remain unchanged
+        index[signature] = index.get(signature, []) + [rxn_id]
+        self._reaction_index['nb_reactions'] += 1
+
+
+    def _invalidate_reaction_index(self) -> None:
+        self._reaction_index = None
+        self._search_index.pop('reactions', None)
+
+
     @staticmethod
     def reactionsAreEqual(
         source_reaction: libsbml.Reaction,
@@ -2132,15 +2661,9 @@ class rpSBML:
         :return: The score of the match and boolean if its a match or not
         :rtype: tuple
         """
-        source_reactants = [spe.species for spe in source_reaction.getListOfReactants()]
-        target_reactants = [spe.species for spe in target_reaction.getListOfReactants()]
-        source_products = [spe.species for spe in source_reaction.getListOfProducts()]
-        target_products = [spe.species for spe in target_reaction.getListOfProducts()]
         return (
-            source_reaction.getNumReactants() == target_reaction.getNumReactants()
-            and source_reaction.getNumProducts() == target_reaction.getNumProducts()
-            and sorted(source_reactants) == sorted(target_reactants)
-            and sorted(source_products) == sorted(target_products)
+            rpSBML.reaction_signature(source_reaction)
+            == rpSBML.reaction_signature(target_reaction)
         )
         # print(
         #     target_reaction.getId(),
@@ -2272,61 +2795,47 @@ class rpSBML:
         if self.getModel() is None:
             return corr_species, list(miss_species)
 
-        # Get the species IDs of the right compartment
-        compartment_species = [
-            spe
-            for spe in
-            self.getModel().getListOfSpecies()
-            if spe.getCompartment() == compartment_id
-        ]
+        # The score of a species is the number of reactions
+        # in which it is involved
+        species_occurence = self.get_species_degrees()
 
-        # In all reactions of the model,
-        # count the occurence of each species
-        # of the given compartment.
-        # The score is the number of reactions
-        # in which the species are involved
-        species_occurence = {}
-        for rxn in self.getModel().getListOfReactions():
-            for spe in compartment_species:
-                # Look if the species is a reactant or a product
-                if spe.getId() in [
-                    reactant.species
-                    for reactant in rxn.getListOfReactants()
-                ] or spe.getId() in [
-                    product.species
-                    for product in rxn.getListOfProducts()
-                ]:
-                    if spe.getId() in species_occurence:
-                        species_occurence[spe.getId()] += 1
-                    else:
-                        species_occurence[spe.getId()] = 1
-                else:
-                    if spe.getId() not in species_occurence:
-                        species_occurence[spe.getId()] = 0
+        species_index = self.get_species_index(compartment_id)
 
         for species_id_to_match in species_ids:
 
-            # Search for match(es) in the current sbml model
-            for model_species in compartment_species:
+            # Candidates are sorted as in the model,
+            # so that the first match wins in case of equal scores
+            for model_spe_id, exact in species_index.get(species_id_to_match, []):
 
-                self.logger.debug(f'species_id_to_match/compartment: {species_id_to_match}/{compartment_id}; model_species/compartment: {model_species.getId()}/{model_species.getCompartment()}')
+                self.logger.debug(f'species_id_to_match/compartment: {species_id_to_match}/{compartment_id}; model_species: {model_spe_id}')
 
                 # Look if the specie in source has the same ID as in the target
-                if species_id_to_match == model_species.getId():
-                    corr_species[species_id_to_match] = model_species.getId()
-                # Else look if the specie in source has the same ID
+                if exact:
+                    corr_species[species_id_to_match] = model_spe_id
+                # Else the specie in source has the same ID
                 # as one ID among MIRIAM annotations
+                elif species_id_to_match not in corr_species:
+                    corr_species[species_id_to_match] = model_spe_id
+                # Species ID already matched with another species,
+                # keep the one involved in the most reactions
                 else:
-                    # Try to match the species with MIRIAM annotations of the model species
-                    _corr_species = rpSBML.matchWithMIRIAM(
-                        species_id_to_match=species_id_to_match,
-                        model_species=model_species,
-                        scores=species_occurence,
-                        prev_matches=corr_species,
-                        logger=self.logger
+                    prev_match = corr_species[species_id_to_match]
+                    prev_score = species_occurence.get(prev_match, 0)
+                    curr_score = species_occurence.get(model_spe_id, 0)
+                    self.logger.warning(
+                        f'*** A match already exists for {species_id_to_match}'
+                    )
+                    self.logger.warning(
+                        f'    \\__ previous match: {species_id_to_match} -> {prev_match} (involved in {prev_score} reactions)'
+                    )
+                    self.logger.warning(
+                        f'    \\__  current match: {species_id_to_match} -> {model_spe_id} (involved in {curr_score} reactions)'
+                    )
+                    if curr_score > prev_score:
+                        corr_species[species_id_to_match] = model_spe_id
+                    self.logger.warning(
+                        f'--> Keep {species_id_to_match} -> {corr_species[species_id_to_match]}'
                     )
-                    if _corr_species:
-                        corr_species[species_id_to_match] = _corr_species
 
             # If species not found in the model, add it to missing species list
             if species_id_to_match not in corr_species:
@@ -2334,6 +2843,111 @@ class rpSBML:
 
         return corr_species, list(miss_species)
 
+    def get_species_index(
+        self,
+        compartment_id: str
+    ) -> Dict[str, List[Tuple[str, bool]]]:
+        """Return the inverted index of the species of a compartment.
+        Each species ID and each MIRIAM cross-reference ID points to the
+        list of model species it refers to, in the model order, with a
+        flag telling if it is the species ID itself (exact match).
+        The index is built once and kept until species are added or removed.
+
+        :param compartment_id: The id of the compartment
+
+        :type compartment_id: str
+
+        :return: The inverted index
+        :rtype: Dict[str, List[Tuple[str, bool]]]
+        """
+        nb_species = self.getModel().getNumSpecies()
+        if self._species_index is None or self._species_index['nb_species'] != nb_species:
+            self._species_index = {
+                'nb_species': nb_species,
+                'compartments': {}
+            }
+        compartments = self._species_index['compartments']
+
+        if compartment_id not in compartments:
+            start = perf_counter()
+            index = {}
+            for spe in self.getModel().getListOfSpecies():
+                if spe.getCompartment() != compartment_id:
+                    continue
+                spe_id = spe.getId()
+                keys = set()
+                for xrefs in rpSBML.convert_miriam_to_dict(
+                    rpSBML.readMIRIAMAnnotation(spe.getAnnotation(), self.logger)
+                ).values():
+                    keys.update(xrefs)
+                keys.add(spe_id)
+                for key in keys:
+                    index.setdefault(key, []).append((spe_id, key == spe_id))
+            compartments[compartment_id] = index
+            self.logger.debug(f'Species index of compartment {compartment_id} built in {perf_counter()-start:.3f}s')
+
+        return compartments[compartment_id]
+
+
+    def _invalidate_species_index(self) -> None:
+        self._species_index = None
+        self._search_index.pop('species', None)
+
+
+    def get_species_degrees(self) -> Dict[str, int]:
+        """Return the number of reactions in which each species
+        is involved (as reactant or product). Species involved in no
+        reaction are not listed. The table is computed in one pass over
+        the reactions and kept until reactions are added or removed.
+
+        :return: The number of reactions per species ID
+        :rtype: Dict[str, int]
+        """
+        return self._get_species_degrees()['degrees']
+
+
+    def get_species_in_out_degrees(self) -> Dict[str, Tuple[int, int]]:
+        """Return the number of reactions producing and consuming
+        each species, as the in and out degrees of the species within
+        the graph of the model (see rpGraph). Species involved in no
+        reaction are not listed. The table is computed along with
+        get_species_degrees().
+
+        :return: The numbers of producing and consuming reactions per species ID
+        :rtype: Dict[str, Tuple[int, int]]
+        """
+        return self._get_species_degrees()['in_out']
+
+
+    def _get_species_degrees(self) -> Dict:
+        nb_reactions = self.getModel().getNumReactions()
+        if self._species_degrees is None or self._species_degrees['nb_reactions'] != nb_reactions:
+            start = perf_counter()
+            degrees = {}
+            in_out = {}
+            for rxn in self.getModel().getListOfReactions():
+                reactants = set([spe_ref.getSpecies() for spe_ref in rxn.getListOfReactants()])
+                products = set([spe_ref.getSpecies() for spe_ref in rxn.getListOfProducts()])
+                for spe_id in reactants | products:
+                    degrees[spe_id] = degrees.get(spe_id, 0) + 1
+                    nb_in, nb_out = in_out.get(spe_id, (0, 0))
+                    in_out[spe_id] = (
+                        nb_in + (spe_id in products),
+                        nb_out + (spe_id in reactants)
+                    )
+            self._species_degrees = {
+                'nb_reactions': nb_reactions,
+                'degrees': degrees,
+                'in_out': in_out
+            }
+            self.logger.debug(f'Species degrees computed in {perf_counter()-start:.3f}s')
+        return self._species_degrees
+
+
+    def _invalidate_species_degrees(self) -> None:
+        self._species_degrees = None
+
+
     @staticmethod
     def matchWithMIRIAM(
         species_id_to_match: str,
@@ -2938,73 +3552,25 @@ class rpSBML:
         :return: Sucess or failure of the function
         """
 
-        def __write_list(value, annot_header: str) -> str:
-            annotation = '>'
-            for v in value:
-                annotation += f'''
-                                <brsynth:{v}'''
-                annotation += f'''/>'''
-            annotation += f'''
-                            </brsynth:{str(annot_header)}>'''
-            return annotation
-
-        def __write_dict(value, annot_header: str) -> str:
-            annotation = '>'
-            for k, v in value.items():
-                annotation += f'''
-                                <brsynth:{k}'''
-                if isinstance(v, dict):
-                    for _k, _v in v.items():
-                        annotation += f''' {_k}="{_v}"'''
-                else:
-                    annotation += f''' value="{v}"'''
-                annotation += f'''/>'''
-            annotation += f'''
-                            </brsynth:{str(annot_header)}>'''
-            return annotation
-
-        def __write_header(annot_header: str) -> str:
-            return f'''
+        annotation = f'''
                 <annotation>
                     <rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns:bqbiol="http://biomodels.net/biology-qualifiers/" xmlns:bqmodel="http://biomodels.net/model-qualifiers/">
                         <rdf:BRSynth rdf:about="# adding">
-                            <brsynth:brsynth xmlns:brsynth="http://brsynth.eu">
-                                <brsynth:{annot_header}'''
-
-        def __write_footer() -> str:
-            return '''
+                            <brsynth:brsynth xmlns:brsynth="http://brsynth.eu">{rpSBML._writeBRSynthEntry(annot_header, value)}
                             </brsynth:brsynth>
                         </rdf:BRSynth>
                     </rdf:RDF>
                 </annotation>'''
 
-        annotation = __write_header(str(annot_header))
-        if isinstance(value, list):
-            annotation += __write_list(value, annot_header)
-        elif isinstance(value, dict):
-            annotation += __write_dict(value, annot_header)
-        else:
-            annotation += f' value="{str(value)}"/>'
-        annotation += __write_footer()
-
         # self.logger.debug('annotation: {0}'.format(annotation))
         annot_obj = libsbml.XMLNode.convertStringToXMLNode(annotation)
         if not annot_obj:
             self.logger.error(f'Cannot convert this string to annotation object: {annotation}')
             return False
         #### retreive the annotation object
-        brsynth_annot = None
-        obj_annot = sbase_obj.getAnnotation()
-        if not obj_annot:
-            sbase_obj.setAnnotation(libsbml.XMLNode.convertStringToXMLNode(self._defaultBRSynthAnnot(meta_id)))
-            obj_annot = sbase_obj.getAnnotation()
-            if not obj_annot:
-                self.logger.error('Cannot update BRSynth annotation')
-                return False
-        brsynth_annot = obj_annot.getChild('RDF').getChild('BRSynth').getChild('brsynth')
+        brsynth_annot = self._getBRSynthAnnot(sbase_obj, meta_id)
         if not brsynth_annot:
-             self.logger.error('Cannot find the BRSynth annotation')
-             return False
+            return False
 
         # try to update the annotation
         target_found = self.updateBRSynthAnnot(brsynth_annot, annot_obj, annot_header)
@@ -3019,6 +3585,224 @@ class rpSBML:
         return True
 
 
+    def updateBRSynthBulk(
+        self,
+        sbase_obj,
+        infos,
+        meta_id=None
+    ):
+        """Append or update several entries to the BRSynth annotation of the passed libsbml.SBase object.
+
+        Same as calling updateBRSynth() for each entry, but all the entries are parsed at once
+        and the existing ones are found through an index of the annotation children.
+        Updated entries are moved at the end of the annotation, in the order of infos.
+
+        :param sbase_obj: The libSBML object to add the different
+        :param infos: The values to add, per annotation header
+        :param meta_id: The meta ID to be added to the annotation string
+
+        :type sbase_obj: libsbml.SBase
+        :type infos: Dict
+        :type meta_id: str
+
+        :rtype: bool
+        :return: Sucess or failure of the function
+        """
+        if not infos:
+            return True
+        entries = {str(key): value for key, value in infos.items()}
+        brsynth = ''.join(
+            rpSBML._writeBRSynthEntry(key, value)
+            for key, value in entries.items()
+        )
+        annotation = f'''
+                <annotation>
+                    <rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns:bqbiol="http://biomodels.net/biology-qualifiers/" xmlns:bqmodel="http://biomodels.net/model-qualifiers/">
+                        <rdf:BRSynth rdf:about="# adding">
+                            <brsynth:brsynth xmlns:brsynth="http://brsynth.eu">{brsynth}
+                            </brsynth:brsynth>
+                        </rdf:BRSynth>
+                    </rdf:RDF>
+                </annotation>'''
+        annot_obj = libsbml.XMLNode.convertStringToXMLNode(annotation)
+        if not annot_obj:
+            # Some values cannot be written, set them one by one
+            return all([
+                self.updateBRSynth(sbase_obj, key, value, meta_id)
+                for key, value in entries.items()
+            ])
+
+        brsynth_annot = self._getBRSynthAnnot(sbase_obj, meta_id)
+        if not brsynth_annot:
+            return False
+
+        # remove the entries to update
+        index = rpSBML._indexBRSynthAnnot(brsynth_annot)
+        for i, key in sorted(
+            [(i, key) for key in entries for i in index.get(key, [])],
+            reverse=True
+        ):
+            self.checklibSBML(brsynth_annot.removeChild(i), 'Removing annotation '+key, self.logger)
+        # then add them all
+        source_annot = annot_obj.getChild('RDF').getChild('BRSynth').getChild('brsynth')
+        for i in range(source_annot.getNumChildren()):
+            self.checklibSBML(brsynth_annot.addChild(source_annot.getChild(i)), 'Adding annotation to the brsynth annotation', self.logger)
+
+        return True
+
+
+    def _getBRSynthAnnot(self, sbase_obj, meta_id=None):
+        """Returns the BRSynth annotation of the passed libsbml.SBase object, created if missing
+
+        :param sbase_obj: The libSBML object
+        :param meta_id: The meta ID to be added to the annotation string if created
+
+        :type sbase_obj: libsbml.SBase
+        :type meta_id: str
+
+        :rtype: libsbml.XMLNode
+        :return: The brsynth node of the annotation, None if not found
+        """
+        self._journal_annotation(sbase_obj)
+        obj_annot = sbase_obj.getAnnotation()
+        if not obj_annot:
+            sbase_obj.setAnnotation(libsbml.XMLNode.convertStringToXMLNode(self._defaultBRSynthAnnot(meta_id)))
+            obj_annot = sbase_obj.getAnnotation()
+            if not obj_annot:
+                self.logger.error('Cannot update BRSynth annotation')
+                return None
+        brsynth_annot = obj_annot.getChild('RDF').getChild('BRSynth').getChild('brsynth')
+        if not brsynth_annot:
+             self.logger.error('Cannot find the BRSynth annotation')
+             return None
+        return brsynth_annot
+
+
+    @staticmethod
+    def _indexBRSynthAnnot(brsynth_annot):
+        """Returns the positions of the children of a BRSynth annotation, per name
+
+        :param brsynth_annot: The brsynth node of an annotation
+
+        :type brsynth_annot: libsbml.XMLNode
+
+        :rtype: Dict[str, List[int]]
+        :return: Positions of the entries, per annotation header
+        """
+        index = {}
+        for i in range(brsynth_annot.getNumChildren()):
+            index.setdefault(brsynth_annot.getChild(i).getName(), []).append(i)
+        return index
+
+
+    @staticmethod
+    def _writeBRSynthEntry(annot_header, value):
+        """Returns the XML string of one entry of the BRSynth annotation
+
+        :param annot_header: The annotation header that defines the type of entry
+        :param value: The value(s) of the entry
+
+        :type annot_header: str
+        :type value: Union[str, int, float, list, dict]
+
+        :return: The entry string
+        :rtype: str
+        """
+        annotation = f'''
+                                <brsynth:{annot_header}'''
+        if isinstance(value, list):
+            annotation += '>'
+            for v in value:
+                annotation += f'''
+                                <brsynth:{v}/>'''
+            annotation += f'''
+                            </brsynth:{annot_header}>'''
+        elif isinstance(value, dict):
+            annotation += '>'
+            for k, v in value.items():
+                annotation += f'''
+                                <brsynth:{k}'''
+                if isinstance(v, dict):
+                    for _k, _v in v.items():
+                        annotation += f''' {_k}="{_v}"'''
+                else:
+                    annotation += f''' value="{v}"'''
+                annotation += '/>'
+            annotation += f'''
+                            </brsynth:{annot_header}>'''
+        else:
+            annotation += f' value="{str(value)}"/>'
+        return annotation
+
+
+    def _setNewAnnotation(self, sbase_obj, type_param, xref, infos, meta_id):
+        """Set both MIRIAM and BRSynth annotations of a newly created element in one pass
+
+        The result is the same as setting the default annotation, then calling
+        addUpdateMIRIAM() and updateBRSynth() for each entry, which is the fallback
+        if the whole annotation string cannot be parsed.
+
+        :param sbase_obj: The newly created libSBML object
+        :param type_param: The type of the element (see addUpdateMIRIAM())
+        :param xref: List of the cross references
+        :param infos: BRSynth entries, in the order they are written
+        :param meta_id: The meta ID of the element
+
+        :type sbase_obj: libsbml.SBase
+        :type type_param: str
+        :type xref: List
+        :type infos: List[Tuple[str, Any]]
+        :type meta_id: str
+
+        :rtype: None
+        :return: None
+        """
+        # An updated entry moves to the end (see updateBRSynthAnnot())
+        entries = {}
+        for key, value in infos:
+            entries.pop(str(key), None)
+            entries[str(key)] = value
+        # addUpdateMIRIAM() inserts each cross reference at the head of the list
+        miriam = ''.join(
+            f'''
+                        <rdf:li rdf:resource="{url}"/>'''
+            for url in reversed(list(xref))
+        )
+        brsynth = ''.join(
+            rpSBML._writeBRSynthEntry(key, value)
+            for key, value in entries.items()
+        )
+        annot = libsbml.XMLNode.convertStringToXMLNode(f'''
+            <annotation>
+                <rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns:bqbiol="http://biomodels.net/biology-qualifiers/">
+                    <rdf:Description rdf:about="#{meta_id or ''}">
+                    <bqbiol:is>
+                        <rdf:Bag>{miriam}
+                        </rdf:Bag>
+                    </bqbiol:is>
+                    </rdf:Description>
+                    <rdf:BRSynth rdf:about="#{meta_id or ''}">
+                    <brsynth:brsynth xmlns:brsynth="http://brsynth.eu">{brsynth}
+                    </brsynth:brsynth>
+                    </rdf:BRSynth>
+                </rdf:RDF>
+            </annotation>
+        ''')
+        if annot is not None:
+            rpSBML.checklibSBML(sbase_obj.setAnnotation(annot), 'creating annotation')
+            return
+        # Some values cannot be written, set them one by one
+        rpSBML.checklibSBML(sbase_obj.setAnnotation(self._defaultBothAnnot(meta_id)), 'creating annotation')
+        self.addUpdateMIRIAM(sbase_obj, type_param, xref, meta_id)
+        for key, value in entries.items():
+            self.updateBRSynth(
+                sbase_obj=sbase_obj,
+                annot_header=key,
+                value=value,
+                meta_id=meta_id
+            )
+
+
     def updateBRSynthAnnot(self, annot, annot_obj, annot_header):
 
         target_found = False
@@ -3390,9 +4174,9 @@ class rpSBML:
                 f"Reaction ID '{rxn_id}' not found in the model '{self.getName()}'"
             )
             possible_rxn_ids = [
-                rxn.getId()
-                for rxn in list(self.getModel().getListOfReactions())
-                if rxn_id in rxn.getId().lower()
+                _rxn_id
+                for _rxn_id, _ in self._get_search_index('reactions')['entries']
+                if rxn_id in _rxn_id.lower()
             ]
             if possible_rxn_ids != []:
                 logger.error(
@@ -3410,12 +4194,16 @@ class rpSBML:
     #####################################################################
     ########################## INPUT/OUTPUT #############################
     #####################################################################
-    def readSBML(self, inFile):
+    def readSBML(self, inFile, compressed=False):
         """Open an SBML file to the object
 
+        Compressed files are decompressed in memory and read from the string.
+
         :param inFile: Path to the input SBML file
+        :param compressed: True if the file is gzipped (Default: False)
 
         :type inFile: str
+        :type compressed: bool
 
         :raises FileNotFoundError: If the file cannot be found
         :raises AttributeError: If the libSBML command encounters an error or the input value is None
@@ -3426,7 +4214,11 @@ class rpSBML:
 
         self.logger.debug(f'Read SBML file from {inFile}')
 
-        self.document = libsbml.readSBMLFromFile(inFile)
+        if compressed:
+            with gzip_open(inFile, 'rb') as fp:
+                self.document = libsbml.readSBMLFromString(fp.read().decode('utf-8'))
+        else:
+            self.document = libsbml.readSBMLFromFile(inFile)
         rpSBML.checklibSBML(self.getDocument(), 'reading input file')
         errors = self.getDocument().getNumErrors()
         # display the errors in the log accordning to the severity
@@ -3483,7 +4275,8 @@ class rpSBML:
         Parameters
         ----------
         filename: str
-            Filename to store the file under.
+            Filename to store the file under. If it ends with '.gz',
+            the file is gzipped.
         outdir: str
             Folder to store the file into.
 
@@ -3503,10 +4296,18 @@ class rpSBML:
         else:
             out_filename = self.build_filename_from_name()
 
-        libsbml.writeSBMLToFile(
-            self.getDocument(),
-            out_filename
-        )
+        if out_filename.endswith('.gz'):
+            with gzip_open(out_filename, 'wb') as fp:
+                fp.write(
+                    libsbml.writeSBMLToString(
+                        self.getDocument()
+                    ).encode('utf-8')
+                )
+        else:
+            libsbml.writeSBMLToFile(
+                self.getDocument(),
+                out_filename
+            )
 
         return out_filename
 
@@ -3676,7 +4477,7 @@ class rpSBML:
                     child.getAttributes().getName(i_attr): child.getAttributes().getValue(i_attr)
                     for i_attr in range(child.getAttributes().getNumAttributes())
                 }
-                toRet[child.getName()] = eval_value(toRet[child.getName()]['value'])
+                toRet[child.getName()] = parse_annotation_value(toRet[child.getName()]['value'])
             return toRet
 
         def _readBRSYNTHAnnotationToList(
@@ -3693,13 +4494,7 @@ class rpSBML:
             annot: libsbml.XMLNode,
             logger: Logger = getLogger(__name__)
         ) -> TypeVar:
-            return eval_value(annot.getAttrValue('value'))
-
-        def eval_value(value: str) -> TypeVar:
-            try:
-                return eval(value)
-            except:
-                return str(value)
+            return parse_annotation_value(annot.getAttrValue('value'))
 
         toRet = {}
 
@@ -3810,6 +4605,7 @@ class rpSBML:
     def read_reactions(
         self,
         pathway_id: str = None,
+        lazy: bool = False,
         logger: Logger = getLogger(__name__)
     ) -> Dict:
         """
@@ -3819,6 +4615,8 @@ class rpSBML:
         ----------
         rp_pathway: libsbml.Group
             Pathway to extract infos from
+        lazy: bool
+            If True, annotations are decoded on first access (see read_reaction)
 
         Returns
         -------
@@ -3832,13 +4630,14 @@ class rpSBML:
             rxn_l = self.readGroupMembers(pathway_id)
 
         for rxn_id in rxn_l:
-            reactions[rxn_id] = self.read_reaction(rxn_id)
+            reactions[rxn_id] = self.read_reaction(rxn_id, lazy=lazy)
         return reactions
 
 
     def read_reaction(
         self,
         rxn_id: str,
+        lazy: bool = False,
         logger: Logger = getLogger(__name__)
     ) -> Dict:
         """
@@ -3848,6 +4647,9 @@ class rpSBML:
         ----------
         rxn_id: str
             Reaction to read infos from
+        lazy: bool
+            If True, 'brsynth' and 'miriam' annotations are
+            decoded on first access and a LazyRecord is returned
 
         Returns
         -------
@@ -3857,31 +4659,40 @@ class rpSBML:
         reaction = self.getModel().getReaction(rxn_id)
         if reaction is None:
             return None
-        annot = reaction.getAnnotation()
         species = self.readReactionSpecies(reaction)
         fbc = reaction.getPlugin('fbc')
-        return {
-            # BRSynth annotations
-            'brsynth': self.readBRSYNTHAnnotation(annot, self.logger),
+        fields = {
             # species
             'left': species['left'],
             'right': species['right'],
-            # MIRIAM annotations
-            'miriam': self.readMIRIAMAnnotation(annot),
             # FBC values
             'fbc_lower_value': fbc.getLowerFluxBound(),
             'fbc_upper_value': fbc.getUpperFluxBound(),
             'reversible': reaction.getReversible()
         }
+        loaders = self._annotation_loaders(reaction)
+        if lazy:
+            return LazyRecord(fields, loaders)
+        return {
+            **{key: loader() for key, loader in loaders.items()},
+            **fields
+        }
 
 
     def read_species(
         self,
+        lazy: bool = False,
         logger: Logger = getLogger(__name__)
     ) -> Dict:
         """
         Read species field in rpSBML file for pathway_id.
 
+        Parameters
+        ----------
+        lazy: bool
+            If True, 'brsynth' and 'miriam' annotations of each species
+            are decoded on first access (see LazyRecord)
+
         Returns
         -------
         pathway: Dict
@@ -3889,14 +4700,44 @@ class rpSBML:
         """
         species_dict = {}
         for species in self.getModel().getListOfSpecies():
-            annot = species.getAnnotation()
-            species_dict[species.getId()] = {}
-            species_dict[species.getId()]['object'] = species
-            species_dict[species.getId()]['brsynth'] = self.readBRSYNTHAnnotation(annot, self.logger)
-            species_dict[species.getId()]['miriam']  = self.readMIRIAMAnnotation(annot)
+            loaders = self._annotation_loaders(species)
+            if lazy:
+                species_dict[species.getId()] = LazyRecord(
+                    {'object': species},
+                    loaders
+                )
+            else:
+                species_dict[species.getId()] = {
+                    'object': species,
+                    **{key: loader() for key, loader in loaders.items()}
+                }
 
         return species_dict
 
+    def _annotation_loaders(
+        self,
+        sbase_obj: libsbml.SBase
+    ) -> Dict[str, Callable]:
+        """Return the callables decoding the BRSynth and MIRIAM
+        annotations of a libSBML object.
+
+        :param sbase_obj: The libSBML object (species, reaction...)
+
+        :type sbase_obj: libsbml.SBase
+
+        :rtype: dict
+        :return: Callables keyed by 'brsynth' and 'miriam'
+        """
+        return {
+            'brsynth': lambda: self.readBRSYNTHAnnotation(
+                sbase_obj.getAnnotation(),
+                self.logger
+            ),
+            'miriam': lambda: self.readMIRIAMAnnotation(
+                sbase_obj.getAnnotation()
+            ),
+        }
+
 
     #########################################################################
     ################### CONVERT BETWEEEN FORMATS ############################
@@ -3929,12 +4770,10 @@ class rpSBML:
             member.setIdRef(member_id)
             group.addMember(member)
 
-        for key, value in infos.items():
-            self.updateBRSynth(
-                sbase_obj=self.getGroup('rp_pathway'),
-                annot_header=key,
-                value=value
-            )
+        self.updateBRSynthBulk(
+            sbase_obj=self.getGroup('rp_pathway'),
+            infos=infos
+        )
 
     def to_cobra(
         self,
@@ -4321,8 +5160,9 @@ class rpSBML:
                 param_id = 'BRS_FBC_'+str(round(abs(value), 4)).replace('.', '_')
             else:
                 param_id = 'BRS_FBC__'+str(round(abs(value), 4)).replace('.', '_')
-        if param_id in [i.getId() for i in self.getModel().getListOfParameters()]:
-            return self.getModel().getParameter(param_id)
+        param = self.getModel().getParameter(param_id)
+        if param is not None:
+            return param
         else:
             newParam = self.getModel().createParameter()
             rpSBML.checklibSBML(newParam, 'Creating a new parameter object')
@@ -4386,6 +5226,8 @@ class rpSBML:
         """
 
         reac = self.getModel().createReaction()
+        self._invalidate_species_degrees()
+        self._invalidate_reaction_index()
         rpSBML.checklibSBML(reac, 'create reaction')
 
         ################ FBC ####################
@@ -4462,21 +5304,14 @@ class rpSBML:
                 'set the stoichiometry ('+str(float(spe_sto))+')')
 
         ############################ MIRIAM ############################
-        rpSBML.checklibSBML(reac.setAnnotation(self._defaultBothAnnot(meta_id)), 'creating annotation')
-        self.addUpdateMIRIAM(reac, 'reaction', reacXref, meta_id)
         ###### BRSYNTH additional information ########
-        self.updateBRSynth(
-            sbase_obj=reac,
-            annot_header='smiles',
-            value=smiles,
-            meta_id=meta_id
+        self._setNewAnnotation(
+            reac,
+            'reaction',
+            reacXref,
+            [('smiles', smiles)] + list(infos.items()),
+            meta_id
         )
-        for key, value in infos.items():
-            self.updateBRSynth(
-                sbase_obj=reac,
-                annot_header=key,
-                value=value
-            )
 
     @staticmethod
     def formatId(id: str, logger: Logger=getLogger()) -> str:
@@ -4547,6 +5382,7 @@ class rpSBML:
         """
         spe = self.getModel().createSpecies()
         rpSBML.checklibSBML(spe, 'create species')
+        self._invalidate_species_index()
 
         # FBC.
         spe_fbc = spe.getPlugin('fbc')
@@ -4582,37 +5418,22 @@ class rpSBML:
         # this is setting MNX id as the name
         # this is setting the name as the input name
         # rpSBML.checklibSBML(spe.setAnnotation(self._defaultBRSynthAnnot(meta_id)), 'creating annotation')
-        rpSBML.checklibSBML(spe.setAnnotation(self._defaultBothAnnot(meta_id)), 'creating annotation')
         # Annotations.
-        self.addUpdateMIRIAM(spe, 'species', chemXref, meta_id)
-        if smiles is not None:
-            self.updateBRSynth(
-                sbase_obj=spe,
-                annot_header='smiles',
-                value=smiles,
-                meta_id=meta_id
-            )
-        if inchi is not None:
-            self.updateBRSynth(
-                sbase_obj=spe,
-                annot_header='inchi',
-                value=inchi,
-                meta_id=meta_id
-            )
-        if inchikey is not None:
-            self.updateBRSynth(
-                sbase_obj=spe,
-                annot_header='inchikey',
-                value=inchikey,
-                meta_id=meta_id
-            )
-        for key, value in infos.items():
-            self.updateBRSynth(
-                sbase_obj=spe,
-                annot_header=key,
-                value=value,
-                meta_id=meta_id
-            )
+        self._setNewAnnotation(
+            spe,
+            'species',
+            chemXref,
+            [
+                (key, value)
+                for key, value in [
+                    ('smiles', smiles),
+                    ('inchi', inchi),
+                    ('inchikey', inchikey)
+                ]
+                if value is not None
+            ] + list(infos.items()),
+            meta_id
+        )
 
 
     def createGroup(
@@ -4678,6 +5499,64 @@ class rpSBML:
         rpSBML.checklibSBML(member.setIdRef(idRef), 'Setting name to the groups member')
 
 
+    def remove_reactions(
+        self,
+        rxn_ids: List[str],
+        remove_orphans: bool = True
+    ) -> List[str]:
+        """Remove reactions from the model.
+
+        Group members that refer to removed elements are removed as well.
+
+        :param rxn_ids: IDs of the reactions to remove
+        :param remove_orphans: Also remove species that are not involved in any reaction anymore (Default: True)
+
+        :type rxn_ids: List[str]
+        :type remove_orphans: bool
+
+        :return: IDs of the removed species
+        :rtype: List[str]
+        """
+        model = self.getModel()
+
+        removed_ids = set()
+        for rxn_id in rxn_ids:
+            if model.removeReaction(rxn_id) is not None:
+                removed_ids.add(rxn_id)
+        self.logger.debug(f'{len(removed_ids)} reaction(s) removed')
+        self._invalidate_species_degrees()
+        self._invalidate_reaction_index()
+
+        removed_species = []
+        if remove_orphans:
+            used_species = set()
+            for rxn in model.getListOfReactions():
+                for spe_ref in (
+                    list(rxn.getListOfReactants())
+                    + list(rxn.getListOfProducts())
+                    + list(rxn.getListOfModifiers())
+                ):
+                    used_species.add(spe_ref.getSpecies())
+            removed_species = [
+                spe.getId()
+                for spe in model.getListOfSpecies()
+                if spe.getId() not in used_species
+            ]
+            for spe_id in removed_species:
+                model.removeSpecies(spe_id)
+            self.logger.debug(f'{len(removed_species)} orphan species removed')
+            self._invalidate_species_index()
+        removed_ids.update(removed_species)
+
+        # Clean groups from references to removed elements
+        for group in self.getListOfGroups():
+            for i in reversed(range(group.getNumMembers())):
+                if group.getMember(i).getIdRef() in removed_ids:
+                    group.removeMember(i)
+
+        return removed_species
+
+
     def createFluxObj(self, fluxobj_id, reactionName, coefficient, isMax=True, meta_id=None):
         """Create libSBML flux objective
 
@@ -4773,6 +5652,20 @@ class rpSBML:
         self.logger.debug(f'Compartments: {compartments}')
         self.logger.debug(f'Unit Definitions: {unit_def}')
 
+        # The skeleton (unit definitions and compartments) is built once
+        # for each set of definitions, then cloned for each model
+        skeleton_key = json_dumps([compartments, unit_def], default=str)
+        skeleton = rpSBML._skeletons.get(skeleton_key)
+        if skeleton is not None:
+            self.document = skeleton.clone()
+            rpSBML.checklibSBML(self.document, 'cloning skeleton document')
+            self.sbmlns = self.document.getSBMLNamespaces()
+            rpSBML.checklibSBML(self.getModel().setId(modelID), 'setting the model ID')
+            rpSBML.checklibSBML(self.getModel().setMetaId(self._genMetaID(modelID)), 'setting model meta_id')
+            rpSBML.checklibSBML(self.getModel().setName(modelName), 'setting model name')
+            self.logger.debug('Generic model created from skeleton')
+            return
+
         self.createModel(modelName, modelID)
         for unit_id, unit_data in unit_def.items():
             unitDef = self.createUnitDefinition(unit_id)
@@ -4788,4 +5681,8 @@ class rpSBML:
             self.createCompartment(1, comp_id, comp['name'], comp_lst)
             # self.createCompartment(1, comp_id, comp['name'], comp['annot'])
 
+        if len(rpSBML._skeletons) >= SKELETON_CACHE_SIZE:
+            del rpSBML._skeletons[next(iter(rpSBML._skeletons))]
+        rpSBML._skeletons[skeleton_key] = self.document.clone()
+
         self.logger.debug('Generic model created')
\ No newline at end of file
@@ -0,0 +1,281 @@
+"""Streaming, read-only reader of rpSBML files.
+
+Bulk consumers (ranking, reports...) only need the BRSynth annotations
+of the pathway, of its reactions and of its species. Building a full
+libSBML document and rpPathway object for each file is costly, so this
+module reads the XML in a single pass and returns plain records.
+"""
+from gzip import open as gzip_open
+from xml.etree.ElementTree import (
+    iterparse,
+    Element
+)
+from logging import (
+    Logger,
+    getLogger
+)
+from typing import (
+    Dict,
+    List,
+    TypeVar
+)
+from .rpSBML import parse_annotation_value
+from .rpBinary import (
+    is_binary_file,
+    read_binary
+)
+
+
+# Magic number of gzip files
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+def _local(tag: str) -> str:
+    """Return the tag without its namespace."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child(elem: Element, name: str) -> Element:
+    """Return the first child of elem with the local name, None otherwise."""
+    if elem is None:
+        return None
+    for child in elem:
+        if _local(child.tag) == name:
+            return child
+    return None
+
+
+def _children(elem: Element, name: str) -> List[Element]:
+    """Return the children of the first child of elem with the local name."""
+    child = _child(elem, name)
+    return [] if child is None else list(child)
+
+
+def _attr(elem: Element, name: str, default: str = '') -> str:
+    """Return the attribute value whatever its namespace."""
+    if name in elem.attrib:
+        return elem.attrib[name]
+    for key, value in elem.attrib.items():
+        if _local(key) == name:
+            return value
+    return default
+
+
+def read_brsynth(annot: Element) -> Dict:
+    """Return the BRSynth annotations of an <annotation> element.
+
+    Values are decoded the same way as rpSBML.readBRSYNTHAnnotation().
+
+    :param annot: The annotation element
+
+    :type annot: Element
+
+    :rtype: dict
+    :return: Dictionary of all the BRSynth annotations
+    """
+    bag = _child(_child(_child(annot, 'RDF'), 'BRSynth'), 'brsynth')
+    if bag is None:
+        return {}
+    toRet = {}
+    for ann in bag:
+        name = _local(ann.tag)
+        # Read list
+        if name.startswith('tmpl_rxn_ids') or name.startswith('rule_ids'):
+            toRet[name] = [_local(child.tag) for child in ann]
+        # Read dict
+        elif (
+            name.startswith('thermo_')
+            or name.startswith('fba_')
+            or name.startswith('selenzy_')
+        ):
+            toRet[name] = {
+                _local(child.tag): parse_annotation_value(_attr(child, 'value'))
+                for child in ann
+            }
+        else:
+            toRet[name] = parse_annotation_value(_attr(ann, 'value'))
+            if name == 'smiles':
+                toRet[name] = toRet[name].replace('&gt;', '>')
+    return toRet
+
+
+def read_miriam(annot: Element) -> List[str]:
+    """Return the MIRIAM annotations of an <annotation> element.
+
+    :param annot: The annotation element
+
+    :type annot: Element
+
+    :rtype: list
+    :return: List of all the annotations
+    """
+    desc = _child(_child(annot, 'RDF'), 'Description')
+    toRet = []
+    for qualifier in ['is', 'isRelatedTo']:
+        bag = _child(_child(desc, qualifier), 'Bag')
+        if bag is None:
+            continue
+        for li in bag:
+            toRet.append(next(iter(li.attrib.values()), ''))
+    return toRet
+
+
+def _model_name(name: str, id: str) -> str:
+    """Return the model name the same way rpSBML.getName() does."""
+    name = name if name else id
+    if not name:
+        return 'dummy'
+    return name if name[0].isalpha() else 'rp_'+name
+
+
+def _read_species_refs(elem: Element, list_name: str) -> Dict[str, int]:
+    return {
+        _attr(spe_ref, 'species'): int(float(_attr(spe_ref, 'stoichiometry', '1')))
+        for spe_ref in _children(elem, list_name)
+    }
+
+
+def read_pathway_record(
+    infile: str,
+    species: bool = True,
+    logger: Logger = getLogger(__name__)
+) -> Dict:
+    """Read a rpSBML file in a single streaming pass.
+
+    Binary pathway files (see rpPathway.to_binary()) are accepted as well,
+    in which case flux bounds are values instead of parameter IDs.
+
+    Parameters
+    ----------
+    infile: str
+        Path to the rpSBML file (possibly gzipped) or binary pathway file
+    species: bool, optional
+        If False, species are not read (default: True)
+    logger : Logger, optional
+
+    Returns
+    -------
+    record: Dict
+        'id': name of the pathway (as rpPathway.get_id()),
+        'model_id': ID of the model,
+        'pathway': BRSynth annotations of the 'rp_pathway' group,
+        'groups': members of each group,
+        'reactions': for each reaction, 'left', 'right', 'reversible',
+            'fbc_lower_value', 'fbc_upper_value', 'brsynth' and 'miriam',
+        'species': for each species, 'compartment', 'name',
+            'brsynth' and 'miriam'
+    """
+    if is_binary_file(infile):
+        return _from_binary_record(
+            read_binary(infile, logger),
+            species
+        )
+
+    logger.debug(f'Streaming {infile}...')
+
+    with open(infile, 'rb') as fp:
+        is_gz = fp.read(2) == _GZIP_MAGIC
+    opener = gzip_open if is_gz else open
+
+    record = {
+        'id': '',
+        'model_id': '',
+        'pathway': {},
+        'groups': {},
+        'reactions': {},
+        'species': {},
+    }
+    model_name = ''
+
+    with opener(infile, 'rb') as fp:
+        for event, elem in iterparse(fp, events=('start', 'end')):
+            tag = _local(elem.tag)
+
+            if event == 'start':
+                if tag == 'model':
+                    record['model_id'] = _attr(elem, 'id')
+                    model_name = _attr(elem, 'name')
+                continue
+
+            if tag == 'species':
+                if species:
+                    annot = _child(elem, 'annotation')
+                    record['species'][_attr(elem, 'id')] = {
+                        'compartment': _attr(elem, 'compartment'),
+                        'name': _attr(elem, 'name'),
+                        'brsynth': read_brsynth(annot),
+                        'miriam': read_miriam(annot),
+                    }
+                elem.clear()
+
+            elif tag == 'reaction':
+                annot = _child(elem, 'annotation')
+                record['reactions'][_attr(elem, 'id')] = {
+                    'left': _read_species_refs(elem, 'listOfReactants'),
+                    'right': _read_species_refs(elem, 'listOfProducts'),
+                    'reversible': _attr(elem, 'reversible') == 'true',
+                    'fbc_lower_value': _attr(elem, 'lowerFluxBound'),
+                    'fbc_upper_value': _attr(elem, 'upperFluxBound'),
+                    'brsynth': read_brsynth(annot),
+                    'miriam': read_miriam(annot),
+                }
+                elem.clear()
+
+            elif tag == 'group':
+                group_id = _attr(elem, 'id')
+                record['groups'][group_id] = [
+                    _attr(member, 'idRef')
+                    for member in _children(elem, 'listOfMembers')
+                ]
+                if group_id == 'rp_pathway':
+                    record['pathway'] = read_brsynth(
+                        _child(elem, 'annotation')
+                    )
+                elem.clear()
+
+    record['id'] = _model_name(model_name, record['model_id'])
+
+    return record
+
+
+def _from_binary_record(binary_record: Dict, species: bool) -> Dict:
+    """Return the record of a pathway read from a binary file."""
+    keys = [
+        'left', 'right', 'reversible',
+        'fbc_lower_value', 'fbc_upper_value',
+        'brsynth', 'miriam'
+    ]
+    return {
+        'id': _model_name(binary_record['id'], binary_record['id']),
+        'model_id': binary_record['id'],
+        'pathway': binary_record['pathway'],
+        'groups': binary_record['groups'],
+        'reactions': {
+            rxn_id: {key: rxn[key] for key in keys}
+            for rxn_id, rxn in binary_record['reactions'].items()
+        },
+        'species': binary_record['species'] if species else {},
+    }
+
+
+def get_pathway_reactions(record: Dict) -> Dict:
+    """Return the reactions of the 'rp_pathway' group of a record."""
+    return {
+        rxn_id: record['reactions'][rxn_id]
+        for rxn_id in record['groups'].get('rp_pathway', [])
+        if rxn_id in record['reactions']
+    }
+
+
+def get_ec_numbers(reaction: Dict) -> List[str]:
+    """Return the EC numbers from the MIRIAM annotations of a reaction record."""
+    return [
+        info.split('/')[-1]
+        for info in reaction['miriam']
+        if 'ec-code' in info
+    ]
+
+
+def get_global_score(record: Dict) -> TypeVar:
+    """Return the global score of the pathway (-1 if not scored)."""
+    return record['pathway'].get('global_score', -1)
@@ -0,0 +1,348 @@
+"""Sparse-matrix graph of the species and reactions of a rpSBML.
+
+Same queries as rpGraph, but the bipartite graph is stored as two
+species x reactions sparse matrices (reactants and products) with integer
+node indices, instead of networkx nodes holding all the annotations.
+Annotations are read from the rpSBML only when a node is asked for.
+"""
+import numpy as np
+from scipy.sparse import coo_matrix
+from logging import (
+    Logger,
+    getLogger
+)
+from typing import (
+    Dict,
+    List
+)
+
+
+class rpSparseGraph:
+    """The class that hosts the sparse-matrix graph of a rpSBML
+    """
+    def __init__(
+        self,
+        rpsbml,
+        is_gem_sbml: bool,
+        pathway_id: str = 'rp_pathway',
+        central_species_group_id: str = 'rp_trunk_species',
+        sink_species_group_id: str = 'rp_sink_species',
+        logger: Logger = getLogger(__name__)
+    ):
+        """Constructor of the class
+
+        Automatically constructs the network when calling the construtor
+
+        :param rpsbml: The rpSBML object
+        :param is_gem_sbml: If True then all the species and reactions will be added and not just the heterologous pathway.
+        :param pathway_id: The pathway id of the heterologous pathway
+        :param central_species_group_id: The id of the central species
+        :param sink_species_group_id: The id of the sink species
+
+        :type rpsbml: rpSBML
+        :type is_gem_sbml: bool
+        :type pathway_id: str
+        :type central_species_group_id: str
+        :type sink_species_group_id: str
+        """
+        self.logger = logger
+
+        self.logger.debug('New instance of rpSparseGraph')
+
+        self.rpsbml = rpsbml
+        self.pathway_id = pathway_id
+        self.central_species_group_id = central_species_group_id
+        self.sink_species_group_id = sink_species_group_id
+        # Node IDs, per integer index
+        self.species = []
+        self.reactions = []
+        # Integer index, per node ID
+        self.species_index = {}
+        self.reactions_index = {}
+        # species x reactions, stoichiometry of reactants (species -> reaction edges)
+        # and products (reaction -> species edges), by rows (CSR) and columns (CSC)
+        self.reactants_csr = None
+        self.reactants_csc = None
+        self.products_csr = None
+        self.products_csc = None
+        # Attributes of the nodes, per species/reaction index
+        self.rp_pathway_species = np.zeros(0, dtype=bool)
+        self.rp_trunk_species = np.zeros(0, dtype=bool)
+        self.rp_sink_species = np.zeros(0, dtype=bool)
+        self.rp_pathway_reactions = np.zeros(0, dtype=bool)
+        # Nodes read from the rpSBML (see get_node())
+        self.__nodes = {}
+        self.num_reactions = 0
+        self.num_species = 0
+        if rpsbml:
+            self.__makeGraph(is_gem_sbml)
+
+
+    def __group_members(self, group_id: str) -> List[str]:
+        group = self.rpsbml.getGroup(group_id)
+        if group is None:
+            return []
+        return [member.getIdRef() for member in group.getListOfMembers()]
+
+
+    def __makeGraph(self, is_gem_sbml: bool) -> None:
+        """Private function that constructs the sparse matrices
+
+        :param is_gem_sbml: Determine what type of graph to build. If True then all the species and reactions will be added and not just the heterologous pathway.
+
+        :type is_gem_sbml: bool
+
+        :return: None
+        :rtype: None
+        """
+        model = self.rpsbml.getModel()
+        rp_species_id = set(self.rpsbml.readUniqueRPspecies())
+        rp_reactions_id = set(self.__group_members(self.pathway_id))
+
+        def add_species(spe_id: str) -> int:
+            if spe_id not in self.species_index:
+                self.species_index[spe_id] = len(self.species)
+                self.species.append(spe_id)
+            return self.species_index[spe_id]
+
+        for species in model.getListOfSpecies():
+            if is_gem_sbml or species.getId() in rp_species_id:
+                add_species(species.getId())
+
+        rows = {'reactants': [], 'products': []}
+        cols = {'reactants': [], 'products': []}
+        stoichio = {'reactants': [], 'products': []}
+        for reaction in model.getListOfReactions():
+            if not (is_gem_sbml or reaction.getId() in rp_reactions_id):
+                continue
+            rxn_idx = len(self.reactions)
+            self.reactions_index[reaction.getId()] = rxn_idx
+            self.reactions.append(reaction.getId())
+            for side, spe_refs in [
+                ('reactants', reaction.getListOfReactants()),
+                ('products', reaction.getListOfProducts())
+            ]:
+                for spe_ref in spe_refs:
+                    # Species referenced but not defined are added as well
+                    rows[side].append(add_species(spe_ref.getSpecies()))
+                    cols[side].append(rxn_idx)
+                    stoichio[side].append(spe_ref.getStoichiometry())
+
+        shape = (len(self.species), len(self.reactions))
+        for side in ['reactants', 'products']:
+            matrix = coo_matrix(
+                (
+                    np.array(stoichio[side], dtype=float),
+                    (
+                        np.array(rows[side], dtype=np.int64),
+                        np.array(cols[side], dtype=np.int64)
+                    )
+                ),
+                shape=shape
+            )
+            setattr(self, f'{side}_csr', matrix.tocsr())
+            setattr(self, f'{side}_csc', matrix.tocsc())
+
+        def flags(ids: List[str], members: List[str]) -> np.ndarray:
+            members = set(members)
+            return np.array([node_id in members for node_id in ids], dtype=bool)
+
+        self.rp_pathway_species = flags(self.species, rp_species_id)
+        self.rp_trunk_species = flags(self.species, self.__group_members(self.central_species_group_id))
+        self.rp_sink_species = flags(self.species, self.__group_members(self.sink_species_group_id))
+        self.rp_pathway_reactions = flags(self.reactions, rp_reactions_id)
+        self.num_species, self.num_reactions = shape
+        self.logger.debug(f'{self.num_species} species, {self.num_reactions} reactions')
+
+
+    ######################################################################################################
+    ########################################## Public Function ###########################################
+    ######################################################################################################
+
+
+    def in_degrees(self) -> np.ndarray:
+        """Return the number of reactions producing each species
+
+        :return: Degrees, per species index
+        :rtype: np.ndarray
+        """
+        return np.diff(self.products_csr.indptr)
+
+
+    def out_degrees(self) -> np.ndarray:
+        """Return the number of reactions consuming each species
+
+        :return: Degrees, per species index
+        :rtype: np.ndarray
+        """
+        return np.diff(self.reactants_csr.indptr)
+
+
+    def predecessors(self, node_id: str) -> List[str]:
+        """Return the predecessors of a node, i.e. the reactions producing
+        a species or the reactants of a reaction
+
+        :param node_id: The id of the node
+
+        :type node_id: str
+
+        :return: List of node ids
+        :rtype: list
+        """
+        if node_id in self.species_index:
+            return self.__row(self.products_csr, self.species_index[node_id])
+        return self.__col(self.reactants_csc, self.reactions_index[node_id])
+
+
+    def successors(self, node_id: str) -> List[str]:
+        """Return the successors of a node, i.e. the reactions consuming
+        a species or the products of a reaction
+
+        :param node_id: The id of the node
+
+        :type node_id: str
+
+        :return: List of node ids
+        :rtype: list
+        """
+        if node_id in self.species_index:
+            return self.__row(self.reactants_csr, self.species_index[node_id])
+        return self.__col(self.products_csc, self.reactions_index[node_id])
+
+
+    def __row(self, matrix, idx: int) -> List[str]:
+        start, end = matrix.indptr[idx], matrix.indptr[idx+1]
+        return [self.reactions[i] for i in matrix.indices[start:end]]
+
+
+    def __col(self, matrix, idx: int) -> List[str]:
+        start, end = matrix.indptr[idx], matrix.indptr[idx+1]
+        return [self.species[i] for i in matrix.indices[start:end]]
+
+
+    def get_node(self, node_id: str) -> Dict:
+        """Return the attributes of a node, as in rpGraph.
+        Annotations are read from the rpSBML at the first call.
+
+        :param node_id: The id of the node
+
+        :type node_id: str
+
+        :return: Attributes of the node, None if the node does not exist
+        :rtype: dict
+        """
+        if node_id not in self.__nodes:
+            model = self.rpsbml.getModel()
+            if node_id in self.species_index:
+                idx = self.species_index[node_id]
+                sbase = model.getSpecies(node_id)
+                node = {
+                    'type': 'species',
+                    'name': sbase.getName() if sbase else '',
+                    'rp_trunk_species': bool(self.rp_trunk_species[idx]),
+                    'rp_sink_species': bool(self.rp_sink_species[idx]),
+                    'rp_pathway': bool(self.rp_pathway_species[idx])
+                }
+            elif node_id in self.reactions_index:
+                sbase = model.getReaction(node_id)
+                node = {
+                    'type': 'reaction',
+                    'rp_pathway': bool(self.rp_pathway_reactions[self.reactions_index[node_id]])
+                }
+            else:
+                return None
+            annot = sbase.getAnnotation() if sbase else None
+            node['miriam'] = self.rpsbml.readMIRIAMAnnotation(annot) if annot else []
+            node['brsynth'] = self.rpsbml.readBRSYNTHAnnotation(annot, self.logger) if annot else {}
+            self.__nodes[node_id] = node
+        return self.__nodes[node_id]
+
+
+    def __isolatedSpecies(
+        self,
+        eq_0: np.ndarray,
+        gt_0: np.ndarray,
+        species: List[str] = [],
+        only_central: bool = False,
+        only_rp_pathway: bool = True
+    ) -> List[str]:
+        """Private function that returns the pathway species with no edge on one side (eq_0)
+        and at least one on the other side (gt_0)
+
+        :param eq_0: Degrees that must be null, per species index
+        :param gt_0: Degrees that must be positive, per species index
+        :param species: Species to check (Default: all)
+        :param only_central: Focus on the central species only
+        :param only_rp_pathway: Focus on the pathway species only
+
+        :type eq_0: np.ndarray
+        :type gt_0: np.ndarray
+        :type species: List[str]
+        :type only_central: bool
+        :type only_rp_pathway: bool
+
+        :return: List of node ids
+        :rtype: list
+        """
+        if only_central or only_rp_pathway:
+            selected = (
+                (only_central & self.rp_trunk_species)
+                | (only_rp_pathway & self.rp_pathway_species)
+            )
+        else:
+            selected = np.ones(self.num_species, dtype=bool)
+        # NOTE: if central species then must also be rp_pathway species
+        isolated = self.rp_pathway_species & selected & (gt_0 > 0) & (eq_0 == 0)
+        if not species:
+            return [self.species[i] for i in np.flatnonzero(isolated)]
+        return [
+            spe_id for spe_id in species
+            if spe_id in self.species_index
+            and isolated[self.species_index[spe_id]]
+        ]
+
+
+    def onlyConsumedSpecies(self, species=[], only_central=False, only_rp_pathway=True):
+        """Public function that returns the single parent species that are consumed only
+
+        :param species: Species to check (Default: all)
+        :param only_central: Focus on the central species only
+        :param only_rp_pathway: Focus on the pathway species only
+
+        :type species: List[str]
+        :type only_central: bool
+        :type only_rp_pathway: bool
+
+        :return: List of node ids
+        :rtype: list
+        """
+        return self.__isolatedSpecies(
+            species=species,
+            only_central=only_central,
+            only_rp_pathway=only_rp_pathway,
+            eq_0=self.in_degrees(),
+            gt_0=self.out_degrees()
+        )
+
+
+    def onlyProducedSpecies(self, species=[], only_central=False, only_rp_pathway=True):
+        """Public function that returns the single parent produced species
+
+        :param species: Species to check (Default: all)
+        :param only_central: Focus on the central species only
+        :param only_rp_pathway: Focus on the pathway species only
+
+        :type species: List[str]
+        :type only_central: bool
+        :type only_rp_pathway: bool
+
+        :return: List of node ids
+        :rtype: list
+        """
+        return self.__isolatedSpecies(
+            species=species,
+            only_central=only_central,
+            only_rp_pathway=only_rp_pathway,
+            eq_0=self.out_degrees(),
+            gt_0=self.in_degrees()
+        )
@@ -1,7 +1,10 @@
 from os import path as os_path
 from .rprank import rank
 from .Args import add_arguments
-from rptools.rplibs import rpPathway
+from rptools.rplibs import (
+    read_pathway_record,
+    get_global_score
+)
 from rptools import build_args_parser
 
 
@@ -19,14 +22,17 @@ def entry_point():
 
     # Build the list of pathways to rank (with their filename)
     pathways = {}
+    # Only the global score is needed, stream files instead of
+    # building the whole pathways
     for pathway_fname in args.pathways:
-        pathway = rpPathway(
+        record = read_pathway_record(
             infile=pathway_fname,
+            species=False,
             logger=logger
         )
-        pathway_name = pathway.get_id().replace(' ', '_')
+        pathway_name = record['id'].replace(' ', '_')
         pathways[pathway_name] = {
-            'pathway': pathway,
+            'global_score': get_global_score(record),
             'filename': pathway_fname
         }
 
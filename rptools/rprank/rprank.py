@@ -4,7 +4,13 @@ from typing import (List, Dict)
 def rank(pathways: Dict) -> List[str]:
     _pathways = {}
     for pathway_name, pathway in pathways.items():
-        _pathways[pathway_name] = str(pathway['pathway'].get_global_score())
+        # Either a score already read (see rplibs.read_pathway_record)
+        # or a rpPathway object
+        if 'global_score' in pathway:
+            score = pathway['global_score']
+        else:
+            score = pathway['pathway'].get_global_score()
+        _pathways[pathway_name] = str(score)
     sorted_pathways = dict(
         sorted(
             _pathways.items(),
@@ -17,23 +17,29 @@ from shutil import copyfile
 from pathlib import Path
 from rptools.rplibs import (
     rpSBML,
-    rpPathway,
-    rpReaction
+    rpReaction,
+    rpGraph,
+    read_pathway_record,
+    get_pathway_reactions,
+    get_ec_numbers,
+    get_global_score
 )
+from rptools.rplibs.rpBinary import BINARY_EXT
 
 from typing import(
     Dict,
     List
 )
-from copy import deepcopy
 
-def get_reactions_data(rxn_dict: dict):
+def get_reactions_data(rxn_dict: dict, species: list = None):
     """Extract, sort and return a dictionary of reactions data
 
     Parameters
     ----------
     rxn_dict : dict
-        data of 'reactions' element of a pathway dictionary
+        reactions of a pathway record (see rplibs.read_pathway_record)
+    species : list, optional
+        central species linking the reactions (default: all species)
 
     Returns
     -------
@@ -43,25 +49,29 @@ def get_reactions_data(rxn_dict: dict):
 
     # init
     _reactions = {}
+    # steps of the reactions from the pathway topology,
+    # for reactions without position in the pathway
+    steps = rpGraph.reaction_steps(rxn_dict, species=species)
 
     for rxn_id, rxn in rxn_dict.items():
 
         _reactions[rxn_id] = {}
+        brsynth = rxn['brsynth']
 
         # We store step number of the reaction
-        _reactions[rxn_id]['rxn_idx'] = int(rxn.get_idx_in_path())
+        _reactions[rxn_id]['rxn_idx'] = int(brsynth.get('idx_in_path', steps[rxn_id]))
 
         # We store all the ec-codes
-        _reactions[rxn_id]['ec_code'] = deepcopy(rxn.get_ec_numbers())
+        _reactions[rxn_id]['ec_code'] = get_ec_numbers(rxn)
 
         # We store the dfg_prime
-        dfG_prime_m = rxn.get_thermo_dGm_prime()
+        dfG_prime_m = brsynth.get('thermo_dGm_prime', {})
 
         # print(dfG_prime_m)
         _reactions[rxn_id]['dfG_prime_m'] = float(dfG_prime_m.get('value'))
 
         # We store the rule_score
-        _reactions[rxn_id]['rule_score'] = float(rxn.get_rule_score())
+        _reactions[rxn_id]['rule_score'] = float(brsynth.get('rule_score', 'NaN'))
 
     # sorting dict by rxn_idx by reinserting values
     __reactions = dict(sorted(_reactions.items(), key=lambda item: item[1]['rxn_idx']))
@@ -97,17 +107,25 @@ def to_data_js(sbml_files: list, source_path: str, output_folder: str, verbose:
         if verbose:
             print("Parsing", name)
 
-        pathway = rpPathway(infile=os.path.join(source_path, name))
-        
-        rp_name = pathway.get_id()
+        # Only a few annotations are needed, stream the file
+        # instead of building the whole pathway
+        pathway = read_pathway_record(
+            os.path.join(source_path, name),
+            species=False
+        )
+
+        rp_name = pathway['id']
         if verbose:
             print("Path_id found:", rp_name)
-        dfG_prime_m = pathway.get_thermo_dGm_prime()
-        fba_obj_fraction = pathway.get_fba_fraction()
-        nb_reactions = pathway.get_nb_reactions()
-        reactions = pathway.get_reactions()
-        global_score = pathway.get_global_score()
-        mean_rule_score = pathway.get_mean_rule_score()
+        dfG_prime_m = pathway['pathway'].get('thermo_dGm_prime', {})
+        fba_obj_fraction = pathway['pathway'].get('fba_fraction', {})
+        reactions = get_pathway_reactions(pathway)
+        nb_reactions = len(reactions)
+        global_score = get_global_score(pathway)
+        mean_rule_score = sum(
+            float(rxn['brsynth'].get('rule_score', 'NaN'))
+            for rxn in reactions.values()
+        ) / nb_reactions
 
         # adding necessary values to the list
         rp_list.append({
@@ -117,7 +135,11 @@ def to_data_js(sbml_files: list, source_path: str, output_folder: str, verbose:
             'fba_obj_fraction': fba_obj_fraction.get('value'),
             'mean_rule_score': mean_rule_score,
             'nb_reactions': nb_reactions,
-            'reactions': get_reactions_data(reactions)
+            'reactions': get_reactions_data(
+                reactions,
+                # cofactors would link reactions in both ways
+                pathway['groups'].get('rp_trunk_species') or None
+            )
         })
 
         # sorting list by pathway_name
@@ -237,7 +259,8 @@ def run_report(input_dir: bool, source_path: str, output_folder: str, dev: bool=
 
     # if -d option exists then parse files in the directory
     if input_dir:
-        files = fnmatch.filter(os.listdir(source_path), "*.xml")
+        files = fnmatch.filter(os.listdir(source_path), "*.xml") \
+            + fnmatch.filter(os.listdir(source_path), f"*{BINARY_EXT}")
         files.sort()
         rp_list = to_data_js(files, source_path, output_folder, verbose, dev)
     else:
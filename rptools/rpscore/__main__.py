@@ -81,7 +81,7 @@ def entry_point():
     # Write results into the pathway
     pathway.set_global_score(score)
     # Write pathway into file
-    pathway.to_rpSBML().write_to_file(
+    pathway.write_to_file(
         args.outfile
     )
 
@@ -3,17 +3,20 @@ from argparse import ArgumentParser
 DEFAULT_pH = 7.5
 DEFAULT_pMg = 3.0
 DEFAULT_ionic_strength = 0.25
+DEFAULT_stdev_factor = 1.96
 MIN_pH = 0
 MAX_pH = 14
 MIN_ionic_strength = 0
 MAX_ionic_strength = 500
+DEFAULT_cache_dir = ''
+DEFAULT_nb_workers = 1
 
 
 def add_arguments(parser: ArgumentParser) -> ArgumentParser:
 
     # positional arguments
-    parser.add_argument('infile',    type=str, help='pathway as rpSBML file')
-    parser.add_argument('outfile',   type=str, help='updated pathway as rpSBML file')
+    parser.add_argument('infile',    type=str, help='pathway as rpSBML file, or folder or tar archive of pathways')
+    parser.add_argument('outfile',   type=str, help='updated pathway as rpSBML file, or folder or tar archive (.tar, .tar.gz, .tgz) of updated pathways')
 
     # optional arguments
     parser.add_argument(
@@ -33,6 +36,28 @@ def add_arguments(parser: ArgumentParser) -> ArgumentParser:
         type=float,
         default=DEFAULT_pMg
     )
+    parser.add_argument(
+        '--stdev_factor',
+        type=float,
+        default=DEFAULT_stdev_factor,
+        help='number of standard deviations standard dG\'0 can move by in the MDF analysis '
+             f'(default: {DEFAULT_stdev_factor}, 0 to ignore uncertainties)'
+    )
+    parser.add_argument(
+        '--cache_dir',
+        type=str,
+        default=DEFAULT_cache_dir,
+        help='folder where eQuilibrator lookups and reaction thermodynamics are kept between runs, '
+             'e.g. ~/.cache/rptools/rpthermo (default: not kept). '
+             'Must be emptied when the eQuilibrator cache is updated'
+    )
+    parser.add_argument(
+        '--nb_workers',
+        type=int,
+        default=DEFAULT_nb_workers,
+        help='number of pathways processed in parallel when infile is a folder or an archive, '
+             f'by forked workers sharing the eQuilibrator model (default: {DEFAULT_nb_workers})'
+    )
     # parser.add_argument('--temp_k'         , type=float)
 
     return parser
@@ -10,5 +10,6 @@ from rptools.rpthermo.rpthermo import (
     runThermo,
     initThermo
 )
+from rptools.rpthermo.cache import LookupCache
 
-__all__ = ['runThermo', 'initThermo']
+__all__ = ['runThermo', 'initThermo', 'LookupCache']
@@ -4,12 +4,37 @@ from logging import (
     Logger,
     getLogger
 )
-from typing import Dict
+from os import (
+    makedirs,
+    path as os_path
+)
+from time import perf_counter
+from glob import glob
+import tarfile
+from tempfile import TemporaryDirectory
+from typing import (
+    Dict,
+    List
+)
 from colored import fg, bg, attr
-from rptools.rpthermo import runThermo
+from rptools.rpthermo import (
+    runThermo,
+    initThermo
+)
+from rptools.rpthermo.rpthermo import (
+    runThermo_batch,
+    COMPOUND_CACHE,
+    THERMO_CACHE
+)
+from rptools.rpthermo.cache import LookupCache
 from rptools.rpthermo.Args import add_arguments
 from rptools import build_args_parser
 from rptools.rplibs import rpPathway
+from rptools.rplibs.rpBinary import BINARY_EXT
+
+# Pathway files searched for in a folder or an archive
+PATHWAY_PATTERNS = ['*.xml', '*.xml.gz', f'*{BINARY_EXT}']
+TAR_EXTS = ('.tar', '.tar.gz', '.tgz')
 
 
 def _cli():
@@ -24,7 +49,7 @@ def _cli():
     logger = init(parser, args)
 
     msg = f'Parameters\n----------\n'
-    for param in ['pH', 'ionic_strength', 'pMg']:
+    for param in ['pH', 'ionic_strength', 'pMg', 'stdev_factor']:
         value = getattr(args, param)
         msg += f'- {param}: {value}\n'
     logger.info(
@@ -35,6 +60,27 @@ def _cli():
         )
     )
 
+    # Compounds already searched within eQuilibrator
+    # and reactions already evaluated
+    if args.cache_dir:
+        compound_cache = LookupCache(
+            filename=os_path.join(args.cache_dir, 'compounds.json'),
+            logger=logger
+        )
+        thermo_cache = LookupCache(
+            filename=os_path.join(args.cache_dir, 'reactions.json'),
+            maxsize=THERMO_CACHE.maxsize,
+            logger=logger
+        )
+    else:
+        compound_cache = COMPOUND_CACHE
+        thermo_cache = THERMO_CACHE
+
+    # Many pathways (folder or archive)
+    if os_path.isdir(args.infile) or tarfile.is_tarfile(args.infile):
+        batch(args, compound_cache, thermo_cache, logger)
+        return
+
     ## READ PATHWAY FROM FILE
     pathway = rpPathway(
       infile=args.infile,
@@ -47,13 +93,16 @@ def _cli():
         ph=args.pH,
         ionic_strength=args.ionic_strength,
         pMg=args.pMg,
+        stdev_factor=args.stdev_factor,
+        compound_cache=compound_cache,
+        thermo_cache=thermo_cache,
         logger=logger
     )
 
     # Print results
     print_results(pathway, results, logger)
     # Write pathway into file
-    pathway.to_rpSBML().write_to_file(args.outfile)
+    pathway.write_to_file(args.outfile)
     logger.info(
         "{color}{typo}Written into file: {file}{rst}".format(
             color=fg('white'),
@@ -64,6 +113,148 @@ def _cli():
     )
 
 
+def list_pathway_files(folder: str) -> List[str]:
+    files = []
+    for pattern in PATHWAY_PATTERNS:
+        files += glob(os_path.join(folder, pattern))
+        # Archives may have a root folder
+        files += glob(os_path.join(folder, '*', pattern))
+    # Remove tar "fork" files if any (name starts by ._)
+    return sorted(
+        f for f in files
+        if not os_path.basename(f).startswith('._')
+    )
+
+
+def extract_archive(filename: str, folder: str) -> None:
+    '''Extract a tar archive into folder, refusing members
+    (absolute paths, '../', links) that would be written outside of it'''
+    with tarfile.open(filename, mode='r') as tar:
+        if hasattr(tarfile, 'data_filter'):
+            tar.extractall(path=folder, filter='data')
+            return
+        # Python versions without extraction filters
+        root = os_path.realpath(folder)
+        for member in tar.getmembers():
+            path = os_path.realpath(os_path.join(root, member.name))
+            if (
+                os_path.commonpath([root, path]) != root
+                or member.issym() or member.islnk()
+            ):
+                raise tarfile.TarError(f'Member {member.name} of {filename} would be extracted outside of {folder}')
+        tar.extractall(path=folder)
+
+
+def batch(
+    args,
+    compound_cache: LookupCache,
+    thermo_cache: LookupCache,
+    logger: Logger=getLogger(__name__)
+) -> None:
+    with TemporaryDirectory() as tmp_folder:
+        # Input pathways
+        if os_path.isdir(args.infile):
+            in_folder = args.infile
+        else:
+            in_folder = os_path.join(tmp_folder, 'in')
+            extract_archive(args.infile, in_folder)
+        infiles = list_pathway_files(in_folder)
+        if not infiles:
+            raise FileNotFoundError(f'No pathway found in "{args.infile}"')
+
+        # Output pathways, either in a folder or in an archive
+        if args.outfile.endswith(TAR_EXTS):
+            out_folder = os_path.join(tmp_folder, 'out')
+        else:
+            out_folder = args.outfile
+        # Keep paths relative to the input folder,
+        # pathways may have the same name in different sub-folders
+        arcnames = [
+            os_path.relpath(infile, in_folder)
+            for infile in infiles
+        ]
+        outfiles = [
+            os_path.join(out_folder, arcname)
+            for arcname in arcnames
+        ]
+        for outfile in outfiles:
+            makedirs(os_path.dirname(outfile), exist_ok=True)
+
+        # eQuilibrator is loaded once for all pathways
+        start = perf_counter()
+        cc = initThermo(
+            args.pH,
+            args.ionic_strength,
+            args.pMg,
+            logger
+        )
+        init_time = perf_counter() - start
+
+        results = runThermo_batch(
+            infiles=infiles,
+            outfiles=outfiles,
+            cc=cc,
+            nb_workers=args.nb_workers,
+            stdev_factor=args.stdev_factor,
+            compound_cache=compound_cache,
+            thermo_cache=thermo_cache,
+            logger=logger
+        )
+
+        if args.outfile.endswith(TAR_EXTS):
+            mode = 'w' if args.outfile.endswith('.tar') else 'w:gz'
+            with tarfile.open(args.outfile, mode=mode) as tar:
+                for infile, outfile, arcname in zip(infiles, outfiles, arcnames):
+                    if results[infile]['success']:
+                        tar.add(outfile, arcname=arcname)
+
+    # Timings per pathway, named relatively to the input folder
+    print_timings(
+        {
+            arcname: results[infile]
+            for infile, arcname in zip(infiles, arcnames)
+        },
+        init_time,
+        logger
+    )
+    logger.info(
+        "{color}{typo}Written into: {file}{rst}".format(
+            color=fg('white'),
+            typo=attr('bold'),
+            rst=attr('reset'),
+            file=args.outfile
+        )
+    )
+
+
+def print_timings(
+    results: Dict[str, Dict],
+    init_time: float,
+    logger: Logger=getLogger(__name__)
+) -> None:
+    logger.info(
+        "{color}{typo}Timings{rst}".format(
+            color=fg('white'),
+            typo=attr('bold'),
+            rst=attr('reset')
+        )
+    )
+    logger.info(f'   |- eQuilibrator initialisation: {init_time:.2f}s')
+    for name in sorted(results):
+        logger.info(
+            '   |- {name}: {time:.2f}s{failed}'.format(
+                name=name,
+                time=results[name]['time'],
+                failed='' if results[name]['success'] else ' (failed)'
+            )
+        )
+    nb_failed = sum(not result['success'] for result in results.values())
+    logger.info(
+        f'   |- {len(results)} pathways, {nb_failed} failed, '
+        f'{sum(result["time"] for result in results.values()):.2f}s in total'
+    )
+
+
 def print_results(
     pathway: rpPathway,
     results: Dict,
@@ -81,6 +272,16 @@ def print_results(
         results['net_reaction'],
         logger
     )
+    logger.info(
+        "   {color}{typo}|- MDF = {value} {rst}{units} (bottlenecks: {bottlenecks})".format(
+            color=fg('white'),
+            typo=attr('bold'),
+            rst=attr('reset'),
+            value=results['mdf']['value'],
+            units=results['mdf']['units'],
+            bottlenecks=', '.join(results['mdf']['bottlenecks'])
+        )
+    )
     for rxn_id in pathway.get_reactions_ids():
         logger.info(
             "{color}{typo}Results {rxn}{rst}".format(
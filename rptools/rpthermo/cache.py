@@ -0,0 +1,178 @@
+"""
+Created on Oct 19 2026
+
+@author: Joan Hérisson
+
+In-memory LRU cache of eQuilibrator lookups, optionally persisted on disk.
+"""
+from collections import OrderedDict
+from json import (
+    dump as json_dump,
+    dumps as json_dumps,
+    load as json_load
+)
+from os import (
+    getpid,
+    makedirs,
+    path as os_path,
+    replace as os_replace
+)
+from logging import (
+    Logger,
+    getLogger
+)
+from typing import (
+    Any,
+    Dict
+)
+
+
+class LookupCache:
+    """Results of lookups, keyed by the (JSON encoded) arguments of the lookup.
+
+    Recently used entries are kept in memory, up to maxsize. If a file is given,
+    the entries it contains are read at the first miss and new entries are
+    appended to it by save(). Values must be JSON serializable.
+    """
+
+    def __init__(
+        self,
+        filename: str = '',
+        maxsize: int = 4096,
+        logger: Logger = getLogger(__name__)
+    ):
+        """Constructor of the class
+
+        :param filename: Path to the JSON file where entries are persisted (Default: not persisted)
+        :param maxsize: Number of entries kept in memory
+
+        :type filename: str
+        :type maxsize: int
+        """
+        self.logger = logger
+        self.filename = filename
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # Recently used entries
+        self.__entries = OrderedDict()
+        # Entries read from the file, then entries not written yet
+        self.__stored = None
+        self.__new = {}
+
+    @staticmethod
+    def key(*args) -> str:
+        """Return the key of a lookup from its arguments
+
+        :return: The key
+        :rtype: str
+        """
+        return json_dumps(args)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __read(self) -> Dict[str, Any]:
+        if self.filename and os_path.exists(self.filename):
+            try:
+                with open(self.filename, 'r') as fp:
+                    return json_load(fp)
+            except ValueError as e:
+                self.logger.warning(f'Cache file {self.filename} is not readable, ignored: {e}')
+        return {}
+
+    def __remember(self, key: str, value: Any) -> None:
+        self.__entries[key] = value
+        self.__entries.move_to_end(key)
+        if len(self.__entries) > self.maxsize:
+            self.__entries.popitem(last=False)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value stored for key, default if there is none
+
+        :param key: The key (see key())
+        :param default: The value to return if key is not cached
+
+        :type key: str
+        :type default: Any
+
+        :return: The cached value
+        :rtype: Any
+        """
+        if key in self.__entries:
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return self.__entries[key]
+        if self.filename:
+            if self.__stored is None:
+                self.__stored = self.__read()
+                self.logger.debug(f'{len(self.__stored)} entries read from {self.filename}')
+            if key in self.__stored:
+                self.__remember(key, self.__stored[key])
+                self.hits += 1
+                return self.__stored[key]
+        self.misses += 1
+        return default
+
+    def set(self, key: str, value: Any) -> None:
+        """Store value for key
+
+        :param key: The key (see key())
+        :param value: The value to store
+
+        :type key: str
+        :type value: Any
+        """
+        self.__remember(key, value)
+        if self.filename:
+            self.__new[key] = value
+
+    def pop_new(self) -> Dict[str, Any]:
+        """Return the entries not written into the file yet
+        and forget them, e.g. to send them from a worker process
+        to the process saving the cache (see update()).
+
+        :return: Value per key
+        :rtype: Dict[str, Any]
+        """
+        new, self.__new = self.__new, {}
+        return new
+
+    def update(self, entries: Dict[str, Any]) -> None:
+        """Store several entries
+
+        :param entries: Value per key (see key())
+
+        :type entries: Dict[str, Any]
+        """
+        for key, value in entries.items():
+            self.set(key, value)
+
+    def save(self) -> None:
+        """Write the new entries into the file, if any.
+        The whole file is rewritten, so save once after many lookups.
+        Entries written by former runs are kept, but concurrent saves
+        from several processes are not safe: merge the entries of worker
+        processes into one cache first (see pop_new()).
+        """
+        if not self.filename or not self.__new:
+            return
+        self.__stored = self.__read()
+        self.__stored.update(self.__new)
+        dirname = os_path.dirname(self.filename)
+        if dirname:
+            makedirs(dirname, exist_ok=True)
+        # Write into a temporary file first so that readers never see a partial file
+        tmp_filename = f'{self.filename}.{getpid()}.tmp'
+        with open(tmp_filename, 'w') as fp:
+            json_dump(self.__stored, fp)
+        os_replace(tmp_filename, self.filename)
+        self.logger.debug(f'{len(self.__new)} entries written into {self.filename}')
+        self.__new = {}
+
+    def clear(self) -> None:
+        """Forget the entries kept in memory (the file is left untouched)
+        """
+        self.__entries.clear()
+        self.__stored = None
+        self.__new = {}
@@ -1,4 +1,6 @@
 from os import path as os_path
+from time import perf_counter
+from multiprocessing import get_context
 from logging import (
     Logger,
     getLogger,
@@ -6,18 +8,27 @@ from logging import (
 )
 from typing import (
     Dict,
-    List
+    List,
+    Tuple
 )
 from csv import reader as csv_reader
+from json import load as json_load
 from copy import deepcopy
 from equilibrator_api import (
     ComponentContribution,
     Q_
 )
 from numpy import (
+    array as np_array,
+    log as np_log,
+    sqrt as np_sqrt,
     zeros as np_zeros,
     ndarray as np_ndarray
 )
+from numpy.linalg import (
+    eigh as np_eigh,
+    norm as np_norm
+)
 from scipy.optimize import linprog
 from colored import fg, bg, attr
 from brs_utils import (
@@ -30,7 +41,9 @@ from .Args import (
     DEFAULT_pH,
     DEFAULT_pMg,
     DEFAULT_ionic_strength,
+    DEFAULT_stdev_factor,
 )
+from .cache import LookupCache
 
 # Name of sides with sign
 SIDES = [
@@ -44,6 +57,44 @@ SIDES = [
     },
 ]
 
+# Thermodynamics measures, with the name of the eQuilibrator method computing it
+MEASURES = {
+    'dG0_prime': 'standard_dg_prime',
+    'dGm_prime': 'physiological_dg_prime',
+    'dG_prime': 'dg_prime',
+    'dG': 'standard_dg',
+}
+THERMO_UNITS = 'kilojoule / mole'
+
+# Separator between compound and compartment IDs within species IDs
+COMPARTMENT_SEP = '__64__'
+
+# Bounds of metabolite concentrations (M), for compounds
+# without bounds in data files (see default_concentration_bounds())
+DEFAULT_C_MIN = 1e-6
+DEFAULT_C_MAX = 1e-2
+_DEFAULT_CONCENTRATION_BOUNDS = {}
+# Reactions with a lower shadow price do not limit the MDF
+MDF_SHADOW_PRICE_TOL = 1e-9
+# Directions of the dG0' covariance with a lower (relative) variance are left out
+MDF_EIGVAL_TOL = 1e-12
+
+# Substitutes of compounds, per compound ID (see default_compound_substitutes())
+_DEFAULT_COMPOUND_SUBSTITUTES = {}
+
+# Compounds found (or not) within the eQuilibrator cache, per search values.
+# The same cofactors and metabolites are searched for in every pathway,
+# so lookups are shared by all pathways processed in the same process.
+COMPOUND_CACHE = LookupCache(maxsize=4096)
+
+# Thermodynamics of the reactions, per canonical reaction and conditions.
+# Pathways of the same run share most of their reactions.
+THERMO_CACHE = LookupCache(maxsize=16384)
+
+# Objects shared by the pathways of a batch (see runThermo_batch()),
+# inherited by forked workers rather than sent to them
+_BATCH_CONTEXT = {}
+
 
 def runThermo(
     pathway: rpPathway,
@@ -52,6 +103,10 @@ def runThermo(
     ionic_strength: float=DEFAULT_ionic_strength,
     pMg: float=DEFAULT_pMg,
     compound_substitutes: Dict = None,
+    stdev_factor: float = DEFAULT_stdev_factor,
+    compound_cache: LookupCache = COMPOUND_CACHE,
+    thermo_cache: LookupCache = THERMO_CACHE,
+    save_caches: bool = True,
     logger: Logger = getLogger(__name__)
 ) -> Dict:
     """Given a tar input file, perform thermodynamics analysis for each rpSBML file.
@@ -62,6 +117,9 @@ def runThermo(
     :param ph: The pH of the host organism (Default: 7.5)
     :param ionic_strength: Ionic strenght of the host organism (Default: 0.25M)
     :param pMg: The pMg of the host organism (Default: 3.0)
+    :param compound_cache: Cache of the compounds searched within eQuilibrator (None to disable)
+    :param thermo_cache: Cache of the thermodynamics of reactions (None to disable)
+    :param save_caches: Write the new entries of the caches into their files (Default: True)
     :param temp_k: The temperature of the host organism in Kelvin (Default: 298.15)
     :param stdev_factor: The standard deviation factor to calculate MDF (Default: 1.96)
 
@@ -70,7 +128,11 @@ def runThermo(
     :type ph: float
     :type ionic_strength: float
     :type pMg: float
+    :type compound_cache: LookupCache
+    :type thermo_cache: LookupCache
+    :type save_caches: bool
     :type temp_k: float
+    :type stdev_factor: float
     :type logger: Logger
 
     :rtype: Dict
@@ -110,29 +172,18 @@ def runThermo(
     # Search for the key ID known by eQuilibrator
     cc_species = {}
     substituted_species = {}
-    sep = '__64__'
     if compound_substitutes is None:
-        compound_substitutes = read_compound_substitutes(
-            os_path.join(
-                os_path.dirname(os_path.realpath(__file__)),
-                'data',
-                'compound_substitutes.csv'
-            )
-        )
+        compound_substitutes = default_compound_substitutes()
     for spe in pathway.get_species():
-        spe_split = spe.get_id().split(sep)
-        if len(spe_split) > 1:
-            _compound_substitutes = {k+sep+spe_split[1]: v for k, v in compound_substitutes.items()}
-        else:
-            _compound_substitutes = deepcopy(compound_substitutes)
         # If the specie is listed in substitutes file, then take search values from it
-        # Check if starts with in case of compound names are like CMPD_NAME__64__COMPID
-        if spe.get_id() in _compound_substitutes:
+        substitute = get_compound_substitute(spe.get_id(), compound_substitutes)
+        if substitute is not None:
             cc_species[spe.get_id()] = search_equilibrator_compound(
                 cc=cc,
-                id=_compound_substitutes[spe.get_id()]['id'],
-                inchikey=_compound_substitutes[spe.get_id()]['inchikey'],
-                inchi=_compound_substitutes[spe.get_id()]['inchi'],
+                id=substitute['id'],
+                inchikey=substitute['inchikey'],
+                inchi=substitute['inchi'],
+                cache=compound_cache,
                 logger=logger
             )
         # Else, take search values from rpCompound
@@ -143,6 +194,7 @@ def runThermo(
                 inchikey=spe.get_inchikey(),
                 inchi=spe.get_inchi(),
                 smiles=spe.get_smiles(),
+                cache=compound_cache,
                 logger=logger
             )
         if cc_species[spe.get_id()] != {}:
@@ -150,6 +202,8 @@ def runThermo(
                 substituted_species[spe.get_id()] = cc_species[spe.get_id()][cc_species[spe.get_id()]['cc_key']]
         else:
             logger.warning(f'Compound {spe.get_id()} has not been found within eQuilibrator cache')
+    if save_caches and compound_cache is not None:
+        compound_cache.save()
 
     # Store thermo values for the net reactions
     # and for each of the reactions within the pathway
@@ -193,16 +247,6 @@ def runThermo(
         else:
             species_cc_ids[spe_id] = cc_spe[cc_spe['cc_key']]
 
-    ## REACTIONS
-    # Compute thermo for each reaction
-    for rxn in pathway.get_list_of_reactions():
-        results['reactions'][rxn.get_id()] = eQuilibrator(
-            species_stoichio=rxn.get_species(),
-            species_ids=species_cc_ids,
-            cc=cc,
-            logger=logger
-        )
-
     ## THERMO
     print_title(
         txt='Computing thermodynamics (eQuilibrator)...',
@@ -210,12 +254,49 @@ def runThermo(
         waiting=True
     )
 
-    results['net_reaction'] = eQuilibrator(
-        species_stoichio=Reaction.sum_stoichio(reactions),
+    # Compute thermo for each reaction and for the net reaction at once.
+    # Reactions and MDF share one estimate by eQuilibrator,
+    # computed only if some of them are not cached.
+    rxns = pathway.get_list_of_reactions()
+    species_stoichios = [
+        rxn.get_species()
+        for rxn in rxns
+    ] + [results['optimized_net_reaction']]
+    estimate = ReactionsEstimate(
+        species_stoichios=species_stoichios,
+        species_ids=species_cc_ids,
+        cc=cc,
+        logger=logger
+    )
+    thermo = eQuilibrator_multi(
+        species_stoichios=species_stoichios,
         species_ids=species_cc_ids,
         cc=cc,
+        cache=thermo_cache,
+        estimate=estimate,
         logger=logger
     )
+    results['reactions'] = {
+        rxn.get_id(): rxn_thermo
+        for rxn, rxn_thermo in zip(rxns, thermo[:-1])
+    }
+    results['net_reaction'] = thermo[-1]
+
+    ## MDF
+    results['mdf'] = mdf(
+        reactions={
+            rxn.get_id(): rxn.get_species()
+            for rxn in rxns
+        },
+        species_ids=species_cc_ids,
+        cc=cc,
+        stdev_factor=stdev_factor,
+        estimate=estimate,
+        cache=thermo_cache,
+        logger=logger
+    )
+    if save_caches and thermo_cache is not None:
+        thermo_cache.save()
 
     print_OK(logger)
 
@@ -225,6 +306,184 @@ def runThermo(
     return results
 
 
+def runThermo_batch(
+    infiles: List[str],
+    outfiles: List[str],
+    cc: ComponentContribution=None,
+    ph: float=DEFAULT_pH,
+    ionic_strength: float=DEFAULT_ionic_strength,
+    pMg: float=DEFAULT_pMg,
+    nb_workers: int=1,
+    stdev_factor: float = DEFAULT_stdev_factor,
+    compound_cache: LookupCache = COMPOUND_CACHE,
+    thermo_cache: LookupCache = THERMO_CACHE,
+    logger: Logger = getLogger(__name__)
+) -> Dict[str, Dict]:
+    """Perform thermodynamics analysis of many pathway files.
+
+    eQuilibrator is initialised once for all pathways. With several workers,
+    pathways are processed in forked processes sharing the loaded eQuilibrator
+    model (on platforms where fork is not available, pathways are processed
+    one after the other). New entries of the caches found by the workers are
+    gathered, and the caches are saved once at the end.
+
+    :param infiles: Paths to the pathway files
+    :param outfiles: Paths to the output files, one per input file
+    :param cc: The eQuilibrator object (initialised if None)
+    :param ph: The pH of the host organism (Default: 7.5)
+    :param ionic_strength: Ionic strenght of the host organism (Default: 0.25M)
+    :param pMg: The pMg of the host organism (Default: 3.0)
+    :param nb_workers: Number of pathways processed in parallel
+    :param stdev_factor: The standard deviation factor to calculate MDF (Default: 1.96)
+    :param compound_cache: Cache of the compounds searched within eQuilibrator (None to disable)
+    :param thermo_cache: Cache of the thermodynamics of reactions (None to disable)
+
+    :type infiles: List[str]
+    :type outfiles: List[str]
+    :type cc: ComponentContribution
+    :type ph: float
+    :type ionic_strength: float
+    :type pMg: float
+    :type nb_workers: int
+    :type stdev_factor: float
+    :type compound_cache: LookupCache
+    :type thermo_cache: LookupCache
+    :type logger: Logger
+
+    :rtype: Dict[str, Dict]
+    :return: Processing time (in seconds) and success, per input file
+    """
+    if cc is None:
+        cc = initThermo(
+            ph,
+            ionic_strength,
+            pMg,
+            logger
+        )
+    _BATCH_CONTEXT.update({
+        'cc': cc,
+        'compound_substitutes': default_compound_substitutes(),
+        'stdev_factor': stdev_factor,
+        'compound_cache': compound_cache,
+        'thermo_cache': thermo_cache,
+        'logger': logger
+    })
+
+    results = {}
+    try:
+        if nb_workers > 1:
+            try:
+                mp_context = get_context('fork')
+            except ValueError:
+                logger.warning('Forked workers are not available on this platform, pathways are processed one by one')
+                nb_workers = 1
+        if nb_workers > 1:
+            with mp_context.Pool(nb_workers) as pool:
+                for infile, elapsed, success, new_entries in pool.imap_unordered(
+                    _runThermo_file_star,
+                    zip(infiles, outfiles)
+                ):
+                    results[infile] = {'time': elapsed, 'success': success}
+                    for cache, entries in zip([compound_cache, thermo_cache], new_entries):
+                        if cache is not None:
+                            cache.update(entries)
+        else:
+            for infile, outfile in zip(infiles, outfiles):
+                infile, elapsed, success = _runThermo_file(infile, outfile)
+                results[infile] = {'time': elapsed, 'success': success}
+    finally:
+        _BATCH_CONTEXT.clear()
+        for cache in [compound_cache, thermo_cache]:
+            if cache is not None:
+                cache.save()
+
+    return results
+
+
+def _runThermo_file_star(args: Tuple[str, str]) -> Tuple[str, float, bool, Tuple[Dict, Dict]]:
+    # In a worker, also return the new entries of the caches
+    # so that the parent process saves them
+    return _runThermo_file(*args) + (
+        tuple(
+            {} if cache is None else cache.pop_new()
+            for cache in [
+                _BATCH_CONTEXT['compound_cache'],
+                _BATCH_CONTEXT['thermo_cache']
+            ]
+        ),
+    )
+
+
+def _runThermo_file(
+    infile: str,
+    outfile: str
+) -> Tuple[str, float, bool]:
+    logger = _BATCH_CONTEXT['logger']
+    start = perf_counter()
+    try:
+        pathway = rpPathway(
+            infile=infile,
+            logger=logger
+        )
+        runThermo(
+            pathway=pathway,
+            cc=_BATCH_CONTEXT['cc'],
+            compound_substitutes=_BATCH_CONTEXT['compound_substitutes'],
+            stdev_factor=_BATCH_CONTEXT['stdev_factor'],
+            compound_cache=_BATCH_CONTEXT['compound_cache'],
+            thermo_cache=_BATCH_CONTEXT['thermo_cache'],
+            save_caches=False,
+            logger=logger
+        )
+        pathway.write_to_file(outfile)
+        success = True
+    except Exception as e:
+        logger.error(f'{infile}: {e}')
+        success = False
+    elapsed = perf_counter() - start
+    logger.info(f'{os_path.basename(infile)} processed in {elapsed:.2f}s')
+    return infile, elapsed, success
+
+
+def default_compound_substitutes() -> Dict[str, Dict]:
+    '''Return the compound substitutes shipped with rpthermo, read only once'''
+    if not _DEFAULT_COMPOUND_SUBSTITUTES:
+        _DEFAULT_COMPOUND_SUBSTITUTES.update(
+            read_compound_substitutes(
+                os_path.join(
+                    os_path.dirname(os_path.realpath(__file__)),
+                    'data',
+                    'compound_substitutes.csv'
+                )
+            )
+        )
+    return _DEFAULT_COMPOUND_SUBSTITUTES
+
+
+def get_compound_substitute(
+    spe_id: str,
+    compound_substitutes: Dict[str, Dict]
+) -> Dict:
+    '''Return the substitute of a species, None if there is none.
+    Substitutes are keyed by compound ID, while species IDs may have
+    a compartment suffix (e.g. MNXM24__64__MNXC3).
+
+    :param spe_id: ID of the species
+    :param compound_substitutes: Substitutes, per compound ID
+
+    :type spe_id: str
+    :type compound_substitutes: Dict[str, Dict]
+
+    :rtype: Dict
+    :return: Search values of the substitute (id, inchi, inchikey)
+    '''
+    if spe_id in compound_substitutes:
+        return compound_substitutes[spe_id]
+    return compound_substitutes.get(
+        spe_id.split(COMPARTMENT_SEP, 1)[0]
+    )
+
+
 def read_compound_substitutes(filename: str) -> Dict[str, str]:
     comp_sub = {}
     with open(filename, 'r') as csv_file:
@@ -243,6 +502,48 @@ def read_compound_substitutes(filename: str) -> Dict[str, str]:
 
 
 def search_equilibrator_compound(
+    cc: ComponentContribution,
+    id: str = None,
+    inchikey: str = None,
+    inchi: str = None,
+    smiles: str = None,
+    cache: LookupCache = COMPOUND_CACHE,
+    logger: Logger = getLogger(__name__)
+) -> Dict[str, str]:
+    """Search for a compound within the eQuilibrator cache.
+    Results are memoized in cache (if not None), keyed by the search values.
+
+    :param cc: The eQuilibrator object
+    :param id: ID of the compound
+    :param inchikey: InChIKey of the compound
+    :param inchi: InChI of the compound
+    :param smiles: SMILES of the compound
+    :param cache: Cache of the lookups (None to disable)
+
+    :type cc: ComponentContribution
+    :type id: str
+    :type inchikey: str
+    :type inchi: str
+    :type smiles: str
+    :type cache: LookupCache
+    :type logger: Logger
+
+    :rtype: Dict[str, str]
+    :return: Data of the compound found, with the key known by eQuilibrator ({} if not found)
+    """
+    if cache is None:
+        return _search_equilibrator_compound(cc, id, inchikey, inchi, smiles, logger)
+    # None and empty values are both ignored by the search
+    key = LookupCache.key(id or '', inchikey or '', inchi or '', smiles or '')
+    compound = cache.get(key)
+    if compound is None:
+        compound = _search_equilibrator_compound(cc, id, inchikey, inchi, smiles, logger)
+        cache.set(key, compound)
+    # The caller may modify the returned dict
+    return dict(compound)
+
+
+def _search_equilibrator_compound(
     cc: ComponentContribution,
     id: str = None,
     inchikey: str = None,
@@ -328,25 +629,31 @@ def write_results_to_pathway(
         key=k,
         value=v
         )
+    # Write MDF result
+    if 'mdf' in results:
+        pathway.add_thermo_info(
+            key='MDF',
+            value=results['mdf']
+        )
     pathway.set_thermo_substituted_species(
         results['substituted_species']
     )
 
-def eQuilibrator(
+def build_reaction_formula(
     species_stoichio: Dict[str, float],
     species_ids: Dict,
-    cc: 'ComponentContribution',
-    logger: Logger=getLogger(__name__)
-) -> Dict:
+) -> str:
+    """Format a reaction to what eQuilibrator expects
 
-    measures = {
-        'dG0_prime': 'standard_dg_prime',
-        'dGm_prime': 'physiological_dg_prime',
-        'dG_prime': 'dg_prime',
-        'dG': 'standard_dg',
-    }
+    :param species_stoichio: Stoichiometric coefficients, per species ID (negative for reactants)
+    :param species_ids: IDs known by eQuilibrator, per species ID
+
+    :type species_stoichio: Dict[str, float]
+    :type species_ids: Dict
 
-    ## Format reaction to what eQuilibrator expects
+    :rtype: str
+    :return: The reaction formula
+    """
     compounds = {SIDES[0]['name']: [], SIDES[1]['name']: []}
     reactants = {spe_id: -spe_sto for (spe_id, spe_sto) in species_stoichio.items() if spe_sto < 0}
     products = {spe_id: spe_sto for (spe_id, spe_sto) in species_stoichio.items() if spe_sto > 0}
@@ -362,11 +669,31 @@ def eQuilibrator(
         ]
 
     # Join both sides
-    rxn_str = '{left} = {right}'.format(
+    return '{left} = {right}'.format(
         left=' + '.join(compounds[SIDES[0]['name']]),
         right=' + '.join(compounds[SIDES[1]['name']])
     )
 
+
+def nan_thermo_results() -> Dict:
+    return {
+        key: {
+            'value': 'NaN',
+            'error': 'NaN',
+            'units': THERMO_UNITS,
+        } for key in MEASURES.keys()
+    }
+
+
+def eQuilibrator(
+    species_stoichio: Dict[str, float],
+    species_ids: Dict,
+    cc: 'ComponentContribution',
+    logger: Logger=getLogger(__name__)
+) -> Dict:
+
+    rxn_str = build_reaction_formula(species_stoichio, species_ids)
+
     logger.debug(rxn_str)
 
     results = {}
@@ -375,25 +702,567 @@ def eQuilibrator(
         rxn = cc.parse_reaction_formula(rxn_str)
         # Apply each CC method to each required measure
         thermo = {}
-        for key in measures.keys():
-            thermo[key] = getattr(cc, measures[key])(rxn)
+        for key in MEASURES.keys():
+            thermo[key] = getattr(cc, MEASURES[key])(rxn)
         results = {
             key:{
-                'value': float(str(thermo[key].value).split()[0]),
-                'error': float(str(thermo[key].error).split()[0]),
+                'value': float(thermo[key].value.magnitude),
+                'error': float(thermo[key].error.magnitude),
                 'units': str(thermo[key].units),
             } for key in thermo.keys()
         }
 
     except Exception as e:
-        for key in measures.keys():
-            results[key] = {
-                'value': 'NaN',
-                'error': 'NaN',
-                'units': 'kilojoule / mole',
-            }
+        results = nan_thermo_results()
+        logger.debug(e)
+
+    return results
+
+
+def canonical_reaction(
+    species_stoichio: Dict[str, float],
+    species_ids: Dict,
+) -> str:
+    """Return a string identifying a reaction whatever the order of
+    its species and the IDs they have in the pathway
+
+    :param species_stoichio: Stoichiometric coefficients, per species ID (negative for reactants)
+    :param species_ids: IDs known by eQuilibrator, per species ID
+
+    :type species_stoichio: Dict[str, float]
+    :type species_ids: Dict
+
+    :rtype: str
+    :return: Stoichiometric coefficients and eQuilibrator IDs, sorted by ID
+    """
+    stoichio = {}
+    for spe_id, spe_sto in species_stoichio.items():
+        cc_id = str(species_ids[spe_id])
+        stoichio[cc_id] = stoichio.get(cc_id, 0) + spe_sto
+    return ' + '.join(
+        f'{float(stoichio[cc_id])!r} {cc_id}'
+        for cc_id in sorted(stoichio)
+        if stoichio[cc_id] != 0
+    )
+
+
+def thermo_conditions(cc: 'ComponentContribution') -> Tuple[float, float, float, float]:
+    """Return the conditions set in eQuilibrator
+
+    :param cc: The eQuilibrator object
+
+    :type cc: ComponentContribution
+
+    :rtype: Tuple[float, float, float, float]
+    :return: pH, ionic strength (M), pMg and temperature (K)
+    """
+    return (
+        float(cc.p_h.magnitude),
+        float(cc.ionic_strength.m_as('M')),
+        float(cc.p_mg.magnitude),
+        float(cc.temperature.m_as('K'))
+    )
+
+
+def eQuilibrator_multi(
+    species_stoichios: List[Dict[str, float]],
+    species_ids: Dict,
+    cc: 'ComponentContribution',
+    cache: LookupCache = None,
+    estimate: 'ReactionsEstimate' = None,
+    logger: Logger=getLogger(__name__)
+) -> List[Dict]:
+    """Compute thermodynamics of many reactions at once.
+
+    Standard energies (transformed or not) of all reactions are estimated
+    by eQuilibrator in one call each, other measures are derived from them
+    by adding the concentration corrections. Errors are the standard
+    deviations from the covariance of the estimates.
+    Reactions that eQuilibrator cannot parse get NaN values.
+
+    If a cache is given, results are looked for in it (and stored into it),
+    keyed by the canonical reaction (see canonical_reaction()) and the
+    conditions set in eQuilibrator, so that each distinct reaction is only
+    evaluated once. NaN results are not cached.
+
+    :param species_stoichios: Reactions, as stoichiometric coefficients per species ID
+    :param species_ids: IDs known by eQuilibrator, per species ID
+    :param cc: The eQuilibrator object
+    :param cache: Cache of the results (Default: not cached)
+    :param estimate: Estimate of the same reactions, shared with other computations (Default: own estimate)
+
+    :type species_stoichios: List[Dict[str, float]]
+    :type species_ids: Dict
+    :type cc: ComponentContribution
+    :type cache: LookupCache
+    :type estimate: ReactionsEstimate
+    :type logger: Logger
+
+    :rtype: List[Dict]
+    :return: Results as returned by eQuilibrator(), per reaction
+    """
+    if cache is None:
+        return _eQuilibrator_multi(species_stoichios, species_ids, cc, estimate, logger)
+
+    conditions = thermo_conditions(cc)
+    keys = [
+        LookupCache.key(canonical_reaction(species_stoichio, species_ids), *conditions)
+        for species_stoichio in species_stoichios
+    ]
+    results = [cache.get(key) for key in keys]
+
+    # Evaluate each reaction not cached once
+    missing = {}
+    for idx, key in enumerate(keys):
+        if results[idx] is None and key not in missing:
+            missing[key] = idx
+    if missing:
+        logger.debug(f'{len(missing)}/{len(keys)} reactions not found in cache')
+        if estimate is None:
+            missing_results = _eQuilibrator_multi(
+                [species_stoichios[idx] for idx in missing.values()],
+                species_ids,
+                cc,
+                logger=logger
+            )
+        else:
+            # The estimate covers all reactions
+            all_results = _eQuilibrator_multi(species_stoichios, species_ids, cc, estimate, logger)
+            missing_results = [all_results[idx] for idx in missing.values()]
+        evaluated = dict(zip(missing, missing_results))
+        for key, result in evaluated.items():
+            # Failures may be transient, evaluate them again next time
+            if all(measure['value'] != 'NaN' for measure in result.values()):
+                cache.set(key, result)
+        for idx, key in enumerate(keys):
+            if results[idx] is None:
+                results[idx] = evaluated[key]
+
+    # The caller may modify the returned dicts
+    return [
+        {key: dict(value) for key, value in result.items()}
+        for result in results
+    ]
+
+
+def estimate_standard_dg_prime(
+    rxns: List,
+    cc: 'ComponentContribution'
+) -> Tuple[np_ndarray, np_ndarray]:
+    """Estimate the standard transformed energies of reactions
+    parsed by eQuilibrator, in one linear-algebra call
+
+    :param rxns: Reactions parsed by eQuilibrator
+    :param cc: The eQuilibrator object
+
+    :type rxns: List[PhasedReaction]
+    :type cc: ComponentContribution
+
+    :rtype: Tuple[np_ndarray, np_ndarray]
+    :return: dG0_prime values and a (full rank) square root U of their covariance (U.U^T), in kJ/mol
+    """
+    standard_dg_prime, sqrt_cov = cc.standard_dg_prime_multi(
+        rxns,
+        uncertainty_representation='fullrank'
+    )
+    return (
+        standard_dg_prime.m_as(THERMO_UNITS),
+        sqrt_cov.m_as(THERMO_UNITS)
+    )
+
+
+class ReactionsEstimate:
+    """Reactions parsed by eQuilibrator and the estimate of their standard
+    transformed energies, computed at the first access only.
+
+    The thermodynamics of the reactions of a pathway and its MDF share
+    one estimate, which is not computed at all if both are cached.
+    """
+
+    def __init__(
+        self,
+        species_stoichios: List[Dict[str, float]],
+        species_ids: Dict,
+        cc: 'ComponentContribution',
+        logger: Logger=getLogger(__name__)
+    ):
+        """Constructor of the class
+
+        :param species_stoichios: Reactions, as stoichiometric coefficients per species ID
+        :param species_ids: IDs known by eQuilibrator, per species ID
+        :param cc: The eQuilibrator object
+
+        :type species_stoichios: List[Dict[str, float]]
+        :type species_ids: Dict
+        :type cc: ComponentContribution
+        """
+        self.species_stoichios = species_stoichios
+        self.species_ids = species_ids
+        self.cc = cc
+        self.logger = logger
+        self.__parsed = None
+        self.__estimate = None
+
+    def parsed(self) -> Tuple[List[int], List]:
+        """Return the reactions parsed by eQuilibrator
+
+        :rtype: Tuple[List[int], List[PhasedReaction]]
+        :return: Indices of the parsed reactions (in species_stoichios) and parsed reactions
+        """
+        if self.__parsed is None:
+            rxn_idx = []
+            rxns = []
+            for idx, species_stoichio in enumerate(self.species_stoichios):
+                rxn_str = build_reaction_formula(species_stoichio, self.species_ids)
+                self.logger.debug(rxn_str)
+                try:
+                    rxns += [self.cc.parse_reaction_formula(rxn_str)]
+                    rxn_idx += [idx]
+                except Exception as e:
+                    self.logger.debug(e)
+            self.__parsed = (rxn_idx, rxns)
+        return self.__parsed
+
+    def standard_dg_prime(self) -> Tuple[np_ndarray, np_ndarray]:
+        """Return the estimate of the parsed reactions (see estimate_standard_dg_prime()).
+        Raises the eQuilibrator error if the estimate fails.
+
+        :rtype: Tuple[np_ndarray, np_ndarray]
+        :return: dG0_prime values and a square root of their covariance, per parsed reaction
+        """
+        if self.__estimate is None:
+            self.__estimate = estimate_standard_dg_prime(self.parsed()[1], self.cc)
+        return self.__estimate
+
+
+def _eQuilibrator_multi(
+    species_stoichios: List[Dict[str, float]],
+    species_ids: Dict,
+    cc: 'ComponentContribution',
+    estimate: ReactionsEstimate = None,
+    logger: Logger=getLogger(__name__)
+) -> List[Dict]:
+    results = [nan_thermo_results() for _ in species_stoichios]
+
+    # Parse formulas by eQuilibrator
+    if estimate is None:
+        estimate = ReactionsEstimate(species_stoichios, species_ids, cc, logger)
+    rxn_idx, rxns = estimate.parsed()
+    if not rxns:
+        return results
+
+    try:
+        standard_dg_prime, sqrt_cov_prime = estimate.standard_dg_prime()
+        standard_dg, sqrt_cov = cc.standard_dg_multi(
+            rxns,
+            uncertainty_representation='sqrt'
+        )
+        RT = cc.RT
+        values = {
+            'dG0_prime': standard_dg_prime,
+            'dGm_prime': standard_dg_prime + np_array(
+                [(RT * rxn.physiological_dg_correction()).m_as(THERMO_UNITS) for rxn in rxns]
+            ),
+            'dG_prime': standard_dg_prime + np_array(
+                [(RT * rxn.dg_correction()).m_as(THERMO_UNITS) for rxn in rxns]
+            ),
+            'dG': standard_dg.m_as(THERMO_UNITS),
+        }
+        # Standard deviations are the norms of the rows of the square root of the covariance
+        error_prime = np_norm(sqrt_cov_prime, axis=1)
+        errors = {
+            'dG0_prime': error_prime,
+            'dGm_prime': error_prime,
+            'dG_prime': error_prime,
+            'dG': np_norm(sqrt_cov.m_as(THERMO_UNITS), axis=1),
+        }
+    except Exception as e:
         logger.debug(e)
+        # Fall back on one reaction at a time
+        for idx in rxn_idx:
+            results[idx] = eQuilibrator(
+                species_stoichio=species_stoichios[idx],
+                species_ids=species_ids,
+                cc=cc,
+                logger=logger
+            )
+        return results
+
+    for i, idx in enumerate(rxn_idx):
+        results[idx] = {
+            key: {
+                'value': float(values[key][i]),
+                'error': float(errors[key][i]),
+                'units': THERMO_UNITS,
+            } for key in MEASURES.keys()
+        }
+
+    return results
 
+
+def default_concentration_bounds() -> Dict[str, Tuple[float, float]]:
+    '''Return the concentration bounds shipped with rpthermo, read only once'''
+    if not _DEFAULT_CONCENTRATION_BOUNDS:
+        data_dir = os_path.join(
+            os_path.dirname(os_path.realpath(__file__)),
+            'data'
+        )
+        _DEFAULT_CONCENTRATION_BOUNDS.update(
+            read_concentration_bounds(
+                mnx_filename=os_path.join(data_dir, 'mnx_default_conc.json'),
+                kegg_filename=os_path.join(data_dir, 'default_conc_cofactors.csv')
+            )
+        )
+    return _DEFAULT_CONCENTRATION_BOUNDS
+
+
+def read_concentration_bounds(
+    mnx_filename: str,
+    kegg_filename: str
+) -> Dict[str, Tuple[float, float]]:
+    '''Read the bounds of metabolite concentrations (M).
+    Compounds without bounds are skipped.
+
+    :param mnx_filename: JSON file, per MetaNetX ID: {'name', 'c_min', 'c_max'}
+    :param kegg_filename: CSV file with cid (KEGG), name, c_min and c_max columns
+
+    :type mnx_filename: str
+    :type kegg_filename: str
+
+    :rtype: Dict[str, Tuple[float, float]]
+    :return: (c_min, c_max), per MetaNetX or KEGG ID
+    '''
+    bounds = {}
+    with open(kegg_filename, 'r') as csv_file:
+        reader = csv_reader(csv_file, delimiter=',')
+        next(reader)
+        for row in reader:
+            if row[2] != '' and row[3] != '':
+                bounds[row[0]] = (float(row[2]), float(row[3]))
+    with open(mnx_filename, 'r') as json_file:
+        for cmpd_id, cmpd in json_load(json_file).items():
+            if cmpd.get('c_min') is not None and cmpd.get('c_max') is not None:
+                bounds[cmpd_id] = (float(cmpd['c_min']), float(cmpd['c_max']))
+    return bounds
+
+
+def get_concentration_bounds(
+    spe_id: str,
+    cc_id: str,
+    conc_bounds: Dict[str, Tuple[float, float]]
+) -> Tuple[float, float]:
+    '''Return the concentration bounds of a species, searched by species ID,
+    compound ID (without compartment suffix) and ID known by eQuilibrator
+    (without namespace), default bounds if none is found.
+
+    :param spe_id: ID of the species
+    :param cc_id: ID of the species known by eQuilibrator
+    :param conc_bounds: (c_min, c_max), per compound ID
+
+    :type spe_id: str
+    :type cc_id: str
+    :type conc_bounds: Dict[str, Tuple[float, float]]
+
+    :rtype: Tuple[float, float]
+    :return: c_min, c_max (M)
+    '''
+    for cmpd_id in [
+        spe_id,
+        spe_id.split(COMPARTMENT_SEP, 1)[0],
+        str(cc_id),
+        str(cc_id).split(':')[-1]
+    ]:
+        if cmpd_id in conc_bounds:
+            return conc_bounds[cmpd_id]
+    return (DEFAULT_C_MIN, DEFAULT_C_MAX)
+
+
+def mdf(
+    reactions: Dict[str, Dict[str, float]],
+    species_ids: Dict,
+    cc: 'ComponentContribution',
+    conc_bounds: Dict[str, Tuple[float, float]] = None,
+    stdev_factor: float = DEFAULT_stdev_factor,
+    estimate: ReactionsEstimate = None,
+    cache: LookupCache = None,
+    logger: Logger=getLogger(__name__)
+) -> Dict:
+    """Max-min driving force (MDF) of a set of reactions.
+
+    Solves one LP over the log-concentrations of the compounds:
+    maximize B such that -dG'_i >= B for each reaction i, with
+    dG'_i = dG0'_i + U_i.m + RT.sum_j(S_ji.ln(c_j)),
+    ln(c_min_j) <= ln(c_j) <= ln(c_max_j) and -stdev_factor <= m <= stdev_factor,
+    where dG0' and its covariance U.U^T are estimated by eQuilibrator
+    for all reactions at once (U is taken from the eigen-decomposition
+    of the covariance, so that it only depends on the reactions).
+    Compounds eQuilibrator does not consider as aqueous (e.g. water, gases)
+    and protons have a fixed abundance.
+    Bottleneck reactions are the ones whose constraint limits the MDF
+    (non-zero shadow price).
+    Reactions that eQuilibrator cannot parse are left out.
+
+    If a cache is given, results are looked for in it (and stored into it),
+    keyed by the canonical reactions (see canonical_reaction()), the
+    concentration bounds, stdev_factor and the conditions set in eQuilibrator.
+
+    :param reactions: Stoichiometric coefficients per species ID, per reaction ID
+    :param species_ids: IDs known by eQuilibrator, per species ID
+    :param cc: The eQuilibrator object
+    :param conc_bounds: (c_min, c_max) in M, per compound ID (Default: bounds shipped with rpthermo)
+    :param stdev_factor: Number of standard deviations dG0' can move by (Default: 1.96)
+    :param estimate: Estimate of the same reactions, in the same order, possibly followed by others (Default: own estimate)
+    :param cache: Cache of the results (Default: not cached)
+
+    :type reactions: Dict[str, Dict[str, float]]
+    :type species_ids: Dict
+    :type cc: ComponentContribution
+    :type conc_bounds: Dict[str, Tuple[float, float]]
+    :type stdev_factor: float
+    :type estimate: ReactionsEstimate
+    :type cache: LookupCache
+    :type logger: Logger
+
+    :rtype: Dict
+    :return: MDF value, units and bottleneck reaction IDs
+    """
+    results = {
+        'value': 'NaN',
+        'units': THERMO_UNITS,
+        'bottlenecks': []
+    }
+    if conc_bounds is None:
+        conc_bounds = default_concentration_bounds()
+    rxn_ids = list(reactions)
+
+    # Bounds of each compound, from the first species it is found as
+    cmpd_bounds = {}
+    for species_stoichio in reactions.values():
+        for spe_id, spe_sto in species_stoichio.items():
+            cc_id = species_ids[spe_id]
+            if spe_sto != 0 and cc_id not in cmpd_bounds:
+                cmpd_bounds[cc_id] = get_concentration_bounds(spe_id, cc_id, conc_bounds)
+
+    if cache is not None:
+        key = LookupCache.key(
+            'MDF',
+            [
+                canonical_reaction(species_stoichio, species_ids)
+                for species_stoichio in reactions.values()
+            ],
+            sorted(
+                [str(cc_id), float(c_min), float(c_max)]
+                for cc_id, (c_min, c_max) in cmpd_bounds.items()
+            ),
+            float(stdev_factor),
+            *thermo_conditions(cc)
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            # Bottlenecks are cached as reaction indices
+            return {
+                **cached,
+                'bottlenecks': [rxn_ids[i] for i in cached['bottlenecks']]
+            }
+
+    # Parse formulas by eQuilibrator
+    if estimate is None:
+        estimate = ReactionsEstimate(list(reactions.values()), species_ids, cc, logger)
+    rxn_idx, rxns = estimate.parsed()
+    pos = [i for i, idx in enumerate(rxn_idx) if idx < len(rxn_ids)]
+    rxn_idx = [rxn_idx[i] for i in pos]
+    rxns = [rxns[i] for i in pos]
+    for idx in sorted(set(range(len(rxn_ids))) - set(rxn_idx)):
+        logger.warning(f'Reaction {rxn_ids[idx]} is left out of MDF: not parsed by eQuilibrator')
+    if not rxns:
+        return results
+
+    try:
+        standard_dg_prime, sqrt_cov = estimate.standard_dg_prime()
+    except Exception as e:
+        logger.warning(f'MDF cannot be computed: {e}')
+        return results
+    standard_dg_prime = standard_dg_prime[pos]
+    # Square root of the covariance of the reactions only,
+    # whatever the other reactions of the estimate
+    cov = sqrt_cov[pos] @ sqrt_cov[pos].T
+    eigvals, eigvecs = np_eigh(cov)
+    dims = eigvals > MDF_EIGVAL_TOL * max(eigvals.max(), 0)
+    sqrt_cov = eigvecs[:, dims] * np_sqrt(eigvals[dims])
+    RT = cc.RT.m_as(THERMO_UNITS)
+
+    # Compounds with a variable concentration (and their bounds),
+    # or a fixed abundance
+    compounds = {}
+    ln_conc_bounds = []
+    for idx, rxn in zip(rxn_idx, rxns):
+        for spe_id, spe_sto in reactions[rxn_ids[idx]].items():
+            cc_id = species_ids[spe_id]
+            if spe_sto == 0 or cc_id in compounds:
+                continue
+            phased_cmpd, _ = rxn.get_phased_compound(cc.get_compound(cc_id))
+            if phased_cmpd is None:
+                compounds[cc_id] = {'idx': None, 'ln_abundance': 0}
+            elif (
+                phased_cmpd.phase == 'aqueous'
+                # protons are set through pH
+                and phased_cmpd.ln_physiological_abundance != 0
+            ):
+                compounds[cc_id] = {'idx': len(ln_conc_bounds)}
+                c_min, c_max = cmpd_bounds[cc_id]
+                ln_conc_bounds += [(np_log(c_min), np_log(c_max))]
+            else:
+                compounds[cc_id] = {
+                    'idx': None,
+                    'ln_abundance': phased_cmpd.ln_physiological_abundance
+                }
+    nb_cmpds = len(ln_conc_bounds)
+    nb_dims = sqrt_cov.shape[1]
+
+    # Variables: ln(c), m, B
+    A_ub = np_zeros((len(rxns), nb_cmpds + nb_dims + 1))
+    fixed_dg = np_zeros(len(rxns))
+    for i, idx in enumerate(rxn_idx):
+        for spe_id, spe_sto in reactions[rxn_ids[idx]].items():
+            if spe_sto == 0:
+                continue
+            cmpd = compounds[species_ids[spe_id]]
+            if cmpd['idx'] is None:
+                fixed_dg[i] += RT * spe_sto * cmpd['ln_abundance']
+            else:
+                A_ub[i, cmpd['idx']] += RT * spe_sto
+    A_ub[:, nb_cmpds:nb_cmpds+nb_dims] = sqrt_cov
+    A_ub[:, -1] = 1
+    b_ub = -(standard_dg_prime + fixed_dg)
+    c = np_zeros(nb_cmpds + nb_dims + 1)
+    c[-1] = -1
+    bounds = (
+        ln_conc_bounds
+        + [(-stdev_factor, stdev_factor)] * nb_dims
+        + [(None, None)]
+    )
+
+    res = linprog(
+        c,
+        A_ub=A_ub,
+        b_ub=b_ub,
+        bounds=bounds,
+        method='highs'
+    )
+    if res.status != 0:
+        logger.warning(f'MDF cannot be computed: {res.message}')
+        return results
+
+    results['value'] = float(res.x[-1])
+    bottlenecks = [
+        rxn_idx[i]
+        for i, marginal in enumerate(res.ineqlin.marginals)
+        if marginal < -MDF_SHADOW_PRICE_TOL
+    ]
+    if cache is not None:
+        cache.set(key, {**results, 'bottlenecks': bottlenecks})
+    results['bottlenecks'] = [rxn_ids[idx] for idx in bottlenecks]
+    logger.debug(f'MDF: {results}')
     return results
 
 
@@ -24,6 +24,7 @@ from rptools.rpviz.utils import (
     parse_all_pathways
 )
 from rptools.rpviz.Viewer import Viewer
+from rptools.rplibs.rpBinary import BINARY_EXT
 
 
 def __build_arg_parser(prog='python -m rpviz.cli'):
@@ -94,7 +95,8 @@ def __run(args):
     if input_path.exists():
         # Input is a folder
         if input_path.is_dir():
-            input_files = list(input_path.glob('*.xml'))
+            input_files = list(input_path.glob('*.xml')) \
+                + list(input_path.glob(f'*{BINARY_EXT}'))
             if len(input_files) == 0:
                 raise FileNotFoundError(
                     f'"{args.input_rpSBMLs}" sounds like a directory '
@@ -113,9 +115,11 @@ def __run(args):
             with tempfile.TemporaryDirectory() as tmp_folder:
                 with tarfile.open(args.input_rpSBMLs, mode='r') as tar:
                     tar.extractall(path=tmp_folder)
-                _ = list(Path(tmp_folder).glob('*.xml'))
+                _ = list(Path(tmp_folder).glob('*.xml')) \
+                    + list(Path(tmp_folder).glob(f'*{BINARY_EXT}'))
                 if len(_) == 0:  # Possible if there is a root folder
-                    _ = list(Path(tmp_folder).glob('*/*.xml'))
+                    _ = list(Path(tmp_folder).glob('*/*.xml')) \
+                        + list(Path(tmp_folder).glob(f'*/*{BINARY_EXT}'))
                 # Removed tar "fork" files if any (name starts by ._)
                 input_files = [
                     item for item in _ if not item.name.startswith('._')
@@ -11,7 +11,7 @@ import csv
 import logging
 from typing import Dict, Union
 
-from rptools.rplibs import rpSBML, rpPathway
+from rptools.rplibs import rpPathway
 from rptools.rplibs.rpReaction import rpReaction
 from rptools.rplibs.rpCompound import rpCompound
 from rptools.rpfba.cobra_format import uncobraize
@@ -638,8 +638,8 @@ def parse_all_pathways(input_files: list) -> tuple:
     pathways_info = {}
 
     for sbml_path in input_files:
-        rpsbml = rpSBML(str(sbml_path))
-        pathway = rpPathway.from_rpSBML(rpsbml=rpsbml)
+        # rpSBML or binary pathway file
+        pathway = rpPathway(infile=str(sbml_path))
         nodes, edges, pathway = parse_one_pathway(pathway)
         # Store pathway
         pathways_info[pathway['path_id']] = pathway
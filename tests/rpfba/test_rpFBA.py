@@ -3,9 +3,14 @@ from zipfile import ZipFile
 from types import SimpleNamespace
 from tempfile import NamedTemporaryFile
 
-from os import path as os_path
+from os import path as os_path, listdir
 
-from rptools.rpfba.rpfba import preprocess, runFBA
+from rptools.rpfba.rpfba import (
+    preprocess,
+    runFBA,
+    get_blocked_reactions,
+    reduce_model
+)
 from rptools.rplibs import rpPathway, rpSBML
 from main_rpfba import Main_rpfba
 
@@ -86,3 +91,40 @@ class Test_rpFBA(Main_rpfba):
             )
 
             self.assertDictEqual(res_previous, res_run_fba)
+
+    def test_reduce_model(self):
+        cache_dir = os_path.join(self.temp_d, "cache")
+        blocked_rxn_ids = get_blocked_reactions(
+            model=self.rpsbml,
+            cache_dir=cache_dir,
+            logger=self.logger
+        )
+        self.assertEqual(len(listdir(cache_dir)), 1)
+        # Second call reads from cache
+        self.assertListEqual(
+            get_blocked_reactions(
+                model=self.rpsbml,
+                cache_dir=cache_dir,
+                logger=self.logger
+            ),
+            blocked_rxn_ids
+        )
+
+        pathway = rpPathway(
+            os_path.join(self.temp_d, "cr_fba", "rp_001_0001.xml")
+        )
+        nb_rxns = self.rpsbml.getModel().getNumReactions()
+        removed_rxn_ids = reduce_model(
+            model=self.rpsbml,
+            pathway=pathway,
+            biomass_rxn_id="biomass",
+            compartment_id="c",
+            cache_dir=cache_dir,
+            logger=self.logger
+        )
+        self.assertGreater(len(removed_rxn_ids), 0)
+        self.assertEqual(
+            self.rpsbml.getModel().getNumReactions(),
+            nb_rxns - len(removed_rxn_ids)
+        )
+        self.assertIsNotNone(self.rpsbml.getModel().getReaction("biomass"))
@@ -24,6 +24,13 @@ class Main_rplibs(TestCase):
         data_path,
         'e_coli_iML1515.sbml'
     )
+    # Model shipped with rpextractsink tests
+    e_coli_model_path = os_path.join(
+        os_path.dirname(os_path.dirname(__file__)),
+        'rpextractsink',
+        'data',
+        'e_coli_model.sbml.gz'
+    )
  
     #merged_path_gz = os_path.join(
     #    data_path,
@@ -48,3 +48,63 @@ class Test_rpGraph(Main_rplibs):
                               'MNXM13__64__MNXC3'])
         self.assertCountEqual(self.rpgraph.onlyProducedSpecies(True, False),
                               ['TARGET_0000000001__64__MNXC3'])
+
+
+class Test_rpGraph_steps(Main_rplibs):
+
+    def test_reaction_steps_linear(self):
+        rpgraph = rpGraph(
+            rpSBML(inFile=self.rpsbml_lycopene_path, logger=self.logger),
+            False,
+            'rp_pathway',
+            'rp_trunk_species',
+            'rp_sink_species',
+            logger=self.logger
+        )
+        self.assertDictEqual(
+            rpgraph.orderedReactionSteps(),
+            {'rxn_1': 1, 'rxn_2': 2, 'rxn_3': 3}
+        )
+        self.assertListEqual(
+            rpgraph.orderedRetroReactions(),
+            ['rxn_1', 'rxn_2', 'rxn_3']
+        )
+
+    def test_reaction_steps_branched(self):
+        # Two branches converging to the target
+        reactions = {
+            'rxn_4': {'left': {'C': 1, 'D': 1}, 'right': {'TARGET': 1}},
+            'rxn_1': {'left': {'S1': 1}, 'right': {'A': 1}},
+            'rxn_2': {'left': {'A': 1}, 'right': {'C': 1}},
+            'rxn_3': {'left': {'S2': 1}, 'right': {'D': 1}},
+        }
+        self.assertListEqual(
+            list(rpGraph.reaction_steps(reactions).items()),
+            [('rxn_1', 1), ('rxn_3', 1), ('rxn_2', 2), ('rxn_4', 3)]
+        )
+
+    def test_reaction_steps_cofactors(self):
+        # Cofactors produced downstream and consumed upstream,
+        # reactions not in order
+        reactions = {
+            'rxn_3': {'left': {'B': 1, 'MNXM1': 1}, 'right': {'TARGET': 1, 'MNXM1': 1, 'MNXM4': 1}},
+            'rxn_2': {'left': {'A': 1, 'MNXM4': 1}, 'right': {'B': 1}},
+            'rxn_1': {'left': {'S': 1, 'MNXM1': 1, 'MNXM4': 1}, 'right': {'A': 1}},
+        }
+        self.assertDictEqual(
+            rpGraph.reaction_steps(reactions, species=['S', 'A', 'B', 'TARGET']),
+            {'rxn_1': 1, 'rxn_2': 2, 'rxn_3': 3}
+        )
+        self.assertListEqual(
+            list(rpGraph.reaction_steps(reactions, species=['S', 'A', 'B', 'TARGET'])),
+            ['rxn_1', 'rxn_2', 'rxn_3']
+        )
+
+    def test_reaction_steps_long(self):
+        # Far beyond the recursion limit
+        reactions = {
+            f'rxn_{i}': {'left': {f'S{i}': 1}, 'right': {f'S{i+1}': 1}}
+            for i in range(5000)
+        }
+        steps = rpGraph.reaction_steps(reactions)
+        self.assertEqual(steps['rxn_4999'], 5000)
@@ -7,6 +7,10 @@ Created on May 28 2021
 from tempfile import NamedTemporaryFile
 from os import remove
 from copy import deepcopy
+from numpy import (
+    float64 as np_float64,
+    array as np_array
+)
 # from xmldiff import main as xmldiff_main
 from rr_cache import rrCache
 from rptools.rplibs import (
@@ -14,6 +18,11 @@ from rptools.rplibs import (
     rpReaction,
     rpCompound
 )
+from rptools.rplibs.rpBinary import (
+    BINARY_EXT,
+    BinaryFormatError,
+    write_binary
+)
 from main_rplibs import Main_rplibs
 
 
@@ -461,6 +470,67 @@ class Test_rpPathway(Main_rplibs):
             tempf.close()
             remove(tempf.name)
 
+    def test_binary_file(self):
+        with NamedTemporaryFile(suffix=BINARY_EXT, delete=False) as tempf:
+            tempf.close()
+            self.pathway.write_to_file(tempf.name)
+            pathway = rpPathway(infile=tempf.name)
+            self.assertEqual(self.pathway, pathway)
+            # Same content than the SBML form
+            self.assertEqual(
+                pathway,
+                rpPathway.from_rpSBML(self.pathway.to_rpSBML())
+            )
+            remove(tempf.name)
+
+    def test_binary_file_numpy(self):
+        # FBA results come as numpy scalars (e.g. cobra fluxes)
+        pathway = deepcopy(self.pathway)
+        pathway.add_fba_info('fraction', {'value': np_float64(0.5), 'units': 'milimole / gDW / hour'})
+        rxn_id = pathway.get_reactions_ids()[0]
+        pathway.get_reaction(rxn_id).add_fba_info('fraction', {'value': np_float64(-1.25)})
+        spe_id = pathway.get_species_ids()[0]
+        pathway.get_specie(spe_id).add_fba_info('fraction_shadow_price', {'value': np_array([0.1, 0.2])})
+        pathway.set_global_score(np_float64(0.75))
+        with NamedTemporaryFile(suffix=BINARY_EXT, delete=False) as tempf:
+            tempf.close()
+            pathway.write_to_file(tempf.name)
+            _pathway = rpPathway(infile=tempf.name)
+            remove(tempf.name)
+        self.assertEqual(_pathway.get_fba_fraction()['value'], 0.5)
+        self.assertIs(type(_pathway.get_fba_fraction()['value']), float)
+        self.assertEqual(_pathway.get_reaction(rxn_id).get_fba_fraction()['value'], -1.25)
+        self.assertEqual(
+            _pathway.get_specie(spe_id).get_fba_info('fraction_shadow_price')['value'],
+            [0.1, 0.2]
+        )
+        self.assertEqual(_pathway.get_global_score(), 0.75)
+
+    def test_binary_file_version(self):
+        with NamedTemporaryFile(suffix=BINARY_EXT, delete=False) as tempf:
+            tempf.close()
+            self.pathway.to_binary(tempf.name)
+            # Tamper the version
+            from pickle import load, dump
+            with open(tempf.name, 'rb') as fp:
+                data = load(fp)
+            data['version'] += 1
+            with open(tempf.name, 'wb') as fp:
+                dump(data, fp, protocol=5)
+            self.assertRaises(
+                BinaryFormatError,
+                rpPathway,
+                infile=tempf.name
+            )
+            # Objects other than plain structures are refused
+            write_binary({'id': len}, tempf.name)
+            self.assertRaises(
+                BinaryFormatError,
+                rpPathway,
+                infile=tempf.name
+            )
+            remove(tempf.name)
+
     def test_rename_compound(self):
         for spe_id in ['CMPD_0000000003', 'TARGET_0000000001']:
             with self.subTest("Message for this subtest", spe_id=spe_id):
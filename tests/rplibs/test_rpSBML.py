@@ -4,13 +4,22 @@ Created on June 17 2020
 @author: Joan Hérisson
 """
 import libsbml
+from copy import deepcopy
 import pandas as pd
 from    rptools.rplibs import (
-    rpSBML
+    rpSBML,
+    rpGraph
+)
+from rptools.rplibs.rpSBML import (
+    parse_annotation_value,
+    compartment_shortlist,
+    COMPARTMENT_CANONICALS,
+    COMPARTMENT_SYNONYMS
 )
 from          tempfile import (
     NamedTemporaryFile
 )
+from                os import remove
 from typing import (
     Dict,
     List,
@@ -69,6 +78,27 @@ class Test_rpSBML(Main_rplibs):
             '_2_Oxoglutarate_ASCII_43_ASCII_'
         )
 
+    def test_parse_annotation_value(self):
+        for value, expected in [
+            ('1', 1),
+            ('-2.5', -2.5),
+            ('1e-3', 0.001),
+            ('True', True),
+            ('None', None),
+            ('NaN', 'NaN'),
+            ('007', '007'),
+            ('[C@@H](O)C', '[C@@H](O)C'),
+            ("{'value': 1}", {'value': 1}),
+            ("__import__('os')", "__import__('os')"),
+        ]:
+            self.assertEqual(parse_annotation_value(value), expected)
+            self.assertEqual(type(parse_annotation_value(value)), type(expected))
+        # Containers are not shared between calls
+        self.assertIsNot(
+            parse_annotation_value('[1, 2]'),
+            parse_annotation_value('[1, 2]')
+        )
+
     def test_checkSBML(self):
         self.assertTrue(rpSBML.checkSBML(self.rpsbml_lycopene))
         self.assertFalse(rpSBML.checkSBML(self.rpsbml_none))
@@ -136,6 +166,23 @@ class Test_rpSBML(Main_rplibs):
             'c'
         )
 
+    def test_search_compartment_synonyms(self):
+        shortlist = deepcopy(compartment_shortlist)
+        for compartment in ['c', 'cytosol', 'CYTOPLASM', 'e', 'unknown']:
+            self.rpsbml_lycopene.search_compartment(compartment)
+        # The synonyms of cobra are left untouched
+        self.assertDictEqual(compartment_shortlist, shortlist)
+        self.assertEqual(COMPARTMENT_CANONICALS['cytosol'], 'c')
+        self.assertEqual(COMPARTMENT_SYNONYMS['c'][-1], 'c')
+        # The index follows the model
+        comp = self.rpsbml_lycopene.getModel().createCompartment()
+        comp.setId('periplasm_1')
+        comp.setName('Periplasm')
+        self.assertEqual(
+            self.rpsbml_lycopene.search_compartment('periplasm').getId(),
+            'periplasm_1'
+        )
+
     def test_has_compartment(self):
         # Test - 1
         res = self.rpsbml_lycopene.has_compartment(
@@ -195,6 +242,65 @@ class Test_rpSBML(Main_rplibs):
             'MNXM8975'
         )
 
+    def test_search_specie_modes(self):
+        # Exact
+        self.assertEqual(
+            self.rpsbml_lycopene.search_specie('MNXM8975', mode='exact').getId(),
+            'MNXM8975'
+        )
+        self.assertIs(
+            self.rpsbml_lycopene.search_specie('mnxm8975', mode='exact'),
+            None
+        )
+        # Case-insensitive
+        self.assertEqual(
+            self.rpsbml_lycopene.search_specie('mnxm8975', mode='ignorecase').getId(),
+            'MNXM8975'
+        )
+        self.assertIs(
+            self.rpsbml_lycopene.search_specie('mnxm897', mode='ignorecase'),
+            None
+        )
+        # Regex
+        self.assertEqual(
+            self.rpsbml_lycopene.search_specie('^mnxm89', mode='regex').getId(),
+            'MNXM8975'
+        )
+        self.assertRaises(
+            ValueError,
+            self.rpsbml_lycopene.search_specie,
+            'MNXM8975',
+            'unknown'
+        )
+        # The index follows the model
+        self.rpsbml_lycopene.createSpecies(
+            species_id='NEW_SPECIES',
+            compartment='c'
+        )
+        self.assertEqual(
+            self.rpsbml_lycopene.search_specie('new_species').getId(),
+            'NEW_SPECIES'
+        )
+
+    def test_search_reaction_modes(self):
+        self.assertEqual(
+            self.rpsbml_lycopene.search_reaction('rxn_2', mode='exact').getId(),
+            'rxn_2'
+        )
+        self.assertEqual(
+            self.rpsbml_lycopene.search_reaction('RXN_2', mode='ignorecase').getId(),
+            'rxn_2'
+        )
+        self.assertEqual(
+            self.rpsbml_lycopene.search_reaction('rxn_[23]').getId(),
+            'rxn_2'
+        )
+        self.rpsbml_lycopene.remove_reactions(['rxn_2'])
+        self.assertEqual(
+            self.rpsbml_lycopene.search_reaction('rxn_[23]').getId(),
+            'rxn_3'
+        )
+
     def test_has_specie(self):
         # Test - 1
         res = self.rpsbml_lycopene.has_specie(
@@ -324,6 +430,54 @@ class Test_rpSBML(Main_rplibs):
         self.assertDictEqual(corr_spe, {'MNXM24': 'MNXM24'})
         self.assertListEqual(miss_spe, ['13421'])
 
+    def test_get_species_index(self):
+        index = self.rpsbml_lycopene.get_species_index('c')
+        self.assertListEqual(index['MNXM24'], [('MNXM24', True)])
+        self.assertListEqual(index['CHEBI:13420'], [('M_ppi_c', False)])
+        self.assertNotIn('13421', index)
+        self.assertDictEqual(self.rpsbml_lycopene.get_species_index(''), {})
+        # Index is updated when species are added
+        self.rpsbml_lycopene.createSpecies(
+            species_id='new_spe',
+            compartment='c'
+        )
+        self.assertIn('new_spe', self.rpsbml_lycopene.get_species_index('c'))
+
+    def test_get_species_degrees(self):
+        degrees = self.rpsbml_lycopene.get_species_degrees()
+        self.assertEqual(degrees['CMPD_0000000003'], 2)
+        self.assertEqual(degrees['MNXM24'], 1)
+        self.assertNotIn('M_ppi_c', degrees)
+        # Table is updated when reactions are removed
+        self.rpsbml_lycopene.remove_reactions(['rxn_1'], remove_orphans=False)
+        self.assertEqual(
+            self.rpsbml_lycopene.get_species_degrees()['CMPD_0000000003'],
+            1
+        )
+
+    def test_reactionsInBoth(self):
+        other = rpSBML(
+            inFile=self.rpsbml_lycopene_path,
+            logger=self.logger
+        )
+        self.assertDictEqual(
+            rpSBML.reactionsInBoth(self.rpsbml_lycopene, other, {}),
+            {'rxn_1': 'rxn_1', 'rxn_2': 'rxn_2', 'rxn_3': 'rxn_3'}
+        )
+        other.remove_reactions(['rxn_2'])
+        self.assertDictEqual(
+            rpSBML.reactionsInBoth(self.rpsbml_lycopene, other, {}),
+            {'rxn_1': 'rxn_1', 'rxn_3': 'rxn_3'}
+        )
+        self.assertListEqual(
+            other.get_reaction_index()[
+                rpSBML.reaction_signature(
+                    self.rpsbml_lycopene.getModel().getReaction('rxn_3')
+                )
+            ],
+            ['rxn_3']
+        )
+
     def test_is_boundary_type(self):
         # TODO: implement test which doesn't account abount SBO terms, to see how compartment_id ... are managed
         # Load.
@@ -483,6 +637,81 @@ class Test_rpSBML(Main_rplibs):
             self.rpsbml_lycopene.readBRSYNTHAnnotation(specie.getAnnotation())
         )
 
+    def test_genericModel_skeleton(self):
+        compartments = {
+            'c': {
+                'name': 'cytosol',
+                'annot': {'mnx': ['MNXC3']}
+            }
+        }
+        unit_def = {
+            'mmol_per_gDW_per_hr': [
+                {'kind': libsbml.UNIT_KIND_MOLE, 'exponent': 1, 'scale': -3, 'multiplier': 1},
+                {'kind': libsbml.UNIT_KIND_GRAM, 'exponent': -1, 'scale': 0, 'multiplier': 1}
+            ]
+        }
+        rpsbmls = []
+        for name in ['first', 'second']:
+            rpsbml = rpSBML(logger=self.logger)
+            rpsbml.genericModel(name, name, compartments, unit_def)
+            rpsbml.createSpecies(species_id=f'{name}_species', compartment='c')
+            rpsbmls.append(rpsbml)
+        # The second model is cloned from the skeleton of the first one
+        first, second = [rpsbml.getModel() for rpsbml in rpsbmls]
+        self.assertEqual(second.getId(), 'second')
+        self.assertEqual(second.getName(), 'second')
+        self.assertEqual(
+            second.getMetaId(),
+            rpsbmls[1]._genMetaID('second')
+        )
+        self.assertEqual(
+            second.getCompartment('c').toSBML(),
+            first.getCompartment('c').toSBML()
+        )
+        self.assertEqual(
+            second.getUnitDefinition('mmol_per_gDW_per_hr').toSBML(),
+            first.getUnitDefinition('mmol_per_gDW_per_hr').toSBML()
+        )
+        # Elements of one model are not shared with the others
+        self.assertListEqual(
+            [spe.getId() for spe in second.getListOfSpecies()],
+            ['second_species']
+        )
+
+    def test_read_species_lazy(self):
+        eager = self.rpsbml_lycopene.read_species()
+        lazy = self.rpsbml_lycopene.read_species(lazy=True)
+        self.assertListEqual(list(lazy), list(eager))
+        spe_id = 'TARGET_0000000001'
+        self.assertFalse(lazy[spe_id].is_decoded('brsynth'))
+        self.assertDictEqual(
+            lazy[spe_id]['brsynth'],
+            eager[spe_id]['brsynth']
+        )
+        self.assertTrue(lazy[spe_id].is_decoded('brsynth'))
+        self.assertFalse(lazy[spe_id].is_decoded('miriam'))
+
+    def test_read_reactions_lazy(self):
+        eager = self.rpsbml_lycopene.read_reactions('rp_pathway')
+        lazy = self.rpsbml_lycopene.read_reactions('rp_pathway', lazy=True)
+        self.assertDictEqual(
+            {rxn_id: dict(rxn) for rxn_id, rxn in lazy.items()},
+            eager
+        )
+
+    def test_write_read_gz(self):
+        with NamedTemporaryFile(suffix='.xml.gz', delete=False) as tempf:
+            tempf.close()
+            self.rpsbml_lycopene.write_to_file(tempf.name)
+            with open(tempf.name, 'rb') as fp:
+                self.assertEqual(fp.read(2), b'\x1f\x8b')
+            rpsbml = rpSBML(inFile=tempf.name, logger=self.logger)
+            self.assertEqual(
+                libsbml.writeSBMLToString(rpsbml.getDocument()),
+                libsbml.writeSBMLToString(self.rpsbml_lycopene.getDocument())
+            )
+            remove(tempf.name)
+
     def test_to_cobra(self):
         rpsbml_ecoli  = rpSBML(
             inFile = self.rpsbml_ecoli_path,
@@ -524,6 +753,199 @@ class Test_rpSBML(Main_rplibs):
             []
         )
 
+    def test_search_isolated_species(self):
+        species = [
+            spe.getId()
+            for spe in self.rpsbml_lycopene.getModel().getListOfSpecies()
+        ]
+        rpgraph = rpGraph(
+            self.rpsbml_lycopene,
+            True,
+            'rp_pathway',
+            'rp_trunk_species',
+            'rp_sink_species',
+            logger=self.logger
+        )
+        self.rpsbml_lycopene.search_isolated_species(species)
+        # Same as from the graph of the model
+        self.assertSetEqual(
+            set(self.rpsbml_lycopene.get_isolated_species()),
+            set(
+                rpgraph.onlyConsumedSpecies(species)
+                + rpgraph.onlyProducedSpecies(species)
+            )
+        )
+        self.assertSetEqual(
+            set(self.rpsbml_lycopene.get_isolated_species()),
+            set(['MNXM24', 'MNXM8975', 'MNXM83', 'TARGET_0000000001'])
+        )
+        self.assertTupleEqual(
+            self.rpsbml_lycopene.get_species_in_out_degrees()['TARGET_0000000001'],
+            (1, 0)
+        )
+
+    def test_check_structure(self):
+        counts = self.rpsbml_lycopene.count_elements()
+        self.assertTrue(self.rpsbml_lycopene.check_structure(counts))
+        # Duplicated ID
+        spe = self.rpsbml_lycopene.getModel().createSpecies()
+        spe.setId('rxn_1')
+        spe.setCompartment('c')
+        self.assertFalse(self.rpsbml_lycopene.check_structure(counts))
+        # Unknown compartment
+        spe.setId('new_spe')
+        spe.setCompartment('unknown')
+        self.assertFalse(self.rpsbml_lycopene.check_structure(counts))
+        spe.setCompartment('c')
+        self.assertTrue(self.rpsbml_lycopene.check_structure(counts))
+
+    def test_checkpoint_rollback(self):
+        sbml_str = libsbml.writeSBMLToString(
+            self.rpsbml_lycopene.getDocument()
+        )
+        self.rpsbml_lycopene.checkpoint()
+        self.rpsbml_lycopene.createSpecies(
+            species_id='new_spe',
+            compartment='c'
+        )
+        self.rpsbml_lycopene.addMember('rp_pathway', 'new_spe')
+        self.rpsbml_lycopene.updateBRSynth(
+            self.rpsbml_lycopene.getModel().getReaction('rxn_1'),
+            'rule_score',
+            0.5
+        )
+        self.rpsbml_lycopene.getModel().setId('merged')
+        self.assertNotEqual(
+            libsbml.writeSBMLToString(self.rpsbml_lycopene.getDocument()),
+            sbml_str
+        )
+        self.rpsbml_lycopene.rollback()
+        self.assertEqual(
+            libsbml.writeSBMLToString(self.rpsbml_lycopene.getDocument()),
+            sbml_str
+        )
+
+    def test_merge_inplace_checkpoint(self):
+        rpsbml_ecoli = rpSBML(
+            inFile = self.e_coli_model_path,
+            logger = self.logger
+        )
+        # Without checkpoint, modifications are not recorded
+        merged, _, _, _ = rpSBML.merge(
+            pathway=self.rpsbml_lycopene,
+            model=rpsbml_ecoli,
+            compartment_id='MNXC3',
+            inplace=True,
+            logger=self.logger
+        )
+        self.assertIs(merged, rpsbml_ecoli)
+        self.assertIsNone(rpsbml_ecoli._journal)
+        # With checkpoint, the pathway can be removed afterwards
+        rpsbml_ecoli = rpSBML(
+            inFile = self.e_coli_model_path,
+            logger = self.logger
+        )
+        counts = rpsbml_ecoli.count_elements()
+        sbml_str = libsbml.writeSBMLToString(rpsbml_ecoli.getDocument())
+        rpSBML.merge(
+            pathway=rpSBML(inFile=self.rpsbml_lycopene_path, logger=self.logger),
+            model=rpsbml_ecoli,
+            compartment_id='MNXC3',
+            inplace=True,
+            checkpoint=True,
+            logger=self.logger
+        )
+        self.assertNotEqual(rpsbml_ecoli.count_elements(), counts)
+        rpsbml_ecoli.rollback()
+        self.assertIsNone(rpsbml_ecoli._journal)
+        self.assertDictEqual(rpsbml_ecoli.count_elements(), counts)
+        self.assertEqual(
+            libsbml.writeSBMLToString(rpsbml_ecoli.getDocument()),
+            sbml_str
+        )
+
+    def test_updateBRSynthBulk(self):
+        rpsbml = rpSBML(
+            inFile=self.rpsbml_lycopene_path,
+            logger=self.logger
+        )
+        infos = {
+            'rule_score': 0.5,
+            'new_key': 'new_value',
+            'thermo_dGm_prime': {'value': 1.2, 'units': 'kj/mol'},
+            'rule_ids': ['rule_1', 'rule_2']
+        }
+        for rxn_id in ['rxn_1', 'rxn_2']:
+            for key, value in infos.items():
+                self.rpsbml_lycopene.updateBRSynth(
+                    self.rpsbml_lycopene.getModel().getReaction(rxn_id),
+                    key,
+                    value
+                )
+            self.assertTrue(
+                rpsbml.updateBRSynthBulk(
+                    rpsbml.getModel().getReaction(rxn_id),
+                    infos
+                )
+            )
+        # Same result as updating the entries one by one
+        self.assertEqual(
+            libsbml.writeSBMLToString(rpsbml.getDocument()),
+            libsbml.writeSBMLToString(self.rpsbml_lycopene.getDocument())
+        )
+        self.assertEqual(
+            rpsbml.readBRSYNTHAnnotation(
+                rpsbml.getModel().getReaction('rxn_1').getAnnotation()
+            )['new_key'],
+            'new_value'
+        )
+
+    def test_remove_reactions(self):
+        removed_species = self.rpsbml_lycopene.remove_reactions(['rxn_3'])
+        self.assertIsNone(
+            self.rpsbml_lycopene.getModel().getReaction('rxn_3')
+        )
+        self.assertSetEqual(
+            set(removed_species),
+            set(['MNXM24', 'M_ppi_c', 'M_grdp_c', 'TARGET_0000000001', 'MNXM8975'])
+        )
+        self.assertListEqual(
+            self.rpsbml_lycopene.readGroupMembers('rp_pathway'),
+            ['rxn_1', 'rxn_2']
+        )
+        self.assertListEqual(
+            self.rpsbml_lycopene.get_isolated_species(),
+            []
+        )
+
+    def test_findUniqueRowColumn(self):
+        matrix = pd.DataFrame(
+            [[1.0, 0.9], [0.8, 0.0]],
+            index=['r1', 'r2'],
+            columns=['c1', 'c2']
+        )
+        ref_matrix = matrix.copy()
+        self.assertDictEqual(
+            rpSBML._findUniqueRowColumn(matrix, logger=self.logger),
+            {'c1': ['r1']}
+        )
+        self.assertDictEqual(
+            rpSBML._findUniqueRowColumn(
+                matrix,
+                method='hungarian',
+                logger=self.logger
+            ),
+            {'c1': ['r2'], 'c2': ['r1']}
+        )
+        # The input matrix is left untouched
+        pd.testing.assert_frame_equal(matrix, ref_matrix)
+        self.assertRaises(
+            ValueError,
+            rpSBML._findUniqueRowColumn,
+            matrix,
+            'unknown'
+        )
+
     #def test_initEmpty(self):002_0001
     #    rpSBML(name='rpSBML_test', logger=self.logger)
 
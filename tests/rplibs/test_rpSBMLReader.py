@@ -0,0 +1,99 @@
+"""
+Created on Oct 19 2026
+
+@author: Joan Hérisson
+"""
+from gzip import open as gzip_open
+from shutil import copyfileobj
+from tempfile import TemporaryDirectory
+from os import path as os_path
+from rptools.rplibs import (
+    rpSBML,
+    read_pathway_record,
+    get_pathway_reactions,
+    get_global_score
+)
+from main_rplibs import Main_rplibs
+
+
+class Test_rpSBMLReader(Main_rplibs):
+
+    def setUp(self):
+        super().setUp()
+        self.rpsbml = rpSBML(
+            inFile=self.rpsbml_lycopene_path,
+            logger=self.logger
+        )
+        self.record = read_pathway_record(
+            self.rpsbml_lycopene_path,
+            logger=self.logger
+        )
+
+    def test_id(self):
+        self.assertEqual(
+            self.record['id'],
+            self.rpsbml.getName()
+        )
+
+    def test_groups(self):
+        for group in self.rpsbml.getPlugin('groups').getListOfGroups():
+            self.assertListEqual(
+                self.record['groups'][group.getId()],
+                self.rpsbml.readGroupMembers(group.getId())
+            )
+
+    def test_pathway(self):
+        self.assertDictEqual(
+            self.record['pathway'],
+            self.rpsbml.readBRSYNTHAnnotation(
+                self.rpsbml.getGroup('rp_pathway').getAnnotation(),
+                self.logger
+            )
+        )
+        self.assertEqual(
+            get_global_score(self.record),
+            self.record['pathway'].get('global_score', -1)
+        )
+
+    def test_reactions(self):
+        reactions = get_pathway_reactions(self.record)
+        self.assertListEqual(
+            list(reactions),
+            ['rxn_1', 'rxn_2', 'rxn_3']
+        )
+        for rxn_id, rxn in self.rpsbml.read_reactions().items():
+            for key in ['left', 'right', 'reversible', 'brsynth', 'miriam']:
+                self.assertEqual(
+                    self.record['reactions'][rxn_id][key],
+                    rxn[key]
+                )
+
+    def test_species(self):
+        for spe_id, spe in self.rpsbml.read_species().items():
+            self.assertDictEqual(
+                self.record['species'][spe_id]['brsynth'],
+                spe['brsynth']
+            )
+            self.assertListEqual(
+                self.record['species'][spe_id]['miriam'],
+                spe['miriam']
+            )
+        self.assertDictEqual(
+            read_pathway_record(
+                self.rpsbml_lycopene_path,
+                species=False,
+                logger=self.logger
+            )['species'],
+            {}
+        )
+
+    def test_gz(self):
+        with TemporaryDirectory() as temp_d:
+            gz_path = os_path.join(temp_d, 'lycopene.sbml.gz')
+            with open(self.rpsbml_lycopene_path, 'rb') as f_in:
+                with gzip_open(gz_path, 'wb') as f_out:
+                    copyfileobj(f_in, f_out)
+            self.assertDictEqual(
+                read_pathway_record(gz_path, logger=self.logger),
+                self.record
+            )
@@ -0,0 +1,77 @@
+"""
+Created on Oct 19 2026
+
+@author: Joan Hérisson
+"""
+
+from rptools.rplibs import (
+    rpSBML,
+    rpGraph,
+    rpSparseGraph
+)
+from main_rplibs import Main_rplibs
+
+
+class Test_rpSparseGraph(Main_rplibs):
+
+    def setUp(self):
+        super().setUp()
+        self.rpsbml = rpSBML(
+            inFile=self.rpsbml_lycopene_path,
+            logger=self.logger
+        )
+        self.rpgraph = rpGraph(
+            self.rpsbml,
+            True,
+            'rp_pathway',
+            'rp_trunk_species',
+            'rp_sink_species',
+            logger=self.logger
+        )
+        self.rpsparsegraph = rpSparseGraph(
+            self.rpsbml,
+            True,
+            logger=self.logger
+        )
+        # Species defined in the model
+        self.species = [
+            spe.getId()
+            for spe in self.rpsbml.getModel().getListOfSpecies()
+        ]
+
+    def test_onlyConsumedSpecies(self):
+        self.assertCountEqual(
+            self.rpsparsegraph.onlyConsumedSpecies(self.species),
+            self.rpgraph.onlyConsumedSpecies(self.species)
+        )
+
+    def test_onlyProducedSpecies(self):
+        self.assertCountEqual(
+            self.rpsparsegraph.onlyProducedSpecies(self.species),
+            self.rpgraph.onlyProducedSpecies(self.species)
+        )
+        self.assertIn(
+            'TARGET_0000000001',
+            self.rpsparsegraph.onlyProducedSpecies()
+        )
+
+    def test_predecessors_successors(self):
+        for node_id in self.species + ['rxn_1', 'rxn_2', 'rxn_3']:
+            self.assertCountEqual(
+                self.rpsparsegraph.predecessors(node_id),
+                self.rpgraph.G.predecessors(node_id)
+            )
+            self.assertCountEqual(
+                self.rpsparsegraph.successors(node_id),
+                self.rpgraph.G.successors(node_id)
+            )
+
+    def test_get_node(self):
+        node = self.rpsparsegraph.get_node('rxn_1')
+        self.assertEqual(node['type'], 'reaction')
+        self.assertTrue(node['rp_pathway'])
+        self.assertDictEqual(
+            node['brsynth'],
+            self.rpgraph.G.nodes['rxn_1']['brsynth']
+        )
+        self.assertIsNone(self.rpsparsegraph.get_node('unknown'))
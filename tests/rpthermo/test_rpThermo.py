@@ -1,11 +1,29 @@
 from unittest import TestCase
 from copy import deepcopy
-from numpy import array as np_array
+from os import path as os_path
+from tempfile import TemporaryDirectory
+from numpy import (
+    array as np_array,
+    log as np_log
+)
 from rptools.rpthermo.rpthermo import (
     build_stoichio_matrix,
     get_target_rxn_idx,
     minimize,
     remove_compounds,
+    search_equilibrator_compound,
+    build_reaction_formula,
+    eQuilibrator_multi,
+    canonical_reaction,
+    thermo_conditions,
+    MEASURES,
+    default_compound_substitutes,
+    get_compound_substitute,
+    default_concentration_bounds,
+    get_concentration_bounds,
+    mdf,
+    DEFAULT_C_MIN,
+    DEFAULT_C_MAX,
     # eQuilibrator,
     # initThermo,
     # get_compounds_from_cache
@@ -15,6 +33,7 @@ from brs_utils import (
     Cache
 )
 from chemlite import Reaction
+from rptools.rpthermo import LookupCache
 from rptools.rplibs import(
     rpCompound,
     rpReaction,
@@ -119,6 +138,94 @@ species = {
     )
 }
 
+class FakeCompound:
+    def __init__(self, id, inchi_key, inchi, smiles):
+        self.id = id
+        self.inchi_key = inchi_key
+        self.inchi = inchi
+        self.smiles = smiles
+
+
+class FakeCC:
+    '''Counts the queries to the compound cache'''
+    def __init__(self, compounds):
+        self.compounds = compounds
+        self.nb_queries = 0
+
+    def get_compound(self, val):
+        self.nb_queries += 1
+        return self.compounds.get(val)
+
+    def search_compound_by_inchi_key(self, inchikey):
+        self.nb_queries += 1
+        return []
+
+
+class FakeQuantity:
+    '''Quantity already expressed in the requested units'''
+    def __init__(self, magnitude):
+        self.magnitude = magnitude
+
+    def m_as(self, units):
+        return self.magnitude
+
+
+class FakeThermoCC:
+    '''Counts the queries to eQuilibrator'''
+    def __init__(self):
+        self.p_h = FakeQuantity(7.5)
+        self.ionic_strength = FakeQuantity(0.25)
+        self.p_mg = FakeQuantity(3.0)
+        self.temperature = FakeQuantity(298.15)
+        self.nb_queries = 0
+
+    def parse_reaction_formula(self, formula):
+        self.nb_queries += 1
+        raise ValueError(formula)
+
+
+class FakePhasedCompound:
+    def __init__(self, phase, ln_physiological_abundance):
+        self.phase = phase
+        self.ln_physiological_abundance = ln_physiological_abundance
+
+
+class FakeReaction:
+    '''Reaction parsed from a formula'''
+    def __init__(self, formula, phased_compounds):
+        self.formula = formula
+        self.phased_compounds = phased_compounds
+
+    def get_phased_compound(self, compound):
+        return self.phased_compounds[compound], 1
+
+
+class FakeMDFCC(FakeThermoCC):
+    '''Estimates dG0' (RT = 1) from a table of values
+    and rows of the square root of their covariance, per formula'''
+    def __init__(self, standard_dg_prime, phased_compounds):
+        super().__init__()
+        self.RT = FakeQuantity(1.0)
+        self.standard_dg_prime = standard_dg_prime
+        self.phased_compounds = phased_compounds
+
+    def parse_reaction_formula(self, formula):
+        self.nb_queries += 1
+        if formula not in self.standard_dg_prime:
+            raise ValueError(formula)
+        return FakeReaction(formula, self.phased_compounds)
+
+    def get_compound(self, cc_id):
+        return cc_id
+
+    def standard_dg_prime_multi(self, rxns, uncertainty_representation):
+        self.nb_queries += 1
+        return (
+            FakeQuantity(np_array([self.standard_dg_prime[rxn.formula][0] for rxn in rxns])),
+            FakeQuantity(np_array([self.standard_dg_prime[rxn.formula][1] for rxn in rxns]))
+        )
+
+
 class Test_rpThermo(TestCase):
 
     def setUp(self):
@@ -288,3 +395,259 @@ class Test_rpThermo(TestCase):
         #     species=species,
         #     cc=cc
         # )
+
+    def test_search_equilibrator_compound_cache(self):
+        spe = species['MNXM23']
+        cc = FakeCC({
+            spe.get_inchikey(): FakeCompound(
+                id=123,
+                inchi_key=spe.get_inchikey(),
+                inchi=spe.get_inchi(),
+                smiles=spe.get_smiles()
+            )
+        })
+        with TemporaryDirectory() as tmp_dir:
+            filename = os_path.join(tmp_dir, 'compounds.json')
+            cache = LookupCache(filename=filename)
+            search = lambda cc, cache, spe: search_equilibrator_compound(
+                cc=cc,
+                id=spe.get_id(),
+                inchikey=spe.get_inchikey(),
+                inchi=spe.get_inchi(),
+                smiles=spe.get_smiles(),
+                cache=cache,
+                logger=self.logger
+            )
+            compound = search(cc, cache, spe)
+            self.assertEqual(compound['cc_key'], 'inchi_key')
+            self.assertEqual(compound['id'], spe.get_id())
+            # Not found compounds are cached as well
+            self.assertDictEqual(search(cc, cache, species['MNXM2']), {})
+            nb_queries = cc.nb_queries
+            # Lookups are served from memory...
+            compound['id'] = 'foo'
+            self.assertDictEqual(
+                search(cc, cache, spe),
+                search(cc, None, spe)
+            )
+            self.assertDictEqual(search(cc, cache, species['MNXM2']), {})
+            self.assertEqual(cc.nb_queries, nb_queries + 2)
+            # ...and from disk in a new run
+            cache.save()
+            cache = LookupCache(filename=filename)
+            self.assertEqual(search(cc, cache, spe)['cc_key'], 'inchi_key')
+            self.assertDictEqual(search(cc, cache, species['MNXM2']), {})
+            self.assertEqual(cc.nb_queries, nb_queries + 2)
+            self.assertEqual(cache.hits, 2)
+
+    def test_build_reaction_formula(self):
+        self.assertEqual(
+            build_reaction_formula(
+                species_stoichio={'MNXM4': -1, 'CMPD_0000000003': -2, 'MNXM1': 1, 'TARGET_0000000001': 1},
+                species_ids={
+                    'MNXM4': 'kegg:C00007',
+                    'CMPD_0000000003': 'CMPD_0000000003',
+                    'MNXM1': 'kegg:C00080',
+                    'TARGET_0000000001': 'TARGET_0000000001'
+                }
+            ),
+            '1 kegg:C00007 + 2 CMPD_0000000003 = 1 kegg:C00080 + 1 TARGET_0000000001'
+        )
+
+    def test_eQuilibrator_multi_not_parsed(self):
+        # Reactions not parsed by eQuilibrator get NaN values
+        results = eQuilibrator_multi(
+            species_stoichios=[rxn.get_species() for rxn in self.reactions],
+            species_ids={spe_id: spe_id for rxn in self.reactions for spe_id in rxn.get_species_ids()},
+            cc=FakeCC({}),
+            logger=self.logger
+        )
+        self.assertEqual(len(results), len(self.reactions))
+        for result in results:
+            self.assertEqual(result['dG0_prime']['value'], 'NaN')
+            self.assertEqual(result['dG']['units'], 'kilojoule / mole')
+
+    def test_eQuilibrator_multi_cache(self):
+        cc = FakeThermoCC()
+        species_ids = {'MNXM3': 'kegg:C00002', 'MNXM2': 'kegg:C00001', 'MNXM7': 'kegg:C00008', 'MNXM9': 'kegg:C00009'}
+        species_stoichio = {'MNXM3': -1, 'MNXM2': -1, 'MNXM7': 1, 'MNXM9': 1}
+        result = {
+            measure: {'value': -30.0, 'error': 0.5, 'units': 'kilojoule / mole'}
+            for measure in MEASURES
+        }
+        cache = LookupCache()
+        cache.set(
+            LookupCache.key(canonical_reaction(species_stoichio, species_ids), *thermo_conditions(cc)),
+            result
+        )
+        results = eQuilibrator_multi(
+            species_stoichios=[species_stoichio, dict(reversed(list(species_stoichio.items())))],
+            species_ids=species_ids,
+            cc=cc,
+            cache=cache,
+            logger=self.logger
+        )
+        # Cached reactions are not evaluated by eQuilibrator
+        self.assertEqual(cc.nb_queries, 0)
+        self.assertListEqual(results, [result, result])
+        # Cached results are not modified through returned ones
+        results[0]['dG0_prime']['value'] = 0
+        self.assertEqual(result['dG0_prime']['value'], -30.0)
+
+    def test_eQuilibrator_multi_cache_failure(self):
+        cc = FakeThermoCC()
+        cache = LookupCache()
+        for nb_queries in [1, 2]:
+            results = eQuilibrator_multi(
+                species_stoichios=[{'MNXM3': -1, 'MNXM7': 1}],
+                species_ids={'MNXM3': 'kegg:C00002', 'MNXM7': 'kegg:C00008'},
+                cc=cc,
+                cache=cache,
+                logger=self.logger
+            )
+            self.assertEqual(results[0]['dG0_prime']['value'], 'NaN')
+            # Failed reactions are evaluated again
+            self.assertEqual(cc.nb_queries, nb_queries)
+        self.assertEqual(len(cache), 0)
+
+    def test_lookup_cache_pop_new(self):
+        with TemporaryDirectory() as tmp_dir:
+            filename = os_path.join(tmp_dir, 'reactions.json')
+            # Entries found by a worker...
+            worker_cache = LookupCache(filename=filename)
+            worker_cache.set('A', 1)
+            new_entries = worker_cache.pop_new()
+            self.assertDictEqual(new_entries, {'A': 1})
+            self.assertDictEqual(worker_cache.pop_new(), {})
+            # ...are saved by the parent process
+            cache = LookupCache(filename=filename)
+            cache.update(new_entries)
+            cache.save()
+            self.assertEqual(LookupCache(filename=filename).get('A'), 1)
+
+    def test_canonical_reaction(self):
+        # Same reaction, whatever the species order and IDs in the pathway
+        self.assertEqual(
+            canonical_reaction(
+                species_stoichio={'MNXM3': -1, 'MNXM2': -1, 'MNXM7': 1, 'MNXM9': 1},
+                species_ids={'MNXM3': 'kegg:C00002', 'MNXM2': 'kegg:C00001', 'MNXM7': 'kegg:C00008', 'MNXM9': 'kegg:C00009'}
+            ),
+            canonical_reaction(
+                species_stoichio={'ADP': 1.0, 'Pi': 1, 'ATP': -1.0, 'H2O': -1},
+                species_ids={'ATP': 'kegg:C00002', 'H2O': 'kegg:C00001', 'ADP': 'kegg:C00008', 'Pi': 'kegg:C00009'}
+            )
+        )
+        self.assertEqual(
+            canonical_reaction(
+                species_stoichio={'MNXM3': -1, 'MNXM3__64__MNXC3': 1, 'MNXM2': -2},
+                species_ids={'MNXM3': 'kegg:C00002', 'MNXM3__64__MNXC3': 'kegg:C00002', 'MNXM2': 'kegg:C00001'}
+            ),
+            '-2.0 kegg:C00001'
+        )
+
+    def test_get_compound_substitute(self):
+        compound_substitutes = default_compound_substitutes()
+        self.assertEqual(
+            get_compound_substitute('MNXM24', compound_substitutes)['id'],
+            'MNXM1102418'
+        )
+        # Compartment suffix
+        self.assertIs(
+            get_compound_substitute('MNXM24__64__MNXC3', compound_substitutes),
+            compound_substitutes['MNXM24']
+        )
+        self.assertIsNone(
+            get_compound_substitute('MNXM23__64__MNXC3', compound_substitutes)
+        )
+
+    def test_get_concentration_bounds(self):
+        conc_bounds = default_concentration_bounds()
+        # MetaNetX ID, with or without compartment
+        self.assertEqual(
+            get_concentration_bounds('MNXM3__64__MNXC3', 'kegg:C00002', conc_bounds),
+            (0.005, 0.005)
+        )
+        # KEGG ID from eQuilibrator
+        self.assertEqual(
+            get_concentration_bounds('CMPD_0000000003', 'kegg:C00008', conc_bounds),
+            (0.0005, 0.0005)
+        )
+        self.assertEqual(
+            get_concentration_bounds('TARGET_0000000001', 'TARGET_0000000001', conc_bounds),
+            (DEFAULT_C_MIN, DEFAULT_C_MAX)
+        )
+
+    def test_mdf(self):
+        # A -> B -> C, with A and C at fixed concentrations
+        species_ids = {spe_id: spe_id for spe_id in ['A', 'B', 'C', 'D', 'H2O', 'H+', 'O2']}
+        reactions = {
+            'rxn_1': {'A': -1, 'H2O': -1, 'B': 1, 'H+': 1},
+            'rxn_2': {'B': -1, 'C': 1},
+        }
+        conc_bounds = {'A': (1e-2, 1e-2), 'B': (1e-6, 1e-2), 'C': (1e-6, 1e-6)}
+        phased_compounds = {
+            'A': FakePhasedCompound('aqueous', np_log(1e-3)),
+            'B': FakePhasedCompound('aqueous', np_log(1e-3)),
+            'C': FakePhasedCompound('aqueous', np_log(1e-3)),
+            # Fixed abundances
+            'H2O': FakePhasedCompound('liquid', 0),
+            'H+': FakePhasedCompound('aqueous', 0),
+            'O2': FakePhasedCompound('gas', -5),
+        }
+        def fake_cc(reactions):
+            # dG0' of both reactions are fully correlated
+            return FakeMDFCC(
+                {
+                    build_reaction_formula(reactions['rxn_1'], species_ids): (-10, [1]),
+                    build_reaction_formula(reactions['rxn_2'], species_ids): (2, [1]),
+                },
+                phased_compounds
+            )
+        def run_mdf(reactions, cc, stdev_factor=0, conc_bounds=conc_bounds, cache=None):
+            return mdf(
+                reactions=reactions,
+                species_ids=species_ids,
+                cc=cc,
+                conc_bounds=conc_bounds,
+                stdev_factor=stdev_factor,
+                cache=cache,
+                logger=self.logger
+            )
+
+        # B at its upper bound, rxn_2 limits the MDF:
+        # -dG'_2 = -2 - ln(1e-6) + ln(1e-2)
+        result = run_mdf(reactions, fake_cc(reactions))
+        self.assertAlmostEqual(result['value'], -2 + np_log(1e4))
+        self.assertEqual(result['units'], 'kilojoule / mole')
+        self.assertListEqual(result['bottlenecks'], ['rxn_2'])
+        # dG0' can be lowered by one standard deviation
+        self.assertAlmostEqual(
+            run_mdf(reactions, fake_cc(reactions), stdev_factor=1)['value'],
+            -1 + np_log(1e4)
+        )
+        # Reactions not parsed are left out
+        _reactions = {**reactions, 'rxn_3': {'C': -1, 'D': 1}}
+        result = run_mdf(_reactions, fake_cc(_reactions))
+        self.assertAlmostEqual(result['value'], -2 + np_log(1e4))
+        self.assertListEqual(result['bottlenecks'], ['rxn_2'])
+        # A gas produced at a fixed abundance balances both reactions:
+        # -dG'_1 = -dG'_2 = (10 - 2 + 5 + ln(1e-2) - ln(1e-6)) / 2
+        _reactions = {**reactions, 'rxn_2': {'B': -1, 'C': 1, 'O2': 1}}
+        result = run_mdf(_reactions, fake_cc(_reactions))
+        self.assertAlmostEqual(result['value'], (13 + np_log(1e4)) / 2)
+        self.assertListEqual(result['bottlenecks'], ['rxn_1', 'rxn_2'])
+        # No solution
+        result = run_mdf(
+            reactions,
+            fake_cc(reactions),
+            conc_bounds={**conc_bounds, 'B': (1e-2, 1e-6)}
+        )
+        self.assertEqual(result['value'], 'NaN')
+        self.assertListEqual(result['bottlenecks'], [])
+        # Cached results are not computed again
+        cache = LookupCache()
+        cc = fake_cc(reactions)
+        result = run_mdf(reactions, cc, cache=cache)
+        nb_queries = cc.nb_queries
+        self.assertDictEqual(run_mdf(reactions, cc, cache=cache), result)
+        self.assertEqual(cc.nb_queries, nb_queries)